@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from focus_areas import FEATURE_COLUMNS
+
+# -------------------------------
+# Load test / latency benchmark for the prediction API
+# -------------------------------
+# Drives /predict (batch size 1) and /predict/batch (batch size > 1) with
+# feature vectors sampled from dyslexia_focus_areas_20000.csv, sweeping
+# concurrency levels and batch sizes with a closed loop of concurrent
+# clients. By default the app is called in-process through its ASGI
+# interface (no network); --url targets a running server and --uvicorn
+# starts a local one. API env vars (INFERENCE_*, PREDICT_COALESCE, ...)
+# apply as usual, except that the prediction cache is off unless --cache is
+# given: the sampled vectors repeat, so with the cache on nearly every
+# request after the first pass would be a cache hit rather than a model call.
+# The cache, coalescer and executor settings are recorded in the report.
+#
+#   python benchmark_api.py run -c 1,8,32 -b 1,32 -o bench.json
+#   python benchmark_api.py compare baseline.json bench.json --threshold 0.1
+
+DEFAULT_DATASET = 'dyslexia_focus_areas_20000.csv'
+
+
+def load_vectors(path=DEFAULT_DATASET, n=2000, seed=0):
+    """Sample n student payloads (dicts of the ten features) from the dataset"""
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=FEATURE_COLUMNS)
+    sample = df.sample(n=min(n, len(df)), random_state=seed)
+    return [{col: float(v) for col, v in zip(FEATURE_COLUMNS, row)}
+            for row in sample[FEATURE_COLUMNS].itertuples(index=False)]
+
+
+def summarize(latencies, errors, elapsed, batch_size):
+    latencies_ms = np.asarray(latencies) * 1000.0
+    ok = len(latencies_ms)
+    summary = {
+        "requests": ok + errors,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "rps": round(ok / elapsed, 1) if elapsed > 0 else None,
+        "rows_per_second": round(ok * batch_size / elapsed, 1) if elapsed > 0 else None,
+    }
+    if ok:
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        summary.update({"mean_ms": round(float(latencies_ms.mean()), 3), "p50_ms": round(float(p50), 3),
+                        "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3),
+                        "max_ms": round(float(latencies_ms.max()), 3)})
+    return summary
+
+
+# -------------------------------
+# Targets
+# -------------------------------
+@contextlib.asynccontextmanager
+async def asgi_lifespan(app):
+    """Run the app's startup/shutdown hooks (warm-up, watcher) around the benchmark"""
+    receive_queue = asyncio.Queue()
+    sent = asyncio.Queue()
+
+    async def receive():
+        return await receive_queue.get()
+
+    task = asyncio.ensure_future(app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, sent.put))
+    await receive_queue.put({"type": "lifespan.startup"})
+    message = await sent.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(f"App startup failed: {message.get('message')}")
+    try:
+        yield
+    finally:
+        await receive_queue.put({"type": "lifespan.shutdown"})
+        await sent.get()
+        await task
+
+
+@contextlib.asynccontextmanager
+async def open_client(url=None, uvicorn=False, port=8765):
+    """httpx client for the in-process app, a given URL, or a freshly started local uvicorn"""
+    import httpx
+
+    if url is None and not uvicorn:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import main
+        async with asgi_lifespan(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://asgi") as client:
+                yield client, "asgi"
+        return
+
+    server = None
+    if uvicorn:
+        url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port),
+                                   '--log-level', 'warning'],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+            if server is not None:
+                await wait_until_ready(client)
+            yield client, url
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+async def wait_until_ready(client, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+# -------------------------------
+# Scenarios
+# -------------------------------
+async def run_scenario(client, vectors, concurrency, batch_size, requests, seed=0):
+    """Closed loop: `concurrency` clients send `requests` requests in total"""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(vectors), size=(requests, batch_size))
+    if batch_size == 1:
+        path, bodies = "/predict", [vectors[i[0]] for i in picks]
+    else:
+        path, bodies = "/predict/batch", [{"students": [vectors[j] for j in i]} for i in picks]
+
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        import httpx
+
+        nonlocal errors, next_index
+        while next_index < requests:
+            body = bodies[next_index]
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+            except httpx.HTTPError:
+                # Connection errors and timeouts count against the scenario instead of aborting the sweep
+                errors += 1
+                continue
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return {"endpoint": path, "concurrency": concurrency, "batch_size": batch_size,
+            **summarize(latencies, errors, elapsed, batch_size)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+SERVER_SETTINGS = ('PREDICTION_CACHE_SIZE', 'PREDICTION_CACHE_TTL', 'PREDICT_COALESCE', 'PREDICT_COALESCE_WINDOW_MS',
+                   'PREDICT_COALESCE_MAX_BATCH', 'INFERENCE_EXECUTOR', 'INFERENCE_WORKERS', 'INFERENCE_QUEUE_SIZE',
+                   'METRICS_ENABLED', 'DRIFT_MONITOR', 'PREDICTION_LOG_DIR')
+
+
+def configure_server(cache):
+    """Set the API env for this run (inherited by --uvicorn) and return the settings that shape results"""
+    if not cache:
+        os.environ['PREDICTION_CACHE_SIZE'] = '0'
+    return {name: os.environ.get(name) for name in SERVER_SETTINGS}
+
+
+async def run_benchmark(args):
+    settings = configure_server(args.cache)
+    vectors = load_vectors(args.dataset, args.sample, args.seed)
+    results = []
+    async with open_client(args.url, args.uvicorn, args.port) as (client, target):
+        # Untimed warm-up so the first scenario does not pay connection setup
+        await run_scenario(client, vectors, 1, 1, args.warmup, args.seed)
+        for batch_size in args.batch_sizes:
+            for concurrency in args.concurrency:
+                requests = max(args.requests // batch_size, concurrency)
+                result = await run_scenario(client, vectors, concurrency, batch_size, requests, args.seed)
+                results.append(result)
+                print(f"  {result['endpoint']:<15} c={concurrency:<4} batch={batch_size:<5} "
+                      f"{result['rps']:>8} req/s  {result['rows_per_second']:>9} rows/s  "
+                      f"p50 {result.get('p50_ms')}ms  p95 {result.get('p95_ms')}ms  "
+                      f"p99 {result.get('p99_ms')}ms  errors {result['errors']}")
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "target": target,
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+            "dataset": args.dataset,
+            "sample": len(vectors),
+            # Env of the benchmark process; with --url the remote server's own settings apply
+            "server_settings": settings,
+        },
+        "results": results,
+    }
+
+
+# -------------------------------
+# Comparison
+# -------------------------------
+def compare_results(baseline, current, threshold=0.10):
+    """Scenario-by-scenario diff; a regression is p95 up or RPS down by more than `threshold`"""
+    old = {(r["endpoint"], r["concurrency"], r["batch_size"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        key = (result["endpoint"], result["concurrency"], result["batch_size"])
+        before = old.get(key)
+        if before is None or not before.get("rps") or not before.get("p95_ms"):
+            continue
+        rps_change = result["rps"] / before["rps"] - 1.0
+        p95_change = result["p95_ms"] / before["p95_ms"] - 1.0
+        rows.append({"scenario": key, "rps_change": rps_change, "p95_change": p95_change,
+                     "regressed": rps_change < -threshold or p95_change > threshold})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediction API load test and latency benchmark")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="Run the concurrency x batch-size sweep")
+    run.add_argument('-c', '--concurrency', default='1,8,32',
+                     type=lambda s: [int(x) for x in s.split(',')])
+    run.add_argument('-b', '--batch-sizes', default='1,16,128',
+                     type=lambda s: [int(x) for x in s.split(',')])
+    run.add_argument('-n', '--requests', type=int, default=2000,
+                     help="Rows per scenario (divided by batch size into requests)")
+    run.add_argument('--warmup', type=int, default=50)
+    run.add_argument('--dataset', default=DEFAULT_DATASET)
+    run.add_argument('--sample', type=int, default=2000, help="Distinct students sampled from the dataset")
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--url', help="Benchmark a running server instead of the in-process app")
+    run.add_argument('--uvicorn', action='store_true', help="Start a local uvicorn server and benchmark it")
+    run.add_argument('--port', type=int, default=8765)
+    run.add_argument('--cache', action='store_true',
+                     help="Keep the API's prediction cache on (default: PREDICTION_CACHE_SIZE=0 for the app under test)")
+    run.add_argument('-o', '--output', help="Write JSON results here")
+
+    cmp = sub.add_parser('compare', help="Compare two result files")
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=0.10,
+                     help="Allowed relative RPS drop / p95 increase (default 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        report = asyncio.run(run_benchmark(args))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"✓ Results saved to {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare_results(baseline, current, args.threshold)
+    print(f"Comparing {baseline['meta'].get('commit')} -> {current['meta'].get('commit')} "
+          f"(threshold {args.threshold:.0%})")
+    for row in rows:
+        endpoint, concurrency, batch_size = row["scenario"]
+        flag = "✗ REGRESSION" if row["regressed"] else "✓"
+        print(f"  {endpoint:<15} c={concurrency:<4} batch={batch_size:<5} "
+              f"rps {row['rps_change']:+.1%}  p95 {row['p95_change']:+.1%}  {flag}")
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
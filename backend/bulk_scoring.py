@@ -0,0 +1,223 @@
+import csv
+import io
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from focus_areas import DOMAINS, FEATURE_COLUMNS, rank_focus_areas
+
+# -------------------------------
+# Streaming bulk scoring for whole-cohort CSV files
+# -------------------------------
+# The input is read in fixed-size chunks. Each chunk is validated, scored as
+# one matrix and turned into NDJSON or CSV text before the next chunk is read,
+# so memory stays flat no matter how many students the file holds.
+
+DEFAULT_CHUNK_SIZE = 5000
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+class BulkJobProgress:
+    """Running counters for one bulk scoring job"""
+
+    def __init__(self, job_id=None, source=None):
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.source = source
+        self.started = time.time()
+        self.finished = None
+        self.chunks = 0
+        self.rows_read = 0
+        self.rows_scored = 0
+        self.rows_failed = 0
+        self.error = None
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    def snapshot(self):
+        elapsed = (self.finished or time.time()) - self.started
+        return {
+            "job_id": self.job_id,
+            "source": self.source,
+            "done": self.done,
+            "error": self.error,
+            "chunks": self.chunks,
+            "rows_read": self.rows_read,
+            "rows_scored": self.rows_scored,
+            "rows_failed": self.rows_failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.rows_read / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+class BulkJobTracker:
+    """Keeps the most recent jobs' progress for the status endpoint"""
+
+    def __init__(self, max_jobs=50):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, source=None):
+        progress = BulkJobProgress(source=source)
+        with self._lock:
+            self._jobs[progress.job_id] = progress
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return progress
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return [job.snapshot() for job in self._jobs.values()]
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read a CSV path or file object in DataFrame chunks of at most chunk_size rows"""
+    import pandas as pd
+
+    reader = pd.read_csv(source, chunksize=chunk_size)
+    first = True
+    for chunk in reader:
+        if first:
+            missing = [c for c in FEATURE_COLUMNS if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"CSV is missing required columns: {missing}")
+            first = False
+        yield chunk
+
+
+def score_chunk(chunk, score_rows, row_offset):
+    """Validate and score one DataFrame chunk -> list of per-row result dicts"""
+    import pandas as pd
+
+    features = chunk[FEATURE_COLUMNS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    valid = np.isfinite(features).all(axis=1)
+    if 'id' in chunk.columns:
+        ids = chunk['id'].astype(object).where(chunk['id'].notna(), None).tolist()
+    else:
+        ids = [None] * len(chunk)
+
+    scored = score_rows(features[valid]) if valid.any() else []
+    _, order = rank_focus_areas(features[valid][:, 1:])
+    ranked_names = DOMAINS[order].tolist()
+
+    results = []
+    scored_iter = iter(zip(scored, ranked_names))
+    for i, is_valid in enumerate(valid):
+        record = {"row": row_offset + i}
+        if ids[i] is not None:
+            record["id"] = ids[i]
+        if is_valid:
+            (pred_class, prob_dict, *_), focus = next(scored_iter)
+            record["predicted_difficulty"] = pred_class
+            record["probabilities"] = prob_dict
+            record["focus_areas"] = focus
+        else:
+            bad = [c for c, ok in zip(FEATURE_COLUMNS, np.isfinite(features[i])) if not ok]
+            record["error"] = f"missing or non-numeric values in {bad}"
+        results.append(record)
+    return results
+
+
+def _format_ndjson(records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+def _format_csv(records, classes, write_header):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    if write_header:
+        writer.writerow(['row', 'id', 'predicted_difficulty']
+                        + [f'prob_{c}' for c in classes]
+                        + ['primary_focus', 'secondary_focus', 'tertiary_focus', 'error'])
+    for record in records:
+        probs = record.get("probabilities") or {}
+        focus = record.get("focus_areas") or ['', '', '']
+        writer.writerow([record["row"], record.get("id", ''), record.get("predicted_difficulty", '')]
+                        + [probs.get(c, '') for c in classes]
+                        + focus + [record.get("error", '')])
+    return out.getvalue()
+
+
+def stream_scores(source, score_rows, classes, fmt='ndjson', chunk_size=DEFAULT_CHUNK_SIZE,
+                  progress=None, on_chunk=None):
+    """Generator of output text, one piece per scored chunk"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {list(FORMATS)}")
+    progress = progress or BulkJobProgress()
+    try:
+        for chunk in iter_chunks(source, chunk_size):
+            records = score_chunk(chunk, score_rows, progress.rows_read)
+            progress.chunks += 1
+            progress.rows_read += len(records)
+            failed = sum(1 for r in records if "error" in r)
+            progress.rows_failed += failed
+            progress.rows_scored += len(records) - failed
+
+            if fmt == 'ndjson':
+                yield _format_ndjson(records)
+            else:
+                yield _format_csv(records, classes, write_header=progress.chunks == 1)
+            if on_chunk is not None:
+                on_chunk(progress)
+    except Exception as e:
+        progress.error = str(e)
+        raise
+    finally:
+        progress.finished = time.time()
+
+
+# -------------------------------
+# CLI
+# -------------------------------
+def main(argv=None):
+    import argparse
+    from model_registry import load_model_artifact
+
+    parser = argparse.ArgumentParser(description="Stream-score a cohort CSV with the saved model")
+    parser.add_argument('input', help="CSV with the ten feature columns (optionally an id column)")
+    parser.add_argument('-o', '--output', help="Output file (default: stdout)")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--model', default='best_dyslexia_focus_model.bundle',
+                        help="Model bundle, or the legacy best_dyslexia_focus_model.pkl")
+    args = parser.parse_args(argv)
+
+    import os
+    model_path = args.model
+    if not os.path.exists(model_path) and model_path.endswith('.bundle'):
+        model_path = 'best_dyslexia_focus_model.pkl'
+    loaded = load_model_artifact(model_path, FEATURE_COLUMNS)
+
+    def report(progress):
+        stats = progress.snapshot()
+        print(f"  chunk {stats['chunks']}: {stats['rows_read']} rows "
+              f"({stats['rows_failed']} invalid), {stats['rows_per_second']} rows/s", file=sys.stderr)
+
+    progress = BulkJobProgress(source=args.input)
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        for piece in stream_scores(args.input, loaded.score_rows, loaded.classes, args.format,
+                                   args.chunk_size, progress, on_chunk=report):
+            out.write(piece)
+    finally:
+        if args.output:
+            out.close()
+
+    stats = progress.snapshot()
+    print(f"✓ Scored {stats['rows_scored']} rows ({stats['rows_failed']} invalid) in "
+          f"{stats['elapsed_seconds']}s - {stats['rows_per_second']} rows/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
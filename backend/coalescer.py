@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+# -------------------------------
+# Async micro-batching for /predict
+# -------------------------------
+# Concurrent single-row requests that arrive within `window_ms` of each other
+# (or until `max_batch_size` rows are waiting) are stacked into one matrix and
+# scored with a single call, then each caller receives its own row.
+
+
+class CoalescerStats:
+    """Batch-size and queue-wait statistics over a sliding window of requests"""
+
+    def __init__(self, window=2048):
+        self.total_requests = 0
+        self.total_batches = 0
+        self.max_batch_size_seen = 0
+        self.batch_size_counts = {}
+        self._waits = deque(maxlen=window)
+
+    def record(self, batch_size, waits):
+        self.total_requests += batch_size
+        self.total_batches += 1
+        self.max_batch_size_seen = max(self.max_batch_size_seen, batch_size)
+        self.batch_size_counts[batch_size] = self.batch_size_counts.get(batch_size, 0) + 1
+        self._waits.extend(waits)
+
+    def snapshot(self):
+        waits_ms = np.asarray(self._waits) * 1000.0
+        if len(waits_ms):
+            p50, p95, p99 = np.percentile(waits_ms, [50, 95, 99])
+            queue_wait = {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+                          "p99": round(float(p99), 3), "max": round(float(waits_ms.max()), 3)}
+        else:
+            queue_wait = None
+        return {
+            "total_requests": self.total_requests,
+            "total_batches": self.total_batches,
+            "mean_batch_size": round(self.total_requests / self.total_batches, 2) if self.total_batches else 0,
+            "max_batch_size": self.max_batch_size_seen,
+            "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+            "queue_wait_ms": queue_wait,
+        }
+
+
+class RequestCoalescer:
+    """Collect single rows into matrix batches for one score_fn call.
+
+    `score_fn(matrix)` must return a sequence with one result per row; each
+    caller receives the result for its own row. A plain function runs on the
+    threadpool; a coroutine function is awaited directly.
+    """
+
+    def __init__(self, score_fn, window_ms=2.0, max_batch_size=64, stats_window=2048):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.stats = CoalescerStats(stats_window)
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+
+    async def submit(self, row):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        dispatched = time.perf_counter()
+        self.stats.record(len(batch), [dispatched - enqueued for _, _, enqueued in batch])
+        matrix = np.stack([row for row, _, _ in batch])
+
+        try:
+            if asyncio.iscoroutinefunction(self.score_fn):
+                result = await self.score_fn(matrix)
+            else:
+                result = await run_in_threadpool(self.score_fn, matrix)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (_, future, _) in enumerate(batch):
+            # Callers that disconnected have cancelled their future
+            if not future.done():
+                future.set_result(result[i])
@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_loader import SCHEMA, DIFFICULTY_CATEGORIES, iter_csv_compact
+from focus_areas import SCORE_COLUMNS, domain_averages
+
+# -------------------------------
+# Synthetic student cohorts for scale testing
+# -------------------------------
+# Writes CSVs with the same schema as dyslexia_focus_areas_20000.csv, at any
+# size. The profile is fitted from a source CSV (streamed, so the source can
+# be large too). It holds:
+#   - the difficulty_level mix;
+#   - per difficulty level, the age distribution;
+#   - per difficulty level, each of the nine scores' distribution over 0-100.
+# Within a difficulty level the scores in the bundled file are uncorrelated
+# (|r| < 0.05), so sampling them independently per class reproduces both the
+# marginals and how separable the classes are. The *_avg columns and the
+# primary/secondary/tertiary focus are derived exactly as in the source:
+# rounded domain means, ranked weakest first with ties in Reading, Writing,
+# Spelling order.
+#
+# Rows are generated and written one chunk at a time, so memory is bounded
+# by --chunk-size. Chunk i uses the generator seeded with (seed, i), so the
+# same seed and chunk size always produce the same file.
+#
+#   python cohort_generator.py students_1m.csv --rows 1000000 --seed 7
+#   python cohort_generator.py students_1m.csv --check      (compare with the source)
+
+DEFAULT_SOURCE = 'dyslexia_focus_areas_20000.csv'
+DEFAULT_CHUNK_SIZE = 250_000
+SCORE_VALUES = 101  # 0..100
+AVG_COLUMNS = ['reading_avg', 'writing_avg', 'spelling_avg']
+FOCUS_COLUMNS = ['primary_focus', 'secondary_focus', 'tertiary_focus']
+
+
+def fit_profile(source=DEFAULT_SOURCE, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Class mix plus per-class age and score distributions (as CDFs) from a CSV"""
+    n_classes = len(DIFFICULTY_CATEGORIES)
+    age_counts = np.zeros((n_classes, 256), dtype=np.int64)
+    score_counts = np.zeros((n_classes, len(SCORE_COLUMNS), SCORE_VALUES), dtype=np.int64)
+    for chunk in iter_csv_compact(source, ['age', *SCORE_COLUMNS, 'difficulty_level'], chunk_size):
+        y = chunk['difficulty_level'].cat.codes.to_numpy(dtype=np.intp)
+        np.add.at(age_counts, (y, chunk['age'].to_numpy(dtype=np.intp)), 1)
+        scores = chunk[SCORE_COLUMNS].to_numpy(dtype=np.intp)
+        for j in range(len(SCORE_COLUMNS)):
+            np.add.at(score_counts[:, j], (y, scores[:, j]), 1)
+
+    class_counts = age_counts.sum(axis=1)
+    if not class_counts.all():
+        missing = [c for c, n in zip(DIFFICULTY_CATEGORIES, class_counts) if n == 0]
+        raise ValueError(f"{source}: no rows for {missing}")
+    ages = np.flatnonzero(age_counts.sum(axis=0))
+    return {
+        'source': os.path.abspath(source),
+        'rows': int(class_counts.sum()),
+        'class_cdf': np.cumsum(class_counts) / class_counts.sum(),
+        'ages': ages,
+        'age_cdf': np.cumsum(age_counts[:, ages], axis=1) / class_counts[:, None],
+        'score_cdf': np.cumsum(score_counts, axis=2) / class_counts[:, None, None],
+    }
+
+
+def _sample(cdf, y, u):
+    """Inverse-CDF sampling with one (n_values,) CDF per class; y picks the class per sample"""
+    out = np.empty(len(y), dtype=np.intp)
+    for k in range(len(cdf)):
+        rows = y == k
+        out[rows] = np.searchsorted(cdf[k], u[rows], side='right')
+    # Guard against the last CDF entry rounding to just below 1
+    return np.minimum(out, cdf.shape[1] - 1)
+
+
+def generate_chunk(profile, n_rows, start_id=1, rng=None):
+    """One DataFrame chunk in the source column order and compact dtypes"""
+    rng = rng or np.random.default_rng()
+    y = _sample(profile['class_cdf'][None, :], np.zeros(n_rows, dtype=np.intp), rng.random(n_rows))
+
+    age_idx = _sample(profile['age_cdf'], y, rng.random(n_rows))
+    scores = np.empty((n_rows, len(SCORE_COLUMNS)), dtype=np.uint8)
+    u = rng.random((n_rows, len(SCORE_COLUMNS)))
+    for j in range(len(SCORE_COLUMNS)):
+        scores[:, j] = _sample(profile['score_cdf'][:, j], y, u[:, j])
+
+    averages = np.rint(domain_averages(scores)).astype(np.uint8)
+    order = np.argsort(averages, axis=1, kind='stable')
+
+    data = {'id': np.arange(start_id, start_id + n_rows, dtype=np.uint32),
+            'age': profile['ages'][age_idx].astype(np.uint8)}
+    data.update({col: scores[:, j] for j, col in enumerate(SCORE_COLUMNS)})
+    data.update({col: averages[:, j] for j, col in enumerate(AVG_COLUMNS)})
+    # Focus categories are in DOMAINS order, so ranking indices are category codes
+    for j, col in enumerate(FOCUS_COLUMNS):
+        data[col] = pd.Categorical.from_codes(order[:, j], dtype=SCHEMA[col])
+    data['difficulty_level'] = pd.Categorical.from_codes(y, dtype=SCHEMA['difficulty_level'])
+    return pd.DataFrame(data, columns=list(SCHEMA))
+
+
+def generate(path, n_rows, seed=0, chunk_size=DEFAULT_CHUNK_SIZE, profile=None, source=DEFAULT_SOURCE):
+    """Stream n_rows synthetic students to `path` (CSV); returns seconds taken"""
+    profile = profile or fit_profile(source)
+    start = time.perf_counter()
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', newline='') as f:
+        for i, offset in enumerate(range(0, n_rows, chunk_size)):
+            rows = min(chunk_size, n_rows - offset)
+            chunk = generate_chunk(profile, rows, offset + 1, np.random.default_rng([seed, i]))
+            chunk.to_csv(f, header=(i == 0), index=False)
+    os.replace(tmp_path, path)
+    return time.perf_counter() - start
+
+
+# -------------------------------
+# Distribution check
+# -------------------------------
+def summarize(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Class mix, per-class score means/stds, and focus-label consistency, streamed"""
+    n_classes = len(DIFFICULTY_CATEGORIES)
+    counts = np.zeros(n_classes, dtype=np.int64)
+    sums = np.zeros((n_classes, len(SCORE_COLUMNS) + 1))
+    sq_sums = np.zeros_like(sums)
+    inconsistent = 0
+    for chunk in iter_csv_compact(path, None, chunk_size):
+        y = chunk['difficulty_level'].cat.codes.to_numpy(dtype=np.intp)
+        values = chunk[['age', *SCORE_COLUMNS]].to_numpy(dtype=np.float64)
+        counts += np.bincount(y, minlength=n_classes)
+        np.add.at(sums, y, values)
+        np.add.at(sq_sums, y, values ** 2)
+        averages = np.rint(domain_averages(chunk[SCORE_COLUMNS].to_numpy()))
+        order = np.argsort(averages, axis=1, kind='stable')
+        codes = np.column_stack([chunk[col].cat.codes.to_numpy() for col in FOCUS_COLUMNS])
+        inconsistent += int(((averages != chunk[AVG_COLUMNS].to_numpy()).any(axis=1)
+                             | (codes != order).any(axis=1)).sum())
+    means = sums / counts[:, None]
+    return {
+        'rows': int(counts.sum()),
+        'class_share': counts / counts.sum(),
+        'means': means,
+        'stds': np.sqrt(np.maximum(sq_sums / counts[:, None] - means ** 2, 0.0)),
+        'inconsistent_rows': inconsistent,
+    }
+
+
+def compare(source, generated):
+    """Print class mix and per-class feature moments side by side; returns the largest mean gap"""
+    expected, actual = summarize(source), summarize(generated)
+    print(f"{'':<10} {'share':>15}   {'max |Δ mean|':>12} {'max |Δ std|':>12}   (source -> generated)")
+    for k, level in enumerate(DIFFICULTY_CATEGORIES):
+        print(f"{level:<10} {expected['class_share'][k]:6.3f} -> {actual['class_share'][k]:6.3f}   "
+              f"{np.abs(expected['means'][k] - actual['means'][k]).max():12.2f} "
+              f"{np.abs(expected['stds'][k] - actual['stds'][k]).max():12.2f}")
+    print(f"Rows: {expected['rows']} -> {actual['rows']}; rows with inconsistent *_avg/focus columns: "
+          f"{actual['inconsistent_rows']}")
+    return float(np.abs(expected['means'] - actual['means']).max())
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic, schema-compatible student cohort CSV")
+    parser.add_argument('output')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows generated per chunk")
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="CSV the distributions are fitted from")
+    parser.add_argument('--check', action='store_true',
+                        help="Only compare an existing output file's distributions with the source")
+    args = parser.parse_args(argv)
+
+    if not args.check:
+        seconds = generate(args.output, args.rows, args.seed, args.chunk_size, source=args.source)
+        size_mb = os.path.getsize(args.output) / 1e6
+        print(f"✓ Wrote {args.rows} rows to {args.output} ({size_mb:.1f} MB) in {seconds:.1f}s "
+              f"({args.rows / seconds:,.0f} rows/s)")
+    compare(args.source, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
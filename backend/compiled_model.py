@@ -0,0 +1,279 @@
+import numpy as np
+
+from model_bundle import read_bundle
+
+# -------------------------------
+# Pure-NumPy evaluator for the exported best model
+# -------------------------------
+# predicting.compile_model_arrays() flattens the winning sklearn estimator
+# and the StandardScaler into plain arrays, stored in a model bundle. This
+# module evaluates those arrays directly, producing class indices and
+# probabilities in one pass without sklearn's per-call validation and dispatch.
+
+KNN_CHUNK_ROWS = 1024
+
+
+def _softmax(raw):
+    raw = raw - raw.max(axis=1, keepdims=True)
+    np.exp(raw, out=raw)
+    raw /= raw.sum(axis=1, keepdims=True)
+    return raw
+
+
+def _expit(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class CompiledModel:
+    """Array-backed replacement for scaler.transform + predict + predict_proba"""
+
+    def __init__(self, arrays, header=None):
+        self.arrays = arrays
+        self.header = header or {}
+        self.metadata = self.header.get('metadata', {})
+        self.checksum = self.header.get('checksum')
+        self.kind = str(arrays['kind'])
+        self.classes = arrays['classes']
+        self.n_classes = len(self.classes)
+        self.scaler_mean = arrays['scaler_mean']
+        self.scaler_scale = arrays['scaler_scale']
+        self.has_proba = bool(arrays['has_proba'])
+
+        evaluators = {
+            'tree_ensemble': self._score_trees,
+            'linear': self._score_linear,
+            'svm': self._score_svm,
+            'knn': self._score_knn,
+        }
+        if self.kind not in evaluators:
+            raise ValueError(f"Unsupported compiled model kind: {self.kind}")
+        self._evaluate = evaluators[self.kind]
+
+    @classmethod
+    def load(cls, path, verify=True):
+        """Memory-map a model bundle written by predicting.save_best_model"""
+        arrays, header = read_bundle(path, verify=verify)
+        return cls(arrays, header)
+
+    def transform(self, features):
+        """Same arithmetic as StandardScaler.transform"""
+        scaled = np.array(features, dtype=np.float64)
+        scaled -= self.scaler_mean
+        scaled /= self.scaler_scale
+        return scaled
+
+    def score(self, features):
+        """Return (class indices, probabilities or None) for raw features"""
+        return self._evaluate(self.transform(features))
+
+    def score_scaled(self, features_scaled):
+        """Return (class indices, probabilities or None) for scaled features"""
+        return self._evaluate(np.asarray(features_scaled, dtype=np.float64))
+
+    # -------------------------------
+    # Random Forest / Gradient Boosting
+    # -------------------------------
+    def _leaf_nodes(self, X):
+        a = self.arrays
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X32 = X.astype(np.float32).astype(np.float64)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(a['tree_roots'], (X.shape[0], len(a['tree_roots']))).copy()
+        # Leaves point back to themselves, so a fixed number of steps suffices
+        for _ in range(int(a['max_depth'])):
+            go_left = X32[rows, a['node_feature'][node]] <= a['node_threshold'][node]
+            node = np.where(go_left, a['node_left'][node], a['node_right'][node])
+        return node
+
+    def _score_trees(self, X):
+        a = self.arrays
+        leaves = self._leaf_nodes(X)
+        values = a['node_value']
+
+        if str(a['aggregation']) == 'mean':
+            # Random Forest: average the per-tree class distributions
+            probs = values[leaves].sum(axis=1) / len(a['tree_roots'])
+            return probs.argmax(axis=1), probs
+
+        # Gradient Boosting: init prediction + learning_rate * per-class tree sums
+        leaf_values = values[leaves, 0] * float(a['learning_rate'])
+        raw = np.tile(a['init_raw'], (X.shape[0], 1))
+        tree_class = a['tree_class']
+        for k in range(raw.shape[1]):
+            raw[:, k] += leaf_values[:, tree_class == k].sum(axis=1)
+
+        if raw.shape[1] == 1:
+            p1 = _expit(raw[:, 0])
+            probs = np.column_stack([1.0 - p1, p1])
+        else:
+            probs = _softmax(raw)
+        return probs.argmax(axis=1), probs
+
+    # -------------------------------
+    # Logistic Regression
+    # -------------------------------
+    def _score_linear(self, X):
+        a = self.arrays
+        decision = X @ a['coef'].T + a['intercept']
+
+        if decision.shape[1] == 1:
+            p1 = _expit(decision[:, 0])
+            return (decision[:, 0] > 0).astype(np.intp), np.column_stack([1.0 - p1, p1])
+
+        pred_idx = decision.argmax(axis=1)
+        if str(a['multi_class']) == 'ovr':
+            probs = _expit(decision)
+            probs /= probs.sum(axis=1, keepdims=True)
+        else:
+            probs = _softmax(decision)
+        return pred_idx, probs
+
+    # -------------------------------
+    # Support Vector Machine (libsvm one-vs-one)
+    # -------------------------------
+    def _kernel(self, X):
+        a = self.arrays
+        sv = a['support_vectors']
+        kernel = str(a['kernel'])
+        gamma = float(a['gamma'])
+        if kernel == 'linear':
+            return X @ sv.T
+        if kernel == 'rbf':
+            sq = (X ** 2).sum(axis=1)[:, None] + a['sv_sq_norm'][None, :] - 2.0 * (X @ sv.T)
+            np.maximum(sq, 0.0, out=sq)
+            return np.exp(-gamma * sq)
+        if kernel == 'poly':
+            return (gamma * (X @ sv.T) + float(a['coef0'])) ** int(a['degree'])
+        if kernel == 'sigmoid':
+            return np.tanh(gamma * (X @ sv.T) + float(a['coef0']))
+        raise ValueError(f"Unsupported SVM kernel: {kernel}")
+
+    def _score_svm(self, X):
+        a = self.arrays
+        K = self._kernel(X)
+        k = self.n_classes
+        starts = np.concatenate([[0], np.cumsum(a['n_support'])])
+        dual_coef = a['dual_coef']
+        intercept = a['intercept']
+
+        n = X.shape[0]
+        dec = np.empty((n, k * (k - 1) // 2))
+        votes = np.zeros((n, k), dtype=np.intp)
+        pair = 0
+        for i in range(k):
+            si = slice(starts[i], starts[i + 1])
+            for j in range(i + 1, k):
+                sj = slice(starts[j], starts[j + 1])
+                dec[:, pair] = K[:, si] @ dual_coef[j - 1, si] + K[:, sj] @ dual_coef[i, sj] + intercept[pair]
+                positive = dec[:, pair] > 0
+                votes[positive, i] += 1
+                votes[~positive, j] += 1
+                pair += 1
+        pred_idx = votes.argmax(axis=1)
+
+        if not self.has_proba:
+            return pred_idx, None
+        return pred_idx, self._svm_probabilities(dec)
+
+    def _svm_probabilities(self, dec):
+        a = self.arrays
+        k = self.n_classes
+        min_prob = 1e-7
+
+        # Platt scaling per class pair (libsvm sigmoid_predict)
+        fApB = dec * a['prob_a'] + a['prob_b']
+        e = np.exp(-np.abs(fApB))
+        pairwise = np.where(fApB >= 0, e / (1.0 + e), 1.0 / (1.0 + e))
+        pairwise = np.clip(pairwise, min_prob, 1 - min_prob)
+
+        r = np.zeros((dec.shape[0], k, k))
+        pair = 0
+        for i in range(k):
+            for j in range(i + 1, k):
+                r[:, i, j] = pairwise[:, pair]
+                r[:, j, i] = 1 - pairwise[:, pair]
+                pair += 1
+
+        if k == 2:
+            return np.column_stack([r[:, 0, 1], r[:, 1, 0]])
+        return _pairwise_coupling(r)
+
+    # -------------------------------
+    # K-Nearest Neighbors (brute force)
+    # -------------------------------
+    def _score_knn(self, X):
+        pred_idx = np.empty(X.shape[0], dtype=np.intp)
+        probs = np.empty((X.shape[0], self.n_classes))
+        for start in range(0, X.shape[0], KNN_CHUNK_ROWS):
+            stop = start + KNN_CHUNK_ROWS
+            pred_idx[start:stop], probs[start:stop] = self._score_knn_chunk(X[start:stop])
+        return pred_idx, probs
+
+    def _score_knn_chunk(self, X):
+        a = self.arrays
+        fit_X = a['fit_X']
+        n_neighbors = int(a['n_neighbors'])
+        p = float(a['p'])
+
+        if p == 2:
+            dist = (X ** 2).sum(axis=1)[:, None] + a['fit_sq_norm'][None, :] - 2.0 * (X @ fit_X.T)
+            np.maximum(dist, 0.0, out=dist)
+            np.sqrt(dist, out=dist)
+        else:
+            dist = (np.abs(X[:, None, :] - fit_X[None, :, :]) ** p).sum(axis=2) ** (1.0 / p)
+
+        rows = np.arange(X.shape[0])[:, None]
+        neigh = np.argpartition(dist, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        neigh_dist = dist[rows, neigh]
+
+        if str(a['weights']) == 'distance':
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / neigh_dist
+            exact = np.isinf(weights)
+            exact_rows = exact.any(axis=1)
+            weights[exact_rows] = exact[exact_rows]
+        else:
+            weights = np.ones_like(neigh_dist)
+
+        probs = np.zeros((X.shape[0], self.n_classes))
+        np.add.at(probs, (np.broadcast_to(rows, neigh.shape), a['fit_y'][neigh]), weights)
+        probs /= probs.sum(axis=1, keepdims=True)
+        return probs.argmax(axis=1), probs
+
+
+def _pairwise_coupling(r):
+    """Vectorized libsvm multiclass_probability (Wu, Lin & Weng, method 2)"""
+    n, k, _ = r.shape
+    Q = np.zeros((n, k, k))
+    for t in range(k):
+        for j in range(k):
+            if j != t:
+                Q[:, t, t] += r[:, j, t] ** 2
+        for j in range(k):
+            if j != t:
+                Q[:, t, j] = -r[:, j, t] * r[:, t, j]
+
+    p = np.full((n, k), 1.0 / k)
+    active = np.ones(n, dtype=bool)
+    eps = 0.005 / k
+    for _ in range(max(100, k)):
+        Qa, pa = Q[active], p[active]
+        Qp = np.einsum('ntj,nj->nt', Qa, pa)
+        pQp = (pa * Qp).sum(axis=1)
+        converged = np.abs(Qp - pQp[:, None]).max(axis=1) < eps
+
+        idx = np.flatnonzero(active)
+        active[idx[converged]] = False
+        if not active.any():
+            break
+
+        keep = ~converged
+        Qa, pa, Qp, pQp = Qa[keep], pa[keep], Qp[keep], pQp[keep]
+        for t in range(k):
+            diff = (-Qp[:, t] + pQp) / Qa[:, t, t]
+            pa[:, t] += diff
+            pQp = (pQp + diff * (diff * Qa[:, t, t] + 2 * Qp[:, t])) / (1 + diff) / (1 + diff)
+            Qp = (Qp + diff[:, None] * Qa[:, t, :]) / (1 + diff)[:, None]
+            pa /= (1 + diff)[:, None]
+        p[idx[keep]] = pa
+    return p
@@ -0,0 +1,296 @@
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Compact, cached columnar loader for the training CSV
+# -------------------------------
+# The CSV is parsed with an explicit schema: bounded 0-100 scores and age as
+# uint8, the id as uint32, focus/difficulty labels as categoricals, and only
+# the columns asked for. Each parsed column is written to
+# <cache_dir>/<key>/<column>.npy (categoricals as int8 codes plus their
+# categories in meta.json); later runs memory-map those files instead of
+# parsing text, and a request for columns the entry lacks parses just those.
+# The key covers the CSV name, size and mtime and the schema version, so an
+# edited file is re-converted and its older entries are deleted.
+
+SCHEMA_VERSION = 1
+DEFAULT_CACHE_DIR = '.dataset_cache'
+
+SCORE_COLUMNS = [
+    'reading_speed', 'reading_accuracy', 'reading_comprehension',
+    'writing_speed', 'writing_quality', 'grammar_sentence',
+    'phonetic_spelling', 'irregular_word_spelling', 'spelling_accuracy',
+    'reading_avg', 'writing_avg', 'spelling_avg',
+]
+FOCUS_CATEGORIES = ['Reading', 'Writing', 'Spelling']
+DIFFICULTY_CATEGORIES = ['Mild', 'Moderate', 'Profound', 'Severe']
+
+SCHEMA = {
+    'id': np.uint32,
+    'age': np.uint8,
+    **{col: np.uint8 for col in SCORE_COLUMNS},
+    'primary_focus': pd.CategoricalDtype(FOCUS_CATEGORIES),
+    'secondary_focus': pd.CategoricalDtype(FOCUS_CATEGORIES),
+    'tertiary_focus': pd.CategoricalDtype(FOCUS_CATEGORIES),
+    'difficulty_level': pd.CategoricalDtype(DIFFICULTY_CATEGORIES),
+}
+# Bounded integer columns are range-checked before narrowing
+BOUNDS = {'age': (0, 255), **{col: (0, 100) for col in SCORE_COLUMNS}}
+
+
+def _cache_key(path):
+    stat = os.stat(path)
+    return f"{os.path.basename(path)}-{stat.st_size}-{stat.st_mtime_ns}-v{SCHEMA_VERSION}"
+
+
+def csv_columns(path):
+    """Schema columns present in the CSV header, in schema order"""
+    header = set(pd.read_csv(path, nrows=0).columns)
+    return [col for col in SCHEMA if col in header]
+
+
+def iter_csv_compact(path, columns=None, chunksize=200_000):
+    """Yield compact DataFrame chunks of the CSV parsed with the explicit schema"""
+    columns = columns or csv_columns(path)
+    # Integers are parsed wide and narrowed after the range check
+    parse_dtypes = {col: (np.int64 if col in BOUNDS else SCHEMA[col]) for col in columns}
+    for chunk in pd.read_csv(path, usecols=columns, dtype=parse_dtypes, chunksize=chunksize):
+        for col, (low, high) in BOUNDS.items():
+            if col in chunk.columns:
+                values = chunk[col]
+                if values.min() < low or values.max() > high:
+                    raise ValueError(f"{path}: {col} outside [{low}, {high}]")
+                chunk[col] = values.astype(SCHEMA[col])
+        for col, dtype in parse_dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype) and chunk[col].isna().any():
+                raise ValueError(f"{path}: unexpected label in {col} (allowed: {list(dtype.categories)})")
+        yield chunk[columns]
+
+
+def read_csv_compact(path, columns=None, chunksize=200_000):
+    """Parse the CSV with the explicit schema, only `columns` (default: every schema column it has)"""
+    return pd.concat(iter_csv_compact(path, columns, chunksize), ignore_index=True)
+
+
+def _read_meta(entry):
+    try:
+        with open(os.path.join(entry, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def evict_stale_entries(path, cache_dir=DEFAULT_CACHE_DIR):
+    """Delete cache entries of `path` other than the one for its current size/mtime/schema"""
+    current = _cache_key(path)
+    prefix = f"{os.path.basename(path)}-"
+    source = os.path.abspath(path)
+    removed = []
+    for name in os.listdir(cache_dir) if os.path.isdir(cache_dir) else []:
+        entry = os.path.join(cache_dir, name)
+        if name == current or not name.startswith(prefix) or not os.path.isdir(entry):
+            continue
+        meta = _read_meta(entry)
+        # A different file with the same name keeps its entry
+        if meta is not None and meta.get("source") != source:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        removed.append(entry)
+    return removed
+
+
+def convert_to_cache(path, columns=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Parse `columns` (default: every schema column in the CSV) and add one .npy per
+    column to the file's cache entry; returns the entry directory"""
+    target = os.path.join(cache_dir, _cache_key(path))
+    meta = _read_meta(target)
+    if meta is None:
+        evict_stale_entries(path, cache_dir)
+        os.makedirs(target, exist_ok=True)
+        meta = {"source": os.path.abspath(path), "rows": None, "schema_version": SCHEMA_VERSION, "columns": {}}
+
+    missing = [col for col in columns or csv_columns(path) if col not in meta["columns"]]
+    if not missing:
+        return target
+    df = read_csv_compact(path, missing)
+    if meta["rows"] is not None and len(df) != meta["rows"]:
+        raise ValueError(f"{path}: {len(df)} rows parsed but the cache entry has {meta['rows']}")
+    meta["rows"] = len(df)
+    # Column files and meta.json are written under temporary names and renamed,
+    # so a reader never sees a column meta.json does not list yet
+    for col in df.columns:
+        series = df[col]
+        tmp = os.path.join(target, f'{col}.tmp.npy')
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(tmp, series.cat.codes.to_numpy(dtype=np.int8))
+            meta["columns"][col] = {"categories": list(series.cat.categories)}
+        else:
+            np.save(tmp, series.to_numpy())
+            meta["columns"][col] = {"dtype": series.dtype.str}
+        os.replace(tmp, os.path.join(target, f'{col}.npy'))
+    tmp = os.path.join(target, 'meta.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(target, 'meta.json'))
+    return target
+
+
+def load_columns(path, columns=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Memory-mapped column arrays (categoricals as int8 codes) plus the cache metadata;
+    columns missing from the cache entry are parsed and added first"""
+    entry = os.path.join(cache_dir, _cache_key(path))
+    meta = _read_meta(entry)
+    columns = columns or csv_columns(path)
+    if meta is None or any(col not in meta["columns"] for col in columns):
+        convert_to_cache(path, columns, cache_dir)
+        meta = _read_meta(entry)
+    arrays = {col: np.load(os.path.join(entry, f'{col}.npy'), mmap_mode='r') for col in columns}
+    return arrays, meta
+
+
+def load_dataset(path, columns=None, cache_dir=DEFAULT_CACHE_DIR):
+    """Compact DataFrame (uint8 scores, categorical labels) backed by the column cache"""
+    arrays, meta = load_columns(path, columns, cache_dir)
+    data = {}
+    for col, values in arrays.items():
+        categories = meta["columns"][col].get("categories")
+        if categories is not None:
+            data[col] = pd.Categorical.from_codes(values, categories=categories)
+        else:
+            data[col] = values
+    return pd.DataFrame(data)
+
+
+# -------------------------------
+# Served predictions as an extra data source
+# -------------------------------
+# The API's prediction log (prediction_log.py) stores every scored feature
+# vector with the model's class probabilities. These rows come back in the
+# same compact schema as the CSV, labelled with the predicted class, so they
+# can be appended to the training data. Rows below `min_confidence` (highest
+# class probability) and rows whose features fall outside the CSV's bounds
+# are skipped.
+LOG_COLUMNS = ['confidence', 'model_version', 'timestamp']
+
+
+def iter_prediction_log(directory, columns=None, min_confidence=0.0):
+    """Yield one compact DataFrame per prediction log segment"""
+    from prediction_log import log_segments, read_segment
+
+    for path in log_segments(directory):
+        segment = read_segment(path)
+        feature_columns = [str(c) for c in segment['feature_columns']]
+        features = segment['features']
+        confidence = np.nanmax(segment['probabilities'], axis=1, initial=0.0)
+        label = pd.Categorical(segment['predicted_class'].astype(str), dtype=SCHEMA['difficulty_level'])
+        keep = (confidence >= min_confidence) & ~label.isna() & np.isfinite(features).all(axis=1)
+        for j, col in enumerate(feature_columns):
+            if col in BOUNDS:
+                low, high = BOUNDS[col]
+                keep &= (features[:, j] >= low) & (features[:, j] <= high)
+
+        # Bounded columns are narrowed to the CSV's dtypes so both sources concatenate compactly
+        data = {col: (np.rint(features[keep, j]).astype(SCHEMA[col]) if col in BOUNDS else features[keep, j])
+                for j, col in enumerate(feature_columns)}
+        data.update({'difficulty_level': label[keep], 'confidence': confidence[keep],
+                     'model_version': segment['model_version'][keep].astype(str),
+                     'timestamp': segment['timestamp'][keep]})
+        df = pd.DataFrame(data)
+        yield df[columns] if columns else df
+
+
+def load_prediction_log(directory, columns=None, min_confidence=0.0):
+    """All prediction log segments as one DataFrame (predicted class as difficulty_level)"""
+    frames = list(iter_prediction_log(directory, columns, min_confidence))
+    if not frames:
+        return pd.DataFrame({col: pd.Series(dtype=SCHEMA.get(col, np.float64)) for col in (columns or [])})
+    return pd.concat(frames, ignore_index=True)
+
+
+# -------------------------------
+# Benchmark: default pandas parse vs compact loader
+# -------------------------------
+# Each path runs in a fresh interpreter so peak RSS is measured in isolation;
+# imports happen before the clock starts and the RSS figure is the growth of
+# the peak over the post-import baseline.
+_BENCH_CODE = {
+    'pandas_default': "df = pd.read_csv({path!r})",
+    'compact_parse': "df = d.read_csv_compact({path!r})",
+    'compact_cached': "df = d.load_dataset({path!r}, cache_dir={cache!r})",
+}
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process in kB"""
+    # ru_maxrss survives fork+exec on Linux (a child starts at its parent's
+    # peak), so prefer the per-address-space high-water mark when available
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _make_scaled_copy(path, scale, directory):
+    """The dataset repeated `scale` times, to see how each path grows with row count"""
+    scaled = os.path.join(directory, f'scaled_x{scale}.csv')
+    with open(path) as src, open(scaled, 'w') as out:
+        header = src.readline()
+        body = src.read()
+        out.write(header)
+        for _ in range(scale):
+            out.write(body)
+    return scaled
+
+
+def benchmark(path='dyslexia_focus_areas_20000.csv', runs=3, scale=1):
+    import subprocess
+    import tempfile
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    workdir = tempfile.mkdtemp(prefix='dataset_bench_')
+    try:
+        if scale > 1:
+            path = _make_scaled_copy(path, scale, workdir)
+        cache = os.path.join(workdir, 'cache')
+        convert_start = time.perf_counter()
+        convert_to_cache(path, cache_dir=cache)
+        print(f"Loading {path} ({os.path.getsize(path) / 1e6:.1f} MB), median of {runs} runs "
+              f"(one-time conversion {time.perf_counter() - convert_start:.2f}s)")
+        for name, body in _BENCH_CODE.items():
+            code = ("import time, json; import pandas as pd; import dataset_loader as d; "
+                    "base = d.peak_rss_kb(); t = time.perf_counter(); "
+                    + body.format(path=os.path.abspath(path), cache=cache)
+                    + "; elapsed = time.perf_counter() - t; "
+                      "print(json.dumps([elapsed, d.peak_rss_kb() - base, int(df.memory_usage(deep=True).sum())]))")
+            samples = []
+            for _ in range(runs):
+                out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                     check=True, cwd=here)
+                samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+            elapsed, peak_kb, frame_bytes = sorted(samples)[len(samples) // 2]
+            print(f"  {name:<16} {elapsed * 1000:8.1f} ms   peak RSS +{peak_kb / 1024:7.1f} MB   "
+                  f"DataFrame {frame_bytes / 1e6:7.2f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark CSV loading: pandas defaults vs the compact cache")
+    parser.add_argument('path', nargs='?', default='dyslexia_focus_areas_20000.csv')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--scale', type=int, default=1, help="Repeat the dataset this many times first")
+    args = parser.parse_args()
+    benchmark(args.path, args.runs, args.scale)
@@ -0,0 +1,222 @@
+import threading
+
+import numpy as np
+
+# -------------------------------
+# Constant-memory input drift monitor
+# -------------------------------
+# A DriftSketch summarises a stream of (N, 10) feature rows and predicted
+# classes in fixed-size arrays:
+#   - per feature, a 20-bin histogram over its range, plus under- and
+#     overflow bins (scores use 0-100; age uses 0-20);
+#   - per feature, a running count, sum and sum of squares;
+#   - counts of predicted classes.
+# predicting.py builds the reference sketch from the training data and
+# stores it in the model bundle as drift_* arrays (a <model>_drift.npz next
+# to legacy pickles). The API folds every scored row into a live sketch. The
+# live sketch covers the last one to two windows of DRIFT_WINDOW_ROWS rows:
+# when the current window fills up, the previous one is dropped. That keeps
+# memory constant and makes the scores follow recent traffic. Updates cost
+# O(rows x features) with a fixed number of bins.
+#
+# Drift per feature is the population stability index (PSI) of live vs
+# reference histograms, plus the mean shift in reference standard
+# deviations. The predicted-class mix gets a PSI too. PSI < 0.1 is stable,
+# 0.1-0.25 moderate, and above 0.25 significant.
+
+N_BINS = 20
+FEATURE_RANGES = {'age': (0.0, 20.0)}
+DEFAULT_RANGE = (0.0, 100.0)
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+MIN_ROWS = 200
+
+
+class DriftSketch:
+    """Fixed-bin histograms, running moments and a predicted-class histogram"""
+
+    def __init__(self, ranges, n_classes, n_bins=N_BINS):
+        self.ranges = np.asarray(ranges, dtype=np.float64)
+        self.n_bins = n_bins
+        n_features = len(self.ranges)
+        self.counts = np.zeros((n_features, n_bins + 2), dtype=np.int64)
+        self.n = 0
+        self.sums = np.zeros(n_features)
+        self.sq_sums = np.zeros(n_features)
+        self.class_counts = np.zeros(n_classes, dtype=np.int64)
+        self._width = (self.ranges[:, 1] - self.ranges[:, 0]) / n_bins
+        self._offsets = np.arange(n_features) * (n_bins + 2)
+
+    @classmethod
+    def for_features(cls, feature_columns, n_classes, n_bins=N_BINS):
+        return cls([FEATURE_RANGES.get(col, DEFAULT_RANGE) for col in feature_columns], n_classes, n_bins)
+
+    def update(self, features, class_idx=None):
+        """Fold an (N, n_features) matrix (and its predicted class indices) into the sketch"""
+        features = np.asarray(features, dtype=np.float64)
+        finite = np.isfinite(features).all(axis=1)
+        if not finite.all():
+            features = features[finite]
+        # Bin 0 is underflow and bin n_bins + 1 overflow; the top edge belongs to the last bin
+        bins = np.floor((features - self.ranges[:, 0]) / self._width).astype(np.intp) + 1
+        bins = np.where(features == self.ranges[:, 1], self.n_bins, bins)
+        np.clip(bins, 0, self.n_bins + 1, out=bins)
+        self.counts += np.bincount((bins + self._offsets).ravel(),
+                                   minlength=self.counts.size).reshape(self.counts.shape)
+        self.n += len(features)
+        self.sums += features.sum(axis=0)
+        self.sq_sums += (features ** 2).sum(axis=0)
+        if class_idx is not None:
+            self.class_counts += np.bincount(np.asarray(class_idx, dtype=np.intp),
+                                             minlength=len(self.class_counts))
+
+    def merge(self, other):
+        merged = DriftSketch(self.ranges, len(self.class_counts), self.n_bins)
+        merged.counts = self.counts + other.counts
+        merged.n = self.n + other.n
+        merged.sums = self.sums + other.sums
+        merged.sq_sums = self.sq_sums + other.sq_sums
+        merged.class_counts = self.class_counts + other.class_counts
+        return merged
+
+    def moments(self):
+        """(mean, std) per feature"""
+        if not self.n:
+            return np.full(len(self.sums), np.nan), np.full(len(self.sums), np.nan)
+        mean = self.sums / self.n
+        return mean, np.sqrt(np.maximum(self.sq_sums / self.n - mean ** 2, 0.0))
+
+    def to_arrays(self, prefix='drift_'):
+        """Arrays for a model bundle (or an .npz next to the legacy pickles)"""
+        return {
+            f'{prefix}ranges': self.ranges,
+            f'{prefix}counts': self.counts,
+            f'{prefix}n': np.array([self.n], dtype=np.int64),
+            f'{prefix}sums': self.sums,
+            f'{prefix}sq_sums': self.sq_sums,
+            f'{prefix}class_counts': self.class_counts,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix='drift_'):
+        """Sketch from to_arrays() output, or None when the artifact has no reference"""
+        if f'{prefix}counts' not in arrays:
+            return None
+        counts = np.asarray(arrays[f'{prefix}counts'])
+        sketch = cls(arrays[f'{prefix}ranges'], len(arrays[f'{prefix}class_counts']), counts.shape[1] - 2)
+        sketch.counts = counts.astype(np.int64)
+        sketch.n = int(np.asarray(arrays[f'{prefix}n']).ravel()[0])
+        sketch.sums = np.array(arrays[f'{prefix}sums'], dtype=np.float64)
+        sketch.sq_sums = np.array(arrays[f'{prefix}sq_sums'], dtype=np.float64)
+        sketch.class_counts = np.array(arrays[f'{prefix}class_counts'], dtype=np.int64)
+        return sketch
+
+
+def psi(expected_counts, actual_counts, eps=1e-4):
+    """Population stability index between two histograms (last axis = bins)"""
+    expected = np.asarray(expected_counts, dtype=np.float64)
+    actual = np.asarray(actual_counts, dtype=np.float64)
+    expected = np.maximum(expected / expected.sum(axis=-1, keepdims=True), eps)
+    actual = np.maximum(actual / np.maximum(actual.sum(axis=-1, keepdims=True), 1), eps)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=-1)
+
+
+def _status(value):
+    if value is None or not np.isfinite(value):
+        return 'unknown'
+    if value >= PSI_SIGNIFICANT:
+        return 'significant'
+    return 'moderate' if value >= PSI_MODERATE else 'stable'
+
+
+class DriftMonitor:
+    """Live sketches over recent traffic, scored against the active model's reference"""
+
+    def __init__(self, feature_columns, window_rows=5000, min_rows=MIN_ROWS):
+        self.feature_columns = list(feature_columns)
+        self.window_rows = window_rows
+        self.min_rows = min_rows
+        self.reference = None
+        self.classes = []
+        self.model_version = None
+        self.total_rows = 0
+        self._class_index = {}
+        self._current = self._previous = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _new_sketch(self):
+        if self.reference is not None:
+            return DriftSketch(self.reference.ranges, len(self.reference.class_counts), self.reference.n_bins)
+        return DriftSketch.for_features(self.feature_columns, max(len(self.classes), 1))
+
+    def _reset(self):
+        self._current = self._new_sketch()
+        self._previous = None
+
+    def bind(self, model_version, reference, classes):
+        """Switch to a model version's reference; live sketches restart"""
+        with self._lock:
+            if model_version == self.model_version:
+                return
+            self.model_version = model_version
+            self.reference = reference
+            self.classes = [str(c) for c in classes]
+            self._class_index = {c: i for i, c in enumerate(self.classes)}
+            self.total_rows = 0
+            self._reset()
+
+    def observe(self, features, pred_classes):
+        """Fold a scored matrix and its predicted class names into the live window"""
+        class_idx = [self._class_index.get(str(c), -1) for c in pred_classes]
+        class_idx = [i for i in class_idx if i >= 0]
+        with self._lock:
+            self._current.update(features, class_idx)
+            self.total_rows += len(features)
+            if self._current.n >= self.window_rows:
+                self._previous, self._current = self._current, self._new_sketch()
+
+    def live(self):
+        with self._lock:
+            previous = self._previous if self._previous is not None else self._new_sketch()
+            return self._current.merge(previous)
+
+    def report(self):
+        live = self.live()
+        summary = {
+            "model_version": self.model_version,
+            "reference_rows": int(self.reference.n) if self.reference is not None else 0,
+            "live_rows": int(live.n),
+            "total_rows_observed": self.total_rows,
+            "window_rows": self.window_rows,
+            "thresholds": {"moderate": PSI_MODERATE, "significant": PSI_SIGNIFICANT},
+        }
+        if self.reference is None:
+            return {**summary, "status": "no_reference", "features": {}, "predicted_class_mix": None}
+        if live.n < self.min_rows:
+            return {**summary, "status": "insufficient_data", "features": {}, "predicted_class_mix": None}
+
+        feature_psi = psi(self.reference.counts, live.counts)
+        ref_mean, ref_std = self.reference.moments()
+        live_mean, live_std = live.moments()
+        shift = (live_mean - ref_mean) / np.where(ref_std > 0, ref_std, 1.0)
+        features = {
+            col: {"psi": round(float(feature_psi[j]), 4), "status": _status(feature_psi[j]),
+                  "mean": round(float(live_mean[j]), 3), "reference_mean": round(float(ref_mean[j]), 3),
+                  "std": round(float(live_std[j]), 3), "reference_std": round(float(ref_std[j]), 3),
+                  "mean_shift_sd": round(float(shift[j]), 3)}
+            for j, col in enumerate(self.feature_columns)
+        }
+        class_mix = None
+        if live.class_counts.sum():
+            class_psi = float(psi(self.reference.class_counts, live.class_counts))
+            class_mix = {
+                "psi": round(class_psi, 4), "status": _status(class_psi),
+                "live": {c: round(float(n / live.class_counts.sum()), 4)
+                         for c, n in zip(self.classes, live.class_counts)},
+                "reference": {c: round(float(n / self.reference.class_counts.sum()), 4)
+                              for c, n in zip(self.classes, self.reference.class_counts)},
+            }
+        worst = max([f["psi"] for f in features.values()] + ([class_mix["psi"]] if class_mix else []))
+        return {**summary, "status": _status(worst), "max_psi": worst,
+                "features": features, "predicted_class_mix": class_mix}
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+
+import numpy as np
+from sklearn.metrics import auc, confusion_matrix, precision_recall_curve, roc_curve
+
+# -------------------------------
+# Shared evaluation artifacts and parallel figure rendering
+# -------------------------------
+# ModelEvaluation computes each test-set artifact of one model once, on first
+# use. The metrics, classification report, confusion-matrix figure,
+# confidence curves, ROC and PR figures all read from the same object.
+# Predictions and probabilities are also stored in the model's TrainingCache
+# entry, so a cached rerun does not call predict/predict_proba at all. New
+# fields are collected and written with save(), one entry rewrite per model.
+#
+# Figures are plain functions of small picklable inputs (metric dicts,
+# curves, probability arrays). They render in a process pool, one figure per
+# task, and each task closes its figure afterwards.
+
+
+class ModelEvaluation:
+    """Lazily computed, memoised test-set artifacts for one fitted model"""
+
+    def __init__(self, model, X_test, y_test, n_classes, cache=None, cache_key=None, name=None):
+        self.model = model
+        self.X_test = X_test
+        self.y_test = y_test
+        self.n_classes = n_classes
+        self.cache = cache
+        self.cache_key = cache_key
+        self.name = name
+        self._entry = cache.read(cache_key) if cache is not None else None
+        self._pending = {}
+
+    def _cached(self, field, compute):
+        if self._entry is not None and field in self._entry:
+            return self._entry[field]
+        value = compute()
+        if self.cache is not None:
+            self._pending[field] = value
+        return value
+
+    def save(self):
+        """Write the fields computed since the last save to the cache entry (one rewrite)"""
+        if self.cache is None or not self._pending:
+            return
+        self._entry = {**(self._entry or {}), **self._pending}
+        self._pending = {}
+        self.cache.store(self.cache_key, self.name, self._entry)
+
+    @property
+    def has_proba(self):
+        return hasattr(self.model, 'predict_proba')
+
+    @cached_property
+    def predictions(self):
+        return self._cached('test_predictions', lambda: self.model.predict(self.X_test))
+
+    @cached_property
+    def probabilities(self):
+        """(n_test, n_classes) predict_proba output, or None for models without it"""
+        if not self.has_proba:
+            return None
+        return self._cached('test_probabilities', lambda: self.model.predict_proba(self.X_test))
+
+    @cached_property
+    def confusion_matrix(self):
+        return confusion_matrix(self.y_test, self.predictions, labels=np.arange(self.n_classes))
+
+    @cached_property
+    def _one_vs_rest(self):
+        return self.y_test[:, None] == np.arange(self.n_classes)[None, :]
+
+    @cached_property
+    def roc_curves(self):
+        """Per class: (fpr, tpr, auc)"""
+        if self.probabilities is None:
+            return None
+        curves = []
+        for i in range(self.n_classes):
+            fpr, tpr, _ = roc_curve(self._one_vs_rest[:, i], self.probabilities[:, i])
+            curves.append((fpr, tpr, auc(fpr, tpr)))
+        return curves
+
+    @cached_property
+    def pr_curves(self):
+        """Per class: (precision, recall)"""
+        if self.probabilities is None:
+            return None
+        curves = []
+        for i in range(self.n_classes):
+            precision, recall, _ = precision_recall_curve(self._one_vs_rest[:, i], self.probabilities[:, i])
+            curves.append((precision, recall))
+        return curves
+
+
+def _render(fn, args):
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    fn(*args)
+    plt.close('all')
+    return time.perf_counter() - start
+
+
+def render_figures(tasks, n_jobs=None):
+    """Run {name: (plot function, args)} in a process pool; returns {name: seconds}"""
+    if not tasks:
+        return {}
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(tasks) == 1:
+        return {name: _render(fn, args) for name, (fn, args) in tasks.items()}
+    # spawn: the parent may hold BLAS/OpenMP threads from training
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks)),
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {name: pool.submit(_render, fn, args) for name, (fn, args) in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,115 @@
+import numpy as np
+
+# -------------------------------
+# Vectorized focus-area ranking (shared by training and the API)
+# -------------------------------
+# Input is an (N, 9) score matrix in training column order:
+#   reading_speed, reading_accuracy, reading_comprehension,
+#   writing_speed, writing_quality, grammar_sentence,
+#   phonetic_spelling, irregular_word_spelling, spelling_accuracy
+# Output ranks Reading/Writing/Spelling from weakest to strongest for every row.
+
+DOMAINS = np.array(['Reading', 'Writing', 'Spelling'])
+
+SCORE_COLUMNS = [
+    'reading_speed', 'reading_accuracy', 'reading_comprehension',
+    'writing_speed', 'writing_quality', 'grammar_sentence',
+    'phonetic_spelling', 'irregular_word_spelling', 'spelling_accuracy'
+]
+# Model input order, shared by training, the API, bulk scoring and the benchmark
+FEATURE_COLUMNS = ['age', *SCORE_COLUMNS]
+
+
+def domain_averages(scores):
+    """(N, 9) scores -> (N, 3) Reading/Writing/Spelling averages"""
+    scores = np.asarray(scores, dtype=np.float64).reshape(-1, 3, 3)
+    # Same left-to-right sum and divide as np.mean over three values
+    return (scores[:, :, 0] + scores[:, :, 1] + scores[:, :, 2]) / 3.0
+
+
+def rank_focus_areas(scores):
+    """Return (averages, order) where order[:, 0] is the primary focus index.
+
+    A stable argsort keeps ties in Reading, Writing, Spelling order, exactly
+    like sorted() over the {Reading, Writing, Spelling} dict.
+    """
+    averages = domain_averages(scores)
+    order = np.argsort(averages, axis=1, kind='stable')
+    return averages, order
+
+
+def focus_area_records(scores):
+    """Per-row [{"name", "score"}, ...] lists, weakest domain first"""
+    averages, order = rank_focus_areas(scores)
+    ranked = np.round(np.take_along_axis(averages, order, axis=1), 2).tolist()
+    names = DOMAINS[order].tolist()
+    return [
+        [{"name": name, "score": score} for name, score in zip(row_names, row_scores)]
+        for row_names, row_scores in zip(names, ranked)
+    ]
+
+
+def add_focus_columns(df):
+    """Fill *_avg and primary/secondary/tertiary_focus columns from raw scores"""
+    averages, order = rank_focus_areas(df[SCORE_COLUMNS].to_numpy())
+    df['reading_avg'] = averages[:, 0]
+    df['writing_avg'] = averages[:, 1]
+    df['spelling_avg'] = averages[:, 2]
+    ranked_names = DOMAINS[order]
+    df['primary_focus'] = ranked_names[:, 0]
+    df['secondary_focus'] = ranked_names[:, 1]
+    df['tertiary_focus'] = ranked_names[:, 2]
+    return df
+
+
+# -------------------------------
+# Benchmark against the per-row sorted() implementation
+# -------------------------------
+def _reference_focus_areas(row):
+    """Original per-request implementation from main.get_focus_areas"""
+    areas = {
+        "Reading": np.mean([row[0], row[1], row[2]]),
+        "Writing": np.mean([row[3], row[4], row[5]]),
+        "Spelling": np.mean([row[6], row[7], row[8]])
+    }
+    sorted_areas = sorted(areas.items(), key=lambda x: x[1])
+    return [{"name": name, "score": round(score, 2)} for name, score in sorted_areas]
+
+
+def benchmark(sizes=(1, 1_000, 1_000_000), max_reference_rows=100_000, seed=42):
+    """Time the vectorized engine against the per-row loop at several sizes"""
+    import time
+
+    rng = np.random.default_rng(seed)
+    print("="*70)
+    print("FOCUS-AREA RANKING BENCHMARK")
+    print("="*70)
+    print(f"{'Rows':>10} {'Loop (s)':>12} {'Rank (s)':>12} {'Records (s)':>12} {'Speedup':>10}")
+
+    for n in sizes:
+        # Small integer scores produce plenty of ties, which exercises ordering
+        scores = rng.integers(0, 101, size=(n, 9)).astype(np.float64)
+
+        start = time.perf_counter()
+        rank_focus_areas(scores)
+        rank = time.perf_counter() - start
+
+        # Ranking plus building the JSON-ready dicts the API returns
+        start = time.perf_counter()
+        records = focus_area_records(scores)
+        vectorized = time.perf_counter() - start
+
+        n_ref = min(n, max_reference_rows)
+        start = time.perf_counter()
+        reference = [_reference_focus_areas(row) for row in scores[:n_ref]]
+        loop = (time.perf_counter() - start) * n / n_ref
+
+        if records[:n_ref] != reference:
+            raise AssertionError("Vectorized ranking disagrees with the sorted() reference")
+
+        note = "" if n_ref == n else f"  (loop extrapolated from {n_ref} rows)"
+        print(f"{n:>10} {loop:>12.4f} {rank:>12.4f} {vectorized:>12.4f} {loop / vectorized:>9.1f}x{note}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy.stats import loguniform
+from sklearn.base import clone
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+
+# -------------------------------
+# Budgeted successive-halving search over the five model families
+# -------------------------------
+# Each family draws `n_candidates` configurations from its space. Rung 0
+# scores every candidate with 3-fold CV (weighted F1, the metric
+# save_best_model ranks by) on a small stratified subsample. Each rung keeps
+# the best 1/eta and multiplies the sample size by eta until the last rung
+# uses the whole training set. All families advance together and every
+# (candidate, fold) fit of a rung runs in one parallel batch.
+#
+# Every evaluation is appended to a JSONL log. A rerun with the same data
+# and seed re-samples the same candidates and reuses logged scores, so an
+# interrupted or over-budget search resumes where it stopped.
+
+SEARCH_SPACES = {
+    'Random Forest': {
+        'n_estimators': [100, 150, 250, 400],
+        'max_depth': [6, 8, 10, 14, None],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': ['sqrt', 'log2', 0.5],
+    },
+    'SVM': {
+        'C': loguniform(0.1, 30.0),
+        'gamma': ['scale', 0.01, 0.03, 0.1, 0.3],
+    },
+    'Logistic Regression': {
+        'C': loguniform(0.01, 100.0),
+    },
+    'Gradient Boosting': {
+        'n_estimators': [100, 150, 250],
+        'learning_rate': [0.03, 0.05, 0.08, 0.12, 0.2],
+        'max_depth': [3, 4, 5, 6],
+        'min_samples_leaf': [1, 3, 5],
+        'subsample': [0.7, 0.85, 1.0],
+    },
+    'K-Nearest Neighbors': {
+        'n_neighbors': list(range(3, 32, 2)),
+        'weights': ['uniform', 'distance'],
+        'p': [1, 2],
+    },
+}
+
+# Applied only while searching: SVC.predict does not use the Platt model, so
+# skipping its internal 5-fold calibration leaves F1 unchanged and saves time.
+# The folds already run in parallel, so the forest builds its trees serially.
+SEARCH_ONLY_PARAMS = {'SVM': {'probability': False}, 'Random Forest': {'n_jobs': 1}}
+
+# Written to the working directory (both are git-ignored) so --params can find them
+DEFAULT_LOG = 'search_results.jsonl'
+DEFAULT_BEST = 'best_hyperparameters.json'
+
+
+def _plain(params):
+    """JSON-safe copy of a sampled configuration (numpy scalars -> Python)"""
+    return {k: (v.item() if hasattr(v, 'item') else v) for k, v in params.items()}
+
+
+def _config_id(family, params):
+    return hashlib.sha256(json.dumps([family, params], sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def data_id(X, y):
+    return hashlib.sha256(np.ascontiguousarray(X).tobytes() + np.ascontiguousarray(y).tobytes()).hexdigest()[:16]
+
+
+def _fit_fold(model, X, y, train_idx, test_idx, deadline=None):
+    # Fits that would start after the deadline are skipped (wall time is shared across workers)
+    if deadline is not None and time.time() > deadline:
+        return None
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    score = f1_score(y[test_idx], model.predict(X[test_idx]), average='weighted')
+    return score, time.perf_counter() - start
+
+
+class SearchLog:
+    """Append-only JSONL of (family, config, sample size) -> CV score"""
+
+    def __init__(self, path, data_key):
+        self.path = path
+        self.data_key = data_key
+        self.scores = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record.get('data') == data_key:
+                        self.scores[(record['config'], record['n_samples'])] = record['score']
+
+    def get(self, config, n_samples):
+        return self.scores.get((config, n_samples))
+
+    def append(self, record):
+        record = {**record, 'data': self.data_key}
+        self.scores[(record['config'], record['n_samples'])] = record['score']
+        if self.path:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+
+def successive_halving(base_models, X, y, n_candidates=16, eta=3, budget_seconds=None, n_jobs=-1,
+                       cv_folds=3, log_path=DEFAULT_LOG, random_state=42, families=None):
+    """Search every family; returns {family: {'params', 'score', 'n_samples'}}.
+
+    Families with no configuration scored inside the budget are left out
+    (train_models then keeps their default hyperparameters).
+    """
+    start = time.perf_counter()
+    deadline = time.time() + budget_seconds if budget_seconds else None
+    families = families or list(SEARCH_SPACES)
+    log = SearchLog(log_path, data_id(X, y))
+
+    n_rungs = max(1, math.ceil(math.log(n_candidates, eta))) + 1
+    min_samples = max(len(X) // eta ** (n_rungs - 1), cv_folds * 50)
+
+    survivors = {}
+    for family in families:
+        sampler = ParameterSampler(SEARCH_SPACES[family], n_iter=n_candidates, random_state=random_state)
+        configs = [_plain(p) for p in sampler]
+        # Small discrete spaces can yield duplicates
+        survivors[family] = list({_config_id(family, p): p for p in configs}.items())
+
+    best = {}
+    for rung in range(n_rungs):
+        n_samples = min(len(X), min_samples * eta ** rung) if rung < n_rungs - 1 else len(X)
+        if deadline is not None and time.time() > deadline:
+            print(f"⏱  Budget exhausted before rung {rung}; keeping the best configs found so far")
+            break
+
+        # Stratified subsample, identical for every candidate at this rung
+        if n_samples < len(X):
+            idx, _ = train_test_split(np.arange(len(X)), train_size=n_samples, stratify=y, random_state=random_state)
+        else:
+            idx = np.arange(len(X))
+        X_rung, y_rung = X[idx], y[idx]
+        folds = list(StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=random_state).split(X_rung, y_rung))
+
+        # Interleave families so a budget cut-off does not starve the last ones
+        pending = [(family, *items[j]) for j in range(max(len(v) for v in survivors.values()))
+                   for family, items in survivors.items() if j < len(items)
+                   and log.get(items[j][0], n_samples) is None]
+        tasks = [(family, cid, params, i) for family, cid, params in pending for i in range(len(folds))]
+        rung_start = time.perf_counter()
+        outputs = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_fold)(clone(base_models[family]).set_params(**params, **SEARCH_ONLY_PARAMS.get(family, {})),
+                               X_rung, y_rung, *folds[i], deadline)
+            for family, cid, params, i in tasks
+        )
+        by_config = {}
+        for (family, cid, params, _), output in zip(tasks, outputs):
+            by_config.setdefault((family, cid), []).append(output)
+        for family, cid, params in pending:
+            results = by_config[(family, cid)]
+            if any(result is None for result in results):
+                continue
+            log.append({'family': family, 'config': cid, 'params': params, 'n_samples': int(n_samples),
+                        'score': float(np.mean([s for s, _ in results])),
+                        'fit_seconds': round(sum(t for _, t in results), 3),
+                        'logged_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+        print(f"\nRung {rung}: {n_samples} samples, {sum(len(v) for v in survivors.values())} configs "
+              f"({len(pending)} fitted, rest from log) in {time.perf_counter() - rung_start:.1f}s")
+        keep = max(1, math.ceil(max(len(v) for v in survivors.values()) / eta))
+        for family, items in survivors.items():
+            # Candidates cut off by the budget have no score at this rung
+            ranked = sorted((item for item in items if log.get(item[0], n_samples) is not None),
+                            key=lambda item: log.get(item[0], n_samples), reverse=True)
+            survivors[family] = ranked[:keep]
+            if not ranked:
+                continue
+            cid, params = ranked[0]
+            best[family] = {'params': params, 'score': log.get(cid, n_samples), 'n_samples': int(n_samples)}
+            print(f"  {family:<22} best F1 {best[family]['score']:.4f}  {params}")
+        survivors = {family: items for family, items in survivors.items() if items}
+        if not survivors:
+            break
+
+    print(f"\n⏱  Search wall-clock: {time.perf_counter() - start:.1f}s")
+    return best
+
+
+def save_best_params(best, path=DEFAULT_BEST):
+    with open(path, 'w') as f:
+        json.dump(best, f, indent=2)
+
+
+def load_best_params(path=DEFAULT_BEST):
+    """{family: params} from a saved search result"""
+    with open(path) as f:
+        return {family: result['params'] for family, result in json.load(f).items()}
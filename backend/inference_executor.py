@@ -0,0 +1,189 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from metrics import METRICS
+
+# -------------------------------
+# Bounded inference executor with admission control
+# -------------------------------
+# Scoring runs on a dedicated pool instead of the shared anyio threadpool, so
+# a burst of predictions cannot starve `/` or the admin endpoints. At most
+# `max_workers + max_queue` calls are admitted at once; beyond that callers
+# get InferenceRejected (mapped to 429/503 + Retry-After by the app) instead
+# of waiting in an unbounded line.
+#
+# kind="process" scores in worker processes that each map the model artifact
+# themselves, which sidesteps the GIL for heavy ensembles/SVMs at the cost of
+# pickling the feature matrix and results across the process boundary.
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+
+class InferenceRejected(Exception):
+    """Raised when the admission queue is full"""
+
+    def __init__(self, retry_after, in_flight, capacity):
+        super().__init__(f"Inference queue full ({in_flight}/{capacity})")
+        self.retry_after = retry_after
+        self.in_flight = in_flight
+        self.capacity = capacity
+
+
+class InferenceExecutor:
+    """Fixed-size worker pool behind a bounded admission counter"""
+
+    def __init__(self, kind='thread', max_workers=None, max_queue=64, retry_after=1, stats_window=2048):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind {kind!r}; expected one of {list(EXECUTOR_KINDS)}")
+        self.kind = kind
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.max_queue = max_queue
+        self.capacity = self.max_workers + max_queue
+        self.retry_after = retry_after
+
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._in_flight = 0
+        self._running = 0
+        self._waits = deque(maxlen=stats_window)
+        self._cond = threading.Condition()
+
+        if kind == 'process':
+            # spawn: forking a process that already runs threads and an event loop is unsafe
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='inference')
+
+    # -------------------------------
+    # Admission
+    # -------------------------------
+    def _admit(self, block=False):
+        with self._cond:
+            if block:
+                while self._in_flight >= self.capacity:
+                    self._cond.wait()
+            elif self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise InferenceRejected(self.retry_after, self._in_flight, self.capacity)
+            self._in_flight += 1
+            self.admitted += 1
+
+    def _release(self, future):
+        with self._cond:
+            self._in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+            self._cond.notify()
+
+    def _submit(self, fn, *args, block=False):
+        self._admit(block)
+        enqueued = time.perf_counter()
+        try:
+            if self.kind == 'process':
+                # Worker start times are not visible from here; no queue-wait samples
+                future = self._pool.submit(fn, *args)
+            else:
+                # Carry the request context so stage timings still reach Server-Timing
+                context = contextvars.copy_context()
+                future = self._pool.submit(context.run, self._timed, enqueued, fn, *args)
+        except Exception:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _timed(self, enqueued, fn, *args):
+        wait = time.perf_counter() - enqueued
+        self._waits.append(wait)
+        METRICS.observe('inference_queue_wait', wait)
+        with self._cond:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._cond:
+                self._running -= 1
+
+    # -------------------------------
+    # Call styles
+    # -------------------------------
+    async def run(self, fn, *args):
+        """Await fn(*args) on the pool; raises InferenceRejected if the queue is full"""
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def call(self, fn, *args, block=False):
+        """Blocking variant for sync handlers; block=True waits for a slot instead of rejecting"""
+        return self._submit(fn, *args, block=block).result()
+
+    # -------------------------------
+    # Introspection
+    # -------------------------------
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def queue_depth(self):
+        """Admitted calls not yet picked up by a worker"""
+        return max(self._in_flight - (self._running if self.kind == 'thread' else self.max_workers), 0)
+
+    def stats(self):
+        waits_ms = np.asarray(self._waits) * 1000.0
+        queue_wait = None
+        if len(waits_ms):
+            p50, p95, p99 = np.percentile(waits_ms, [50, 95, 99])
+            queue_wait = {"p50": round(float(p50), 3), "p95": round(float(p95), 3),
+                          "p99": round(float(p99), 3), "max": round(float(waits_ms.max()), 3)}
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_wait_ms": queue_wait,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# -------------------------------
+# Process-pool scoring
+# -------------------------------
+# Each worker process keeps the artifacts it has loaded, keyed by version, so
+# a model swap in the parent is picked up on the next call without restarting
+# the pool. Shadow scoring only runs with the thread executor.
+_worker_models = {}
+
+
+def score_in_worker(source, version, feature_columns, features):
+    """Score with the artifact at `source` -> [(pred_class, prob_dict), ...]"""
+    from model_registry import load_model_artifact
+
+    loaded = _worker_models.get(version)
+    if loaded is None:
+        loaded = load_model_artifact(source, feature_columns)
+        if loaded.version != version:
+            raise ValueError(f"{source} changed on disk (expected version {version}, found {loaded.version})")
+        _worker_models.clear()
+        _worker_models[version] = loaded
+    return loaded.score_rows(features)
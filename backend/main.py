@@ -1,18 +1,105 @@
-from fastapi import FastAPI
+from startup import STARTUP, warmup_matrix
+from fastapi import FastAPI, HTTPException, Header, Depends, Request, UploadFile, File, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-import pickle
+from typing import List, Optional
+import os
+import hmac
+import asyncio
 import numpy as np
 from fastapi.middleware.cors import CORSMiddleware
+from coalescer import RequestCoalescer
+from prediction_cache import PredictionCache, canonical_key
+from focus_areas import focus_area_records, FEATURE_COLUMNS, SCORE_COLUMNS
+from model_registry import ModelRegistry, watch_artifact
+from drift_monitor import DriftMonitor
+from prediction_log import PredictionLog
+from metrics import METRICS, format_metric
+from inference_executor import InferenceExecutor, InferenceRejected, score_in_worker
+from model_bundle import verify_bundle
+import bulk_scoring
 
+STARTUP.checkpoint('imports')
+
+# -------------------------------
+# Prediction cache (keyed on the canonical feature tuple)
+# -------------------------------
+# PREDICTION_CACHE_SIZE=0 disables it; PREDICTION_CACHE_TTL is in seconds (0 = no TTL)
+prediction_cache = PredictionCache(
+    max_size=int(os.environ.get("PREDICTION_CACHE_SIZE", "4096")),
+    ttl_seconds=float(os.environ.get("PREDICTION_CACHE_TTL", "0")),
+)
+
+# -------------------------------
+# Input drift monitor
+# -------------------------------
+# Every scored row is folded into fixed-size histograms and compared with the
+# reference sketch saved by predicting.py (see drift_monitor.py); GET /drift
+# reports the scores. The live window spans the last DRIFT_WINDOW_ROWS to
+# 2 x DRIFT_WINDOW_ROWS rows. DRIFT_MONITOR=0 disables it.
+DRIFT_MONITOR = os.environ.get("DRIFT_MONITOR", "1") == "1"
+drift = DriftMonitor(FEATURE_COLUMNS, window_rows=int(os.environ.get("DRIFT_WINDOW_ROWS", "5000")))
+
+
+def observe_drift(features, pred_classes):
+    if DRIFT_MONITOR:
+        with METRICS.stage('drift_observe'):
+            drift.observe(features, pred_classes)
+
+# -------------------------------
+# Prediction log (served predictions kept for retraining)
 # -------------------------------
-# Load the saved model, scaler, and label encoder
+# PREDICTION_LOG_DIR enables it (empty = off). Rows are buffered in memory
+# and written by a background thread every PREDICTION_LOG_FLUSH_SECONDS or
+# PREDICTION_LOG_FLUSH_ROWS rows, whichever comes first; at most
+# PREDICTION_LOG_MAX_FILES segments are kept. Train on them with
+# `python predicting.py --prediction-log <dir>`.
+PREDICTION_LOG_DIR = os.environ.get("PREDICTION_LOG_DIR", "")
+prediction_log = PredictionLog(
+    PREDICTION_LOG_DIR, FEATURE_COLUMNS,
+    flush_rows=int(os.environ.get("PREDICTION_LOG_FLUSH_ROWS", "5000")),
+    flush_seconds=float(os.environ.get("PREDICTION_LOG_FLUSH_SECONDS", "30")),
+    max_buffer_rows=int(os.environ.get("PREDICTION_LOG_MAX_BUFFER_ROWS", "100000")),
+    max_files=int(os.environ.get("PREDICTION_LOG_MAX_FILES", "1000")),
+) if PREDICTION_LOG_DIR else None
+
+
+def record_predictions(features, scored, version):
+    """Observe drift and queue the rows for the prediction log; scored = [(pred_class, prob_dict), ...]"""
+    pred_classes = [pred_class for pred_class, _ in scored]
+    observe_drift(features, pred_classes)
+    if prediction_log is not None:
+        prediction_log.record(features, pred_classes, [prob_dict for _, prob_dict in scored], version)
+
 # -------------------------------
-with open('best_dyslexia_focus_model.pkl', 'rb') as f:
-    model = pickle.load(f)
-with open('best_dyslexia_focus_model_scaler.pkl', 'rb') as f:
-    scaler = pickle.load(f)
-with open('best_dyslexia_focus_model_labels.pkl', 'rb') as f:
-    label_encoder = pickle.load(f)
+# Load the model bundle (or the legacy pickles) into the registry
+# -------------------------------
+# predicting.py writes one memory-mapped bundle holding the flattened model,
+# scaler parameters, label classes, feature order and training metadata.
+# Several workers mapping the same file share its pages; nothing is unpickled.
+# Activating another version re-binds the prediction cache and the drift
+# monitor to it.
+#
+# COLD_START=1 (for instances that sleep, e.g. Render free tier) skips the
+# bundle checksum at load time and verifies it in the background after the
+# warm-up batch; /ready turns 503 if that check fails.
+MODEL_DIR = os.environ.get("MODEL_DIR", ".")
+MODEL_BUNDLE_PATH = os.path.join(MODEL_DIR, os.environ.get("MODEL_BUNDLE_PATH", "best_dyslexia_focus_model.bundle"))
+LEGACY_MODEL_PATH = os.path.join(MODEL_DIR, "best_dyslexia_focus_model.pkl")
+MODEL_BUNDLE_VERIFY = os.environ.get("MODEL_BUNDLE_VERIFY", "1") == "1"
+COLD_START = os.environ.get("COLD_START", "0") == "1"
+
+def on_activate(version):
+    prediction_cache.bind(version)
+    loaded = registry.versions[version]
+    drift.bind(version, loaded.drift_reference, loaded.classes)
+
+
+registry = ModelRegistry(feature_columns=FEATURE_COLUMNS, on_activate=on_activate)
+registry.load(MODEL_BUNDLE_PATH if os.path.exists(MODEL_BUNDLE_PATH) else LEGACY_MODEL_PATH,
+              activate=True, verify=MODEL_BUNDLE_VERIFY and not COLD_START)
+STARTUP.details["model_source"] = registry.active.source
+STARTUP.checkpoint('model_load')
 
 # -------------------------------
 # FastAPI app
@@ -43,29 +130,33 @@ class StudentFeatures(BaseModel):
     spelling_accuracy: float
 
 # -------------------------------
-# Helper: Identify focus areas
+# Per-stage latency metrics
 # -------------------------------
-def get_focus_areas(student_dict):
-    """Return primary, secondary, tertiary focus areas based on lowest scores"""
-    reading_avg = np.mean([student_dict['reading_speed'], student_dict['reading_accuracy'], student_dict['reading_comprehension']])
-    writing_avg = np.mean([student_dict['writing_speed'], student_dict['writing_quality'], student_dict['grammar_sentence']])
-    spelling_avg = np.mean([student_dict['phonetic_spelling'], student_dict['irregular_word_spelling'], student_dict['spelling_accuracy']])
+# METRICS_ENABLED=0 skips the middleware and turns every stage timer into a
+# no-op. METRICS_SERVER_TIMING=1 echoes the request's stage durations in a
+# Server-Timing response header.
+METRICS_SERVER_TIMING = os.environ.get("METRICS_SERVER_TIMING", "0") == "1"
 
-    areas = {
-        "Reading": reading_avg,
-        "Writing": writing_avg,
-        "Spelling": spelling_avg
-    }
+if METRICS.enabled:
+    @app.middleware("http")
+    async def stage_timing_middleware(request: Request, call_next):
+        timings, token = METRICS.begin_request()
+        try:
+            with METRICS.stage('request_total'):
+                response = await call_next(request)
+        finally:
+            METRICS.end_request(token)
+        route = request.scope.get('route')
+        METRICS.count_request(request.method, getattr(route, 'path', 'unmatched'), response.status_code)
+        if METRICS_SERVER_TIMING:
+            response.headers['Server-Timing'] = METRICS.server_timing(timings)
+        return response
 
-    # Sort by ascending score (weakest first)
-    sorted_areas = sorted(areas.items(), key=lambda x: x[1])
-    focus_areas = [
-        {"name": sorted_areas[0][0], "score": round(sorted_areas[0][1], 2)},
-        {"name": sorted_areas[1][0], "score": round(sorted_areas[1][1], 2)},
-        {"name": sorted_areas[2][0], "score": round(sorted_areas[2][1], 2)}
-    ]
-    return focus_areas
 
+def json_response(payload):
+    """Serialize explicitly so JSON encoding shows up as its own stage"""
+    with METRICS.stage('serialization'):
+        return JSONResponse(payload)
 
 
 @app.get("/")
@@ -73,59 +164,452 @@ def root():
     return {"message": "Backend is running!"}
 
 
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once the model is loaded and warmed up, 503 before (or if checks failed)"""
+    return JSONResponse(STARTUP.snapshot(), status_code=200 if STARTUP.ready else 503)
+
+
 # -------------------------------
-# Prediction endpoint
+# Scoring helpers (shared by single and batch endpoints)
 # -------------------------------
-@app.post("/predict")
-def predict(student: StudentFeatures):
-    # Convert input to numpy array
-    features = np.array([[ 
-        student.age,
-        student.reading_speed,
-        student.reading_accuracy,
-        student.reading_comprehension,
-        student.writing_speed,
-        student.writing_quality,
-        student.grammar_sentence,
-        student.phonetic_spelling,
-        student.irregular_word_spelling,
-        student.spelling_accuracy
-    ]])
-
-    # Scale features
-    features_scaled = scaler.transform(features)
-
-    # Predict class
-    pred_idx = model.predict(features_scaled)[0]
-    pred_class = label_encoder.inverse_transform([pred_idx])[0]
-
-    # Predict probabilities
-    if hasattr(model, "predict_proba"):
-        probs = model.predict_proba(features_scaled)[0]
-        prob_dict = {cls: round(float(probs[i]), 4) for i, cls in enumerate(label_encoder.classes_)}
-    else:
-        prob_dict = None
-
-    # Identify focus areas
-    student_dict = student.dict()
-    focus_areas = get_focus_areas(student_dict)
-
-    # NEW -> Return the individual assessment scores
-    assessment_scores = {
-        "reading_speed": student.reading_speed,
-        "reading_accuracy": student.reading_accuracy,
-        "reading_comprehension": student.reading_comprehension,
-        "writing_speed": student.writing_speed,
-        "writing_quality": student.writing_quality,
-        "grammar_sentence": student.grammar_sentence,
-        "phonetic_spelling": student.phonetic_spelling,
-        "irregular_word_spelling": student.irregular_word_spelling,
-        "spelling_accuracy": student.spelling_accuracy
-    }
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "10000"))
+
+
+def students_to_matrix(students):
+    """Stack StudentFeatures into an (N, 10) array in training column order"""
+    with METRICS.stage('array_construction'):
+        return np.array([[getattr(s, col) for col in FEATURE_COLUMNS] for s in students], dtype=float)
+
+
+def rank_focus_areas(features):
+    with METRICS.stage('focus_areas'):
+        return focus_area_records(features[:, 1:])
+
+
+def score_matrix(features):
+    """Score an (N, 10) matrix with the active model -> [(pred_class, prob_dict, version), ...]"""
+    return registry.score_rows(features)
+
+
+# -------------------------------
+# Inference executor (bounded, separate from the request threadpool)
+# -------------------------------
+# INFERENCE_EXECUTOR=thread|process selects the pool; INFERENCE_WORKERS sets
+# its size (default min(4, CPUs)) and INFERENCE_QUEUE_SIZE how many further
+# calls may wait. When full, requests are answered with INFERENCE_REJECT_STATUS
+# (429 or 503) and Retry-After: INFERENCE_RETRY_AFTER seconds.
+INFERENCE_REJECT_STATUS = int(os.environ.get("INFERENCE_REJECT_STATUS", "429"))
+inference = InferenceExecutor(
+    kind=os.environ.get("INFERENCE_EXECUTOR", "thread"),
+    max_workers=int(os.environ.get("INFERENCE_WORKERS", "0")) or None,
+    max_queue=int(os.environ.get("INFERENCE_QUEUE_SIZE", "64")),
+    retry_after=int(os.environ.get("INFERENCE_RETRY_AFTER", "1")),
+)
+
+
+@app.exception_handler(InferenceRejected)
+async def inference_rejected_handler(request: Request, exc: InferenceRejected):
+    return JSONResponse(status_code=INFERENCE_REJECT_STATUS,
+                        content={"detail": "Prediction service is busy, retry shortly"},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+
+def _score_in_process(features):
+    """(fn, args) scoring on a worker process; the parent keeps version and shadow bookkeeping"""
+    active = registry.active
+    return active, (active.source, active.version, FEATURE_COLUMNS, features)
+
+
+async def score_matrix_async(features):
+    """score_matrix on the inference executor (awaitable)"""
+    if inference.kind == 'process':
+        active, args = _score_in_process(features)
+        rows = await inference.run(score_in_worker, *args)
+        return [(pred_class, prob_dict, active.version) for pred_class, prob_dict in rows]
+    return await inference.run(score_matrix, features)
+
+
+def score_matrix_bounded(features, block=False):
+    """score_matrix on the inference executor, for sync handlers"""
+    if inference.kind == 'process':
+        active, args = _score_in_process(features)
+        rows = inference.call(score_in_worker, *args, block=block)
+        return [(pred_class, prob_dict, active.version) for pred_class, prob_dict in rows]
+    return inference.call(score_matrix, features, block=block)
+
+
+@app.get("/predict/executor")
+def executor_stats():
+    """Pool size, queue depth, admissions and rejections of the inference executor"""
+    return inference.stats()
+
+
+def _score_rows_uncached(features):
+    scored = score_matrix_bounded(features)
+    version = scored[0][2] if scored else registry.active.version
+    return [(pred_class, prob_dict) for pred_class, prob_dict, _ in scored], version
+
+
+def score_rows_cached(features):
+    """(per-row (pred_class, prob_dict), model version) for a matrix; only cache misses reach the model"""
+    if not prediction_cache.enabled:
+        return _score_rows_uncached(features)
+
+    with METRICS.stage('cache_lookup'):
+        version = prediction_cache.model_version
+        keys = [canonical_key(row) for row in features]
+        results = [prediction_cache.get(key) for key in keys]
+
+    # Score each distinct missing row once
+    missing = {}
+    for i, key in enumerate(keys):
+        if results[i] is None:
+            missing.setdefault(key, []).append(i)
+    if missing:
+        scored = score_matrix_bounded(features[[rows[0] for rows in missing.values()]])
+        for (key, rows), (pred_class, prob_dict, scored_version) in zip(missing.items(), scored):
+            value = (pred_class, prob_dict)
+            prediction_cache.put(key, value, scored_version)
+            for i in rows:
+                results[i] = value
+        # A model swap between the lookup and scoring would mix versions: rescore the hits too
+        if scored[0][2] != version and sum(len(rows) for rows in missing.values()) < len(keys):
+            return _score_rows_uncached(features)
+        version = scored[0][2]
+    return results, version
+
+
+@app.get("/predict/cache")
+def cache_stats():
+    """Hit/miss/eviction counters for the prediction cache"""
+    return prediction_cache.stats()
+
+
+def build_prediction(student, pred_class, prob_dict, focus_areas):
+    """Assemble the per-student response payload"""
+    # Return the individual assessment scores
+    assessment_scores = {col: getattr(student, col) for col in SCORE_COLUMNS}
 
     return {
         "predicted_difficulty": pred_class,
         "probabilities": prob_dict,
         "focus_areas": focus_areas,
-        "assessment_scores": assessment_scores   # <----- NEW
+        "assessment_scores": assessment_scores
     }
+
+
+# -------------------------------
+# Optional request coalescing for /predict
+# -------------------------------
+# PREDICT_COALESCE=1 merges concurrent /predict calls arriving within
+# PREDICT_COALESCE_WINDOW_MS (or PREDICT_COALESCE_MAX_BATCH rows) into one
+# score_matrix call. The response contract is unchanged.
+PREDICT_COALESCE = os.environ.get("PREDICT_COALESCE", "0") == "1"
+coalescer = RequestCoalescer(
+    score_matrix_async,
+    window_ms=float(os.environ.get("PREDICT_COALESCE_WINDOW_MS", "2")),
+    max_batch_size=int(os.environ.get("PREDICT_COALESCE_MAX_BATCH", "64")),
+) if PREDICT_COALESCE else None
+
+
+@app.get("/predict/coalescer")
+def coalescer_stats():
+    """Batch-size and queue-wait statistics for tuning the coalescing window"""
+    if coalescer is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "window_ms": coalescer.window * 1000.0,
+        "max_batch_size": coalescer.max_batch_size,
+        **coalescer.stats.snapshot(),
+    }
+
+
+# -------------------------------
+# Prediction endpoint
+# -------------------------------
+@app.post("/predict")
+async def predict(student: StudentFeatures):
+    METRICS.observe_since_request_start('validation')
+    features = students_to_matrix([student])
+    focus_areas = rank_focus_areas(features)[0]
+
+    # A cache hit skips the scaler and model entirely
+    with METRICS.stage('cache_lookup'):
+        key = canonical_key(features[0])
+        cached = prediction_cache.get(key)
+    if cached is not None:
+        record_predictions(features, [cached], prediction_cache.model_version)
+        return json_response(build_prediction(student, *cached, focus_areas))
+
+    if coalescer is not None:
+        pred_class, prob_dict, version = await coalescer.submit(features[0])
+    else:
+        pred_class, prob_dict, version = (await score_matrix_async(features))[0]
+    prediction_cache.put(key, (pred_class, prob_dict), version)
+    record_predictions(features, [(pred_class, prob_dict)], version)
+    return json_response(build_prediction(student, pred_class, prob_dict, focus_areas))
+
+
+# -------------------------------
+# Batch prediction endpoint
+# -------------------------------
+class StudentBatch(BaseModel):
+    students: List[StudentFeatures]
+
+
+@app.post("/predict/batch")
+def predict_batch(batch: StudentBatch):
+    """Score a whole class/cohort with a single scaler + model pass"""
+    METRICS.observe_since_request_start('validation')
+    students = batch.students
+    if len(students) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413,
+                            detail=f"Batch of {len(students)} exceeds MAX_BATCH_SIZE={MAX_BATCH_SIZE}")
+    if not students:
+        return {"count": 0, "predictions": []}
+
+    features = students_to_matrix(students)
+    scored, version = score_rows_cached(features)
+    record_predictions(features, scored, version)
+    focus_areas = rank_focus_areas(features)
+
+    predictions = [
+        build_prediction(student, *scored[i], focus_areas[i])
+        for i, student in enumerate(students)
+    ]
+    return json_response({"count": len(predictions), "predictions": predictions})
+
+
+# -------------------------------
+# Streaming bulk CSV scoring
+# -------------------------------
+# Upload a cohort CSV (same columns as dyslexia_focus_areas_20000.csv; only the
+# ten feature columns and an optional id are used). Results stream back as
+# NDJSON or CSV chunk by chunk; progress is available under the job id
+# returned in the X-Job-Id header. Multipart uploads are spooled to disk by
+# Starlette, so neither input nor output is held in memory. Each scored chunk
+# goes to the drift monitor and the prediction log like any other request.
+bulk_jobs = bulk_scoring.BulkJobTracker()
+
+
+def score_csv_chunk(features):
+    """score_matrix_bounded for one CSV chunk, recorded under the version that scored it"""
+    # Chunks wait for an executor slot rather than failing the stream halfway
+    scored = score_matrix_bounded(features, block=True)
+    record_predictions(features, [(pred_class, prob_dict) for pred_class, prob_dict, _ in scored], scored[0][2])
+    return scored
+
+
+@app.post("/predict/csv")
+def predict_csv(file: UploadFile = File(...),
+                format: str = Query("ndjson"),
+                chunk_size: int = Query(bulk_scoring.DEFAULT_CHUNK_SIZE, ge=1)):
+    if format not in bulk_scoring.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(bulk_scoring.FORMATS)}")
+    chunk_size = min(chunk_size, MAX_BATCH_SIZE)
+
+    progress = bulk_jobs.start(source=file.filename)
+    active = registry.active
+    body = bulk_scoring.stream_scores(file.file, score_csv_chunk, active.classes, format, chunk_size, progress)
+    return StreamingResponse(body, media_type=bulk_scoring.FORMATS[format],
+                             headers={"X-Job-Id": progress.job_id})
+
+
+@app.get("/predict/csv/jobs")
+def list_csv_jobs():
+    return bulk_jobs.list()
+
+
+@app.get("/predict/csv/jobs/{job_id}")
+def csv_job_status(job_id: str):
+    """Progress and throughput of a running or finished bulk scoring job"""
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.snapshot()
+
+
+@app.get("/drift")
+def drift_report():
+    """PSI and mean shift per feature, and the predicted-class mix, of recent traffic vs training"""
+    if not DRIFT_MONITOR:
+        return {"enabled": False}
+    return {"enabled": True, **drift.report()}
+
+
+@app.get("/predict/log")
+def prediction_log_stats():
+    """Buffered, written and dropped rows of the prediction log"""
+    if prediction_log is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_log.stats()}
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition: stage histograms, request counts, cache and model gauges"""
+    if not METRICS.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=0)")
+    cache = prediction_cache.stats()
+    extra = []
+    for name in ('hits', 'misses', 'evictions', 'expirations', 'invalidations'):
+        extra += format_metric(f'prediction_cache_{name}_total', cache[name],
+                               f'Prediction cache {name}', 'counter')
+    extra += format_metric('prediction_cache_entries', cache['size'], 'Entries in the prediction cache')
+    extra += format_metric('model_active_info', 1, 'Active model version', version=registry.active.version)
+    executor = inference.stats()
+    extra += format_metric('inference_queue_depth', executor['queue_depth'],
+                           'Admitted inference calls waiting for a worker')
+    extra += format_metric('inference_in_flight', executor['in_flight'], 'Inference calls queued or running')
+    for name in ('admitted', 'rejected', 'completed', 'failed'):
+        extra += format_metric(f'inference_{name}_total', executor[name], f'Inference calls {name}', 'counter')
+    if DRIFT_MONITOR:
+        report = drift.report()
+        extra += format_metric('drift_live_rows', report['live_rows'], 'Rows in the live drift window')
+        # One HELP/TYPE header, one sample per feature
+        for i, (col, feature) in enumerate(report['features'].items()):
+            block = format_metric('drift_feature_psi', feature['psi'],
+                                  'Population stability index of live vs training inputs', feature=col)
+            extra += block if i == 0 else block[2:]
+        if report['predicted_class_mix'] is not None:
+            extra += format_metric('drift_predicted_class_psi', report['predicted_class_mix']['psi'],
+                                   'Population stability index of live vs training predicted classes')
+    if prediction_log is not None:
+        log = prediction_log.stats()
+        extra += format_metric('prediction_log_buffered_rows', log['buffered_rows'], 'Rows waiting to be written')
+        for name in ('logged', 'dropped'):
+            extra += format_metric(f'prediction_log_{name}_rows_total', log[f'{name}_rows'],
+                                   f'Prediction log rows {name}', 'counter')
+    return PlainTextResponse(METRICS.render(extra), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# -------------------------------
+# Model registry / hot reload
+# -------------------------------
+# Admin endpoints are disabled unless MODEL_ADMIN_TOKEN is set; callers must
+# send it as X-Admin-Token. MODEL_WATCH=1 additionally polls the bundle file
+# (the legacy pickle while there is no bundle) every MODEL_WATCH_INTERVAL
+# seconds and activates it when it changes.
+MODEL_ADMIN_TOKEN = os.environ.get("MODEL_ADMIN_TOKEN", "")
+MODEL_WATCH = os.environ.get("MODEL_WATCH", "0") == "1"
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "5"))
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model admin endpoints are disabled (set MODEL_ADMIN_TOKEN)")
+    if not hmac.compare_digest(x_admin_token or "", MODEL_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+class ModelLoadRequest(BaseModel):
+    path: Optional[str] = None
+    activate: bool = True
+
+
+class ModelActivateRequest(BaseModel):
+    version: str
+
+
+class ShadowRequest(BaseModel):
+    version: Optional[str] = None
+    percent: float = 0.0
+
+
+@app.get("/models")
+def list_models():
+    """Registered versions, active/candidate, shadow agreement and per-version latency"""
+    return registry.describe()
+
+
+@app.post("/models/reload", dependencies=[Depends(require_admin)])
+def reload_model(request: ModelLoadRequest):
+    """Load an artifact from MODEL_DIR (default: the bundle) and optionally activate it"""
+    # Only file names inside MODEL_DIR are accepted
+    path = os.path.join(MODEL_DIR, os.path.basename(request.path)) if request.path else MODEL_BUNDLE_PATH
+    try:
+        loaded = registry.load(path, activate=request.activate, verify=MODEL_BUNDLE_VERIFY)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not load {path}: {e}")
+    return {"loaded": loaded.version, **registry.describe()}
+
+
+@app.post("/models/activate", dependencies=[Depends(require_admin)])
+def activate_model(request: ModelActivateRequest):
+    try:
+        registry.activate(request.version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version {request.version}")
+    return registry.describe()
+
+
+@app.post("/models/shadow", dependencies=[Depends(require_admin)])
+def shadow_model(request: ShadowRequest):
+    """Route `percent`% of scoring to a candidate version in the background"""
+    try:
+        registry.set_shadow(request.version, request.percent)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version {request.version}")
+    return registry.describe()
+
+
+# -------------------------------
+# Warm-up and readiness
+# -------------------------------
+# Uvicorn only starts accepting connections after startup hooks finish, so the
+# first real request never pays for lazy initialisation (sklearn's first
+# predict_proba, executor threads/processes, focus ranking, JSON encoding).
+# STARTUP_WARMUP_ROWS=0 skips the warm-up batch.
+STARTUP_WARMUP_ROWS = int(os.environ.get("STARTUP_WARMUP_ROWS", "64"))
+STARTUP.checkpoint('app_setup')
+
+
+def verify_active_bundle():
+    active = registry.active
+    try:
+        if verify_bundle(active.source)[:12] != active.version:
+            raise ValueError(f"{active.source} changed on disk since it was loaded")
+        STARTUP.details["checksum_verified"] = True
+    except (OSError, ValueError) as e:
+        STARTUP.fail(f"Bundle verification failed: {e}")
+        print(f"⚠️ {STARTUP.failure}")
+
+
+@app.on_event("startup")
+async def warm_up():
+    if STARTUP_WARMUP_ROWS > 0:
+        features = warmup_matrix(STARTUP_WARMUP_ROWS)
+        # One batch per worker so every executor thread/process has touched the model
+        scored = await asyncio.gather(*[score_matrix_async(features) for _ in range(inference.max_workers)])
+        focus_areas = rank_focus_areas(features)
+        json_response({"predictions": [{"predicted_difficulty": pred_class, "probabilities": prob_dict,
+                                        "focus_areas": focus}
+                                       for (pred_class, prob_dict, _), focus in zip(scored[0], focus_areas)]})
+        STARTUP.details["warmup_rows"] = STARTUP_WARMUP_ROWS
+    STARTUP.mark_ready()
+    print(f"✓ Ready after {STARTUP.ready_after:.3f}s: "
+          + ", ".join(f"{name} {seconds * 1000.0:.0f}ms" for name, seconds in STARTUP.phases.items()))
+
+    if COLD_START and registry.active.source.endswith('.bundle'):
+        app.state.bundle_check = asyncio.ensure_future(asyncio.to_thread(verify_active_bundle))
+
+
+@app.on_event("startup")
+async def start_prediction_log():
+    if prediction_log is not None:
+        prediction_log.start()
+
+
+@app.on_event("shutdown")
+async def flush_prediction_log():
+    if prediction_log is not None:
+        await asyncio.to_thread(prediction_log.close)
+
+
+@app.on_event("startup")
+async def start_model_watcher():
+    if MODEL_WATCH:
+        app.state.model_watcher = asyncio.ensure_future(
+            watch_artifact(registry, MODEL_BUNDLE_PATH, MODEL_WATCH_INTERVAL, fallback=LEGACY_MODEL_PATH))
@@ -0,0 +1,158 @@
+import contextvars
+import os
+import threading
+import time
+
+# -------------------------------
+# Per-stage latency histograms in Prometheus text format
+# -------------------------------
+# Code anywhere in the request path wraps work in `METRICS.stage("name")`.
+# Each stage feeds a cumulative histogram; durations are also collected per
+# request (via a context variable) so they can be echoed as Server-Timing.
+# With METRICS_ENABLED=0 `stage()` returns a shared no-op context manager.
+
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels):
+    return ','.join(f'{k}="{v}"' for k, v in labels.items())
+
+
+def format_metric(name, value, help_text, metric_type='gauge', **labels):
+    """One HELP/TYPE/sample block for ad-hoc gauges and counters"""
+    label_str = f'{{{_labels(**labels)}}}' if labels else ''
+    return [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}', f'{name}{label_str} {value}']
+
+
+class StageMetrics:
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms = {}
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        """Context manager timing one stage of request handling"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + seconds
+
+    # -------------------------------
+    # Request scope (used by the HTTP middleware)
+    # -------------------------------
+    def begin_request(self):
+        timings = {'_start': time.perf_counter()}
+        return timings, _request_timings.set(timings)
+
+    def end_request(self, token):
+        _request_timings.reset(token)
+
+    def observe_since_request_start(self, name):
+        """Record time from middleware entry until now (body parsing + pydantic validation)"""
+        timings = _request_timings.get()
+        if timings is not None and name not in timings:
+            self.observe(name, time.perf_counter() - timings['_start'])
+
+    def count_request(self, method, path, status):
+        with self._lock:
+            key = (method, path, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    @staticmethod
+    def server_timing(timings):
+        """Server-Timing header value (durations in milliseconds)"""
+        return ', '.join(f'{name};dur={seconds * 1000.0:.3f}'
+                         for name, seconds in timings.items() if not name.startswith('_'))
+
+    # -------------------------------
+    # Exposition
+    # -------------------------------
+    def render(self, extra_lines=()):
+        with self._lock:
+            histograms = {name: (list(h.counts), h.sum, h.count) for name, h in self._histograms.items()}
+            requests = dict(self._requests)
+
+        lines = ['# HELP predict_stage_duration_seconds Latency of each request-handling stage',
+                 '# TYPE predict_stage_duration_seconds histogram']
+        for name, (counts, total, count) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'predict_stage_duration_seconds_bucket{{{_labels(stage=name, le=bound)}}} {cumulative}')
+            lines.append(f'predict_stage_duration_seconds_bucket{{{_labels(stage=name, le="+Inf")}}} {count}')
+            lines.append(f'predict_stage_duration_seconds_sum{{{_labels(stage=name)}}} {total}')
+            lines.append(f'predict_stage_duration_seconds_count{{{_labels(stage=name)}}} {count}')
+
+        lines += ['# HELP http_requests_total Requests handled, by method, route and status',
+                  '# TYPE http_requests_total counter']
+        for (method, path, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{{_labels(method=method, path=path, status=status)}}} {count}')
+
+        lines.extend(extra_lines)
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = StageMetrics(enabled=os.environ.get("METRICS_ENABLED", "1") == "1")
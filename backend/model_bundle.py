@@ -0,0 +1,147 @@
+import hashlib
+import json
+import mmap
+import os
+
+import numpy as np
+
+# -------------------------------
+# Single-file, memory-mappable model bundle
+# -------------------------------
+# Layout:
+#   8 bytes   magic b'LEXIMDL1'
+#   8 bytes   header length (little-endian uint64)
+#   N bytes   UTF-8 JSON header (format version, metadata, array table, checksum)
+#   padding   to a 64-byte boundary
+#   data      numeric arrays, each 64-byte aligned, raw C-order bytes
+#
+# The data region is memory-mapped read-only on load, so several API workers
+# reading the same bundle share its pages and startup does no deserialization.
+# The checksum covers the header (without the checksum field) and the data,
+# so a changed class list, model kind or feature order is caught as well;
+# format 1 bundles only hashed the data.
+
+MAGIC = b'LEXIMDL1'
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _is_blob(value):
+    """Numeric arrays with at least one dimension go to the mapped data region"""
+    return value.ndim > 0 and value.dtype.kind in 'biuf'
+
+
+def _digest(header, data):
+    """sha256 over the canonical header JSON (minus the checksum) and the data region"""
+    digest = hashlib.sha256()
+    if header["format_version"] >= 2:
+        fields = {k: v for k, v in header.items() if k != "checksum"}
+        digest.update(json.dumps(fields, sort_keys=True).encode('utf-8'))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def write_bundle(path, arrays, metadata=None):
+    """Write arrays + metadata atomically; returns the bundle checksum"""
+    blobs = {}
+    values = {}
+    for name, value in arrays.items():
+        value = np.asarray(value)
+        if _is_blob(value):
+            blobs[name] = np.ascontiguousarray(value)
+        else:
+            # Strings, flags and scalars live in the JSON header
+            values[name] = value.tolist()
+
+    table = {}
+    offset = 0
+    for name, value in blobs.items():
+        offset = _align(offset)
+        table[name] = {"dtype": value.dtype.str, "shape": list(value.shape), "offset": offset}
+        offset += value.nbytes
+    data_size = _align(offset)
+
+    data = bytearray(data_size)
+    for name, value in blobs.items():
+        start = table[name]["offset"]
+        data[start:start + value.nbytes] = value.tobytes()
+    header = {
+        "format_version": FORMAT_VERSION,
+        "data_size": data_size,
+        "arrays": table,
+        "values": values,
+        "metadata": metadata or {},
+    }
+    # Round-trip through JSON so the digest sees exactly what readers will parse
+    header = json.loads(json.dumps(header))
+    checksum = header["checksum"] = _digest(header, data)
+    header = json.dumps(header).encode('utf-8')
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        f.write(b'\0' * (_align(16 + len(header)) - 16 - len(header)))
+        f.write(data)
+    # Readers never see a half-written bundle
+    os.replace(tmp_path, path)
+    return checksum
+
+
+def _checksum(mapped, header_len, header):
+    data_start = _align(16 + header_len)
+    data = memoryview(mapped)[data_start:data_start + header["data_size"]]
+    checksum = _digest(header, data)
+    data.release()
+    return checksum
+
+
+def verify_bundle(path):
+    """Check a bundle's checksum without loading it; raises ValueError on mismatch"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        header_len = int.from_bytes(mapped[8:16], 'little')
+        header = json.loads(mapped[16:16 + header_len].decode('utf-8'))
+        if _checksum(mapped, header_len, header) != header["checksum"]:
+            raise ValueError(f"{path} checksum mismatch (corrupt or truncated bundle)")
+    finally:
+        mapped.close()
+    return header["checksum"]
+
+
+def read_bundle(path, verify=True):
+    """Memory-map a bundle; returns (arrays, header). Arrays are read-only views."""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if mapped[:8] != MAGIC:
+        raise ValueError(f"{path} is not a model bundle")
+    header_len = int.from_bytes(mapped[8:16], 'little')
+    header = json.loads(mapped[16:16 + header_len].decode('utf-8'))
+    if header["format_version"] > FORMAT_VERSION:
+        raise ValueError(f"{path} uses bundle format {header['format_version']}, "
+                         f"this reader supports up to {FORMAT_VERSION}")
+
+    data_start = _align(16 + header_len)
+    if verify:
+        if _checksum(mapped, header_len, header) != header["checksum"]:
+            raise ValueError(f"{path} checksum mismatch (corrupt or truncated bundle)")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        if count == 0:
+            arrays[name] = np.empty(spec["shape"], dtype=dtype)
+            continue
+        arrays[name] = np.frombuffer(mapped, dtype=dtype, count=count,
+                                     offset=data_start + spec["offset"]).reshape(spec["shape"])
+    for name, value in header["values"].items():
+        arrays[name] = np.array(value)
+    return arrays, header
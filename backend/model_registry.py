@@ -0,0 +1,326 @@
+import hashlib
+import os
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from compiled_model import CompiledModel
+from drift_monitor import DriftSketch
+from metrics import METRICS
+
+# -------------------------------
+# Versioned model registry with atomic activation and shadow scoring
+# -------------------------------
+# Every loaded artifact becomes a LoadedModel identified by a short content
+# hash. Requests read `registry.active` once and keep that reference, so
+# switching versions never interrupts in-flight scoring. A candidate version
+# can score a sampled share of traffic in the background ("shadow") and its
+# agreement with the active model is counted.
+
+LEGACY_SUFFIXES = ('.pkl', '_scaler.pkl', '_labels.pkl')
+
+
+class LatencyStats:
+    """Call/row counters and latency percentiles over a sliding window"""
+
+    def __init__(self, window=2048):
+        self.calls = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds, rows):
+        with self._lock:
+            self.calls += 1
+            self.rows += rows
+            self.total_seconds += seconds
+            self._recent.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            recent_ms = np.asarray(self._recent) * 1000.0
+            calls, rows, total = self.calls, self.rows, self.total_seconds
+        summary = {"calls": calls, "rows": rows,
+                   "mean_ms": round(total / calls * 1000.0, 3) if calls else None}
+        if len(recent_ms):
+            p50, p95, p99 = np.percentile(recent_ms, [50, 95, 99])
+            summary.update({"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3),
+                            "p99_ms": round(float(p99), 3)})
+        return summary
+
+
+class LoadedModel:
+    """One model version: scores (N, 10) matrices and tracks its own latency"""
+
+    def __init__(self, version, source, classes, score_fn, metadata=None, drift_reference=None):
+        self.version = version
+        self.source = source
+        self.classes = [str(c) for c in classes]
+        self.metadata = metadata or {}
+        self.drift_reference = drift_reference
+        self.loaded_at = time.time()
+        self.latency = LatencyStats()
+        self._score_fn = score_fn
+
+    def score(self, features):
+        """Return (predicted class names, probabilities or None)"""
+        start = time.perf_counter()
+        pred_classes, probs = self._score_fn(features)
+        self.latency.record(time.perf_counter() - start, len(features))
+        return pred_classes, probs
+
+    def score_rows(self, features):
+        """Per-row (pred_class, probability dict or None)"""
+        pred_classes, probs = self.score(features)
+        with METRICS.stage('format_probabilities'):
+            pred_classes = [str(c) for c in pred_classes]
+            if probs is None:
+                return [(c, None) for c in pred_classes]
+            return [
+                (c, {cls: round(p, 4) for cls, p in zip(self.classes, row)})
+                for c, row in zip(pred_classes, probs.tolist())
+            ]
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "source": self.source,
+            "model_name": self.metadata.get("model_name"),
+            "trained_at": self.metadata.get("trained_at"),
+            "loaded_at": self.loaded_at,
+            "latency": self.latency.snapshot(),
+        }
+
+
+def _file_hash(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def load_bundle_model(path, feature_columns=None, verify=True):
+    """LoadedModel backed by a memory-mapped bundle"""
+    compiled = CompiledModel.load(path, verify=verify)
+    if feature_columns is not None and compiled.metadata.get('feature_columns', feature_columns) != feature_columns:
+        raise ValueError(f"{path} was trained on a different feature order")
+
+    def score_fn(features):
+        with METRICS.stage('scaler_transform'):
+            features_scaled = compiled.transform(features)
+        # Class and probabilities come out of a single compiled pass
+        with METRICS.stage('model_predict_proba'):
+            pred_idx, probs = compiled.score_scaled(features_scaled)
+        with METRICS.stage('inverse_transform'):
+            pred_classes = compiled.classes[pred_idx]
+        return pred_classes, probs
+
+    return LoadedModel(compiled.checksum[:12], path, compiled.classes, score_fn, compiled.metadata,
+                       DriftSketch.from_arrays(compiled.arrays))
+
+
+def load_legacy_model(prefix):
+    """LoadedModel backed by <prefix>.pkl, <prefix>_scaler.pkl and <prefix>_labels.pkl"""
+    paths = [prefix + suffix for suffix in LEGACY_SUFFIXES]
+    with open(paths[0], 'rb') as f:
+        model = pickle.load(f)
+    with open(paths[1], 'rb') as f:
+        scaler = pickle.load(f)
+    with open(paths[2], 'rb') as f:
+        label_encoder = pickle.load(f)
+
+    def score_fn(features):
+        # Scale features
+        with METRICS.stage('scaler_transform'):
+            features_scaled = scaler.transform(features)
+
+        # Predict classes
+        with METRICS.stage('model_predict'):
+            pred_idx = model.predict(features_scaled)
+        with METRICS.stage('inverse_transform'):
+            pred_classes = label_encoder.inverse_transform(pred_idx)
+
+        # Predict probabilities
+        probs = None
+        if hasattr(model, "predict_proba"):
+            with METRICS.stage('model_predict_proba'):
+                probs = model.predict_proba(features_scaled)
+        return pred_classes, probs
+
+    # Drift reference written next to the pickles by newer training runs
+    drift_reference = None
+    if os.path.exists(f'{prefix}_drift.npz'):
+        with np.load(f'{prefix}_drift.npz') as arrays:
+            drift_reference = DriftSketch.from_arrays(arrays)
+
+    metadata = {"model_name": type(model).__name__}
+    return LoadedModel(_file_hash(paths), paths[0], label_encoder.classes_, score_fn, metadata, drift_reference)
+
+
+def load_model_artifact(path, feature_columns=None, verify=True):
+    """Load a .bundle file or a legacy pickle trio (given the model .pkl path)"""
+    if path.endswith('.bundle'):
+        return load_bundle_model(path, feature_columns, verify)
+    if path.endswith('.pkl'):
+        return load_legacy_model(path[:-len('.pkl')])
+    raise ValueError(f"Unrecognised model artifact: {path}")
+
+
+class ModelRegistry:
+    """Holds several model versions; one active, optionally one shadow candidate"""
+
+    def __init__(self, feature_columns=None, max_versions=4, on_activate=None, max_shadow_pending=8):
+        self.feature_columns = feature_columns
+        self.max_versions = max_versions
+        self.on_activate = on_activate
+        self.versions = OrderedDict()
+        self.active = None
+        self.candidate = None
+        self.shadow_percent = 0.0
+        self.shadow_stats = {"batches": 0, "rows": 0, "agreed": 0, "dropped": 0, "errors": 0}
+        self._max_shadow_pending = max_shadow_pending
+        self._shadow_pending = 0
+        self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-scoring')
+        self._lock = threading.Lock()
+
+    # -------------------------------
+    # Version management
+    # -------------------------------
+    def load(self, path, activate=False, verify=True):
+        """Load an artifact, register it, and optionally make it active"""
+        loaded = load_model_artifact(path, self.feature_columns, verify)
+        loaded = self.register(loaded)
+        if activate:
+            self.activate(loaded.version)
+        return loaded
+
+    def register(self, loaded):
+        with self._lock:
+            if loaded.version in self.versions:
+                return self.versions[loaded.version]
+            self.versions[loaded.version] = loaded
+            # Evict the oldest versions that are neither active, candidate nor the one just added
+            keep = (getattr(self.active, 'version', None), getattr(self.candidate, 'version', None), loaded.version)
+            for version in list(self.versions):
+                if len(self.versions) <= self.max_versions:
+                    break
+                if version not in keep:
+                    del self.versions[version]
+            return loaded
+
+    def activate(self, version):
+        """Atomically switch the active model; in-flight requests finish on the old one"""
+        with self._lock:
+            if version not in self.versions:
+                raise KeyError(version)
+            loaded = self.versions[version]
+            self.active = loaded
+            if self.candidate is loaded:
+                self.candidate = None
+                self.shadow_percent = 0.0
+        if self.on_activate is not None:
+            self.on_activate(loaded.version)
+        return loaded
+
+    def set_shadow(self, version, percent):
+        """Score `percent`% of traffic with a candidate version in the background"""
+        with self._lock:
+            if version is None or percent <= 0:
+                self.candidate = None
+                self.shadow_percent = 0.0
+                return None
+            if version not in self.versions:
+                raise KeyError(version)
+            self.candidate = self.versions[version]
+            self.shadow_percent = min(float(percent), 100.0)
+            self.shadow_stats = {"batches": 0, "rows": 0, "agreed": 0, "dropped": 0, "errors": 0}
+            return self.candidate
+
+    # -------------------------------
+    # Scoring
+    # -------------------------------
+    def score_rows(self, features):
+        """Score with the active model -> [(pred_class, prob_dict, version), ...]"""
+        active = self.active
+        rows = active.score_rows(features)
+        self._maybe_shadow(features, [c for c, _ in rows])
+        return [(c, p, active.version) for c, p in rows]
+
+    def _maybe_shadow(self, features, active_classes):
+        candidate = self.candidate
+        if candidate is None or random.random() * 100.0 >= self.shadow_percent:
+            return
+        # Shadow scoring must never slow down or block the request path
+        with self._lock:
+            if self._shadow_pending >= self._max_shadow_pending:
+                self.shadow_stats["dropped"] += 1
+                return
+            self._shadow_pending += 1
+        self._shadow_executor.submit(self._shadow_score, candidate, np.array(features), active_classes)
+
+    def _shadow_score(self, candidate, features, active_classes):
+        try:
+            shadow_classes, _ = candidate.score(features)
+            agreed = int(sum(str(a) == str(b) for a, b in zip(active_classes, shadow_classes)))
+            with self._lock:
+                self.shadow_stats["batches"] += 1
+                self.shadow_stats["rows"] += len(features)
+                self.shadow_stats["agreed"] += agreed
+        except Exception:
+            with self._lock:
+                self.shadow_stats["errors"] += 1
+        finally:
+            with self._lock:
+                self._shadow_pending -= 1
+
+    def describe(self):
+        with self._lock:
+            versions = list(self.versions.values())
+            candidate = self.candidate
+            stats = dict(self.shadow_stats)
+        return {
+            "active": getattr(self.active, 'version', None),
+            "candidate": getattr(candidate, 'version', None),
+            "shadow_percent": self.shadow_percent,
+            "shadow": {**stats, "agreement": round(stats["agreed"] / stats["rows"], 4) if stats["rows"] else None},
+            "versions": [v.describe() for v in versions],
+        }
+
+
+async def watch_artifact(registry, path, interval=5.0, fallback=None):
+    """Poll an artifact's mtime/size and activate it whenever it changes; while
+    `path` does not exist, `fallback` (e.g. the legacy pickle) is watched instead"""
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+
+    def signature():
+        for candidate in (path, fallback):
+            if candidate is None:
+                continue
+            try:
+                stat = os.stat(candidate)
+                return candidate, stat.st_mtime_ns, stat.st_size
+            except FileNotFoundError:
+                continue
+        return None
+
+    last = signature()
+    while True:
+        await asyncio.sleep(interval)
+        current = signature()
+        if current is None or current == last:
+            continue
+        last = current
+        source = current[0]
+        try:
+            loaded = await run_in_threadpool(registry.load, source, True)
+            print(f"✓ Reloaded model {loaded.version} from {source}")
+        except Exception as e:
+            print(f"⚠️ Model reload from {source} failed: {e}")
@@ -1,11 +1,19 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn.model_selection import train_test_split, StratifiedKFold
+from sklearn.base import clone
+from joblib import Parallel, delayed
+import itertools
+import os
+import sys
+import time
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.svm import SVC
 from sklearn.neighbors import KNeighborsClassifier
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neural_network import MLPClassifier
 from sklearn.metrics import (classification_report, confusion_matrix, accuracy_score, 
                              f1_score, recall_score, precision_score)
 from sklearn.metrics import roc_curve, auc, precision_recall_curve, RocCurveDisplay, PrecisionRecallDisplay
@@ -15,13 +23,23 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
 warnings.filterwarnings('ignore')
+from focus_areas import (rank_focus_areas, DOMAINS as FOCUS_DOMAINS, SCORE_COLUMNS as FOCUS_SCORE_COLUMNS,
+                         FEATURE_COLUMNS)
+from training_cache import TrainingCache, DEFAULT_CACHE_DIR
+from evaluation import ModelEvaluation, render_figures
+from training_profile import PROFILE
+from dataset_loader import (load_dataset, iter_csv_compact, load_prediction_log, iter_prediction_log,
+                            DIFFICULTY_CATEGORIES)
+from drift_monitor import DriftSketch
+from prediction_log import log_segments
+from hyperparameter_search import successive_halving, save_best_params, load_best_params, DEFAULT_LOG, DEFAULT_BEST
 
 # ========================================
 # 1. LOAD AND PREPARE DATA
 # ========================================
-def load_data(filepath='dyslexia_focus_areas_20000.csv'):
-    """Load the dyslexia focus area dataset"""
-    df = pd.read_csv(filepath)
+def load_data(filepath='dyslexia_focus_areas_20000.csv', columns=None):
+    """Load the dyslexia focus area dataset (uint8 scores, categorical labels; cached as .npy columns)"""
+    df = load_dataset(filepath, columns)
     print("="*70)
     print("DATASET LOADED")
     print("="*70)
@@ -34,14 +52,19 @@ def load_data(filepath='dyslexia_focus_areas_20000.csv'):
     return df
 
 
+def append_prediction_log(df, directory, min_confidence):
+    """Add logged API predictions (labelled with the predicted class) to the training rows"""
+    logged = load_prediction_log(directory, list(df.columns), min_confidence)
+    print(f"\nPrediction log {directory}: {len(logged)} rows with confidence >= {min_confidence}")
+    if not len(logged):
+        return df
+    print(logged['difficulty_level'].value_counts())
+    return pd.concat([df, logged], ignore_index=True)
+
+
 def prepare_data(df):
     """Prepare features and target for training"""
-    feature_columns = [
-        'age',
-        'reading_speed', 'reading_accuracy', 'reading_comprehension',
-        'writing_speed', 'writing_quality', 'grammar_sentence',
-        'phonetic_spelling', 'irregular_word_spelling', 'spelling_accuracy'
-    ]
+    feature_columns = FEATURE_COLUMNS
     
     X = df[feature_columns].values
     y = df['difficulty_level'].values
@@ -59,6 +82,15 @@ def prepare_data(df):
     return X, y_encoded, le, feature_columns
 
 
+DATASET_PATH = 'dyslexia_focus_areas_20000.csv'
+# Logged predictions are pseudo-labels; only confident ones are trained on by default
+LOG_MIN_CONFIDENCE = 0.9
+SPLIT_PARAMS = {'test_size': 0.2, 'random_state': 42}
+CV_PARAMS = {'n_splits': 5, 'shuffle': True, 'random_state': 42}
+# Training rows used to time the candidates, verify the bundle and label the drift reference
+CHECK_ROWS = 2000
+
+
 def split_and_scale_data(X, y, test_size=0.2, random_state=42):
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=test_size, random_state=random_state, stratify=y
@@ -76,11 +108,24 @@ def split_and_scale_data(X, y, test_size=0.2, random_state=42):
     
     return X_train_scaled, X_test_scaled, y_train, y_test, scaler
 
+
+def training_rows(X, y, test_size=0.2, random_state=42):
+    """Unscaled training rows of split_and_scale_data's split (same arguments, same rows)"""
+    X_train, _, _, _ = train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
+    return X_train
+
+
+def check_sample(X, n=CHECK_ROWS, random_state=42):
+    """At most `n` rows of X, drawn without replacement"""
+    if len(X) <= n:
+        return X
+    return X[np.random.default_rng(random_state).choice(len(X), n, replace=False)]
+
 # ========================================
 # 2. TRAIN 5 ALGORITHMS WITH 5-FOLD CROSS-VALIDATION
 # ========================================
-def train_models(X_train, y_train):
-    
+def build_models(params=None):
+    """The five candidate estimators (unfitted); `params` overrides hyperparameters per model name"""
     models = {
         'Random Forest': RandomForestClassifier(
             n_estimators=150,
@@ -124,31 +169,85 @@ def train_models(X_train, y_train):
             p=2
         )
     }
-    
+    for name, overrides in (params or {}).items():
+        models[name].set_params(**overrides)
+    return models
+
+
+def _fit_task(model, X, y, train_idx=None, test_idx=None):
+    """One unit of training work: a CV fold (-> accuracy, weighted F1) or the full fit"""
+    # The tasks already run in parallel; an estimator's own n_jobs=-1 would oversubscribe the cores
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+    start = time.perf_counter()
+    if train_idx is None:
+        model.fit(X, y)
+        return model, model.score(X, y), time.perf_counter() - start
+    model.fit(X[train_idx], y[train_idx])
+    y_pred = model.predict(X[test_idx])
+    scores = (accuracy_score(y[test_idx], y_pred), f1_score(y[test_idx], y_pred, average='weighted'))
+    return None, scores, time.perf_counter() - start
+
+
+def train_models(X_train, y_train, n_jobs=-1, cache=None, params=None):
+    """Fit each model and score it with 5-fold CV.
+
+    Every fold is fitted once and scored for both accuracy and weighted F1;
+    the folds and full fits of all five models are spread over `n_jobs`
+    worker processes. Fold splits and estimator seeds are fixed, so the
+    scores do not depend on the worker count. Models with a valid entry in
+    `cache` (a TrainingCache) are loaded instead of refitted. `params`
+    (e.g. from the hyperparameter search) overrides the defaults per model.
+    """
+    models = build_models(params)
     trained_models = {}
     
     print("\n" + "="*70)
     print("TRAINING 5 ALGORITHMS WITH 5-FOLD CROSS-VALIDATION")
     print("="*70)
     
-    skf = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
-    
-    for name, model in models.items():
+    skf = StratifiedKFold(**CV_PARAMS)
+    folds = list(skf.split(X_train, y_train))
+
+    cached = {}
+    if cache is not None:
+        for name, model in models.items():
+            entry = cache.load(cache.key(name, model))
+            if entry is not None and {'model', 'train_score', 'cv_scores'} <= set(entry):
+                cached[name] = entry
+    stale = [name for name in models if name not in cached]
+
+    # (model name, fold index or None for the full fit) for every unit of work
+    tasks = [(name, None) for name in stale] + [(name, i) for name in stale for i in range(len(folds))]
+    start = time.perf_counter()
+    outputs = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_task)(clone(models[name]), X_train, y_train, *(folds[i] if i is not None else ()))
+        for name, i in tasks
+    )
+    wall_clock = time.perf_counter() - start
+    results = dict(zip(tasks, outputs))
+
+    for name in stale:
+        model, train_score, _ = results[(name, None)]
+        cached[name] = {'model': model, 'train_score': train_score,
+                        'cv_scores': np.array([results[(name, i)][1] for i in range(len(folds))])}
+        if cache is not None:
+            cache.store(cache.key(name, models[name]), name, cached[name])
+    
+    for name in models:
         print(f"\n{'='*70}")
         print(f"Training: {name}")
         print(f"{'='*70}")
+        if name not in stale:
+            print("✓ Loaded from training cache")
         
-        # Train model
-        model.fit(X_train, y_train)
-        
-        # 5-Fold CV
-        cv_scores = cross_val_score(model, X_train, y_train, cv=skf, scoring='accuracy')
-        cv_f1 = cross_val_score(model, X_train, y_train, cv=skf, scoring='f1_weighted')
+        model, train_score = cached[name]['model'], cached[name]['train_score']
+        fold_scores = cached[name]['cv_scores']
+        cv_scores, cv_f1 = fold_scores[:, 0], fold_scores[:, 1]
         
         print(f"5-Fold CV Accuracy: {cv_scores.mean():.4f} (+/- {cv_scores.std()*2:.4f})")
         print(f"5-Fold CV F1-Score: {cv_f1.mean():.4f} (+/- {cv_f1.std()*2:.4f})")
         
-        train_score = model.score(X_train, y_train)
         print(f"Training Accuracy: {train_score:.4f}")
         
         if train_score - cv_scores.mean() > 0.05:
@@ -159,11 +258,28 @@ def train_models(X_train, y_train):
             print("✓ Good fit: Training and CV scores are balanced")
         
         trained_models[name] = model
+
+    if not stale:
+        print(f"\n⏱  All {len(models)} models loaded from the training cache")
+        return trained_models
+
+    # Previously every fold was fitted twice (once per metric) and nothing ran in parallel
+    full_fits = sum(results[(name, None)][2] for name in stale)
+    fold_fits = sum(results[(name, i)][2] for name in stale for i in range(len(folds)))
+    serial_before = full_fits + 2 * fold_fits
+    print(f"\n⏱  Training + CV wall-clock: {wall_clock:.1f}s with n_jobs={n_jobs} for {len(stale)} models "
+          f"(single-pass serial work {full_fits + fold_fits:.1f}s, "
+          f"previous two-pass serial estimate {serial_before:.1f}s, "
+          f"saving {serial_before - wall_clock:.1f}s / {1 - wall_clock / serial_before:.0%})")
     
     return trained_models
 
-def evaluate_models(models, X_test, y_test, label_encoder):
-    """Evaluate all models with Accuracy, F1, Recall, Precision"""
+def evaluate_models(models, X_test, y_test, label_encoder, cache=None):
+    """Evaluate all models with Accuracy, F1, Recall, Precision.
+
+    Each result carries its ModelEvaluation under 'evaluation', which the
+    figures reuse (probabilities and curves are computed at most once).
+    """
     results = {}
     
     print("\n" + "="*70)
@@ -175,8 +291,13 @@ def evaluate_models(models, X_test, y_test, label_encoder):
         print(f"{name}")
         print(f"{'='*70}")
         
-        # Predictions
-        y_pred = model.predict(X_test)
+        # Predictions (test-set artifacts are cached alongside the fitted model)
+        evaluation = ModelEvaluation(model, X_test, y_test, len(label_encoder.classes_), cache,
+                                     cache.key(name, model) if cache is not None else None, name)
+        y_pred = evaluation.predictions
+        # The figures need the probabilities too: compute them now so the entry is rewritten once
+        evaluation.probabilities
+        evaluation.save()
         
         # Calculate metrics
         accuracy = accuracy_score(y_test, y_pred)
@@ -203,11 +324,208 @@ def evaluate_models(models, X_test, y_test, label_encoder):
             'recall': recall_weighted,
             'precision': precision_weighted,
             'predictions': y_pred,
-            'confusion_matrix': confusion_matrix(y_test, y_pred)
+            'confusion_matrix': evaluation.confusion_matrix,
+            'evaluation': evaluation,
         }
     
     return results
 
+# ========================================
+# 3b. OUT-OF-CORE (STREAMING) TRAINING
+# ========================================
+# For CSVs that do not fit in memory. The file is read in chunks, and each
+# row is assigned to the train or holdout side by a per-class counter
+# (every 1/test_size-th row of each class goes to the holdout), so the split
+# is stratified and identical on every pass. Pass 1 fits the StandardScaler
+# and counts classes, then each epoch streams the training rows through
+# `partial_fit`, and a final pass accumulates holdout confusion matrices.
+# Memory is bounded by the chunk size: no pass keeps more than one chunk, plus
+# a fixed sample of CHECK_ROWS training rows for save_best_model.
+
+STREAMING_CHUNK_SIZE = 50_000
+STREAMING_EPOCHS = 5
+
+
+class StreamingHoldout:
+    """Deterministic stratified train/holdout assignment for rows read in file order"""
+
+    def __init__(self, n_classes, test_size=0.2, random_state=42):
+        self.test_size = test_size
+        # A per-class phase spreads holdout rows differently for each class
+        self.phase = np.random.default_rng(random_state).uniform(size=n_classes)
+        self.seen = np.zeros(n_classes, dtype=np.int64)
+
+    def reset(self):
+        self.seen[:] = 0
+
+    def split(self, y):
+        """Boolean holdout mask for the next chunk of encoded labels"""
+        mask = np.zeros(len(y), dtype=bool)
+        for k in np.unique(y):
+            idx = np.flatnonzero(y == k)
+            ranks = self.seen[k] + np.arange(len(idx))
+            mask[idx] = (np.floor((ranks + 1) * self.test_size + self.phase[k])
+                         > np.floor(ranks * self.test_size + self.phase[k]))
+            self.seen[k] += len(idx)
+        return mask
+
+
+def build_streaming_models(class_weight=None):
+    """Estimators that learn incrementally with partial_fit"""
+    return {
+        'SGD Logistic Regression': SGDClassifier(
+            loss='log_loss',
+            alpha=1e-4,
+            class_weight=class_weight,
+            random_state=42
+        ),
+        'Gaussian Naive Bayes': GaussianNB(),
+        'Neural Network (MLP)': MLPClassifier(
+            hidden_layer_sizes=(64, 32),
+            alpha=1e-4,
+            learning_rate_init=1e-3,
+            random_state=42
+        ),
+    }
+
+
+def iter_encoded_chunks(filepath, chunk_size, holdout, prediction_log=None, min_confidence=LOG_MIN_CONFIDENCE):
+    """(X chunk, encoded labels, holdout mask) in file order, then the prediction log's
+    segments; the holdout assignment restarts each pass"""
+    holdout.reset()
+    columns = FEATURE_COLUMNS + ['difficulty_level']
+    chunks = iter_csv_compact(filepath, columns, chunk_size)
+    if prediction_log:
+        chunks = itertools.chain(chunks, iter_prediction_log(prediction_log, columns, min_confidence))
+    # Schema categories are sorted, so category codes are LabelEncoder indices
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        y = chunk['difficulty_level'].cat.codes.to_numpy(dtype=np.intp)
+        yield chunk[FEATURE_COLUMNS].to_numpy(), y, holdout.split(y)
+
+
+def metrics_from_confusion(cm):
+    """Accuracy and weighted F1/recall/precision (zero_division=0) from a confusion matrix"""
+    cm = np.asarray(cm, dtype=np.float64)
+    support, predicted, tp = cm.sum(axis=1), cm.sum(axis=0), np.diag(cm)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall,
+                   out=np.zeros_like(tp), where=(precision + recall) > 0)
+    weights = support / support.sum()
+    return {
+        'accuracy': float(tp.sum() / cm.sum()),
+        'f1_score': float(weights @ f1),
+        'recall': float(weights @ recall),
+        'precision': float(weights @ precision),
+        'per_class': np.column_stack([precision, recall, f1, support]),
+    }
+
+
+def train_streaming(filepath=DATASET_PATH, chunk_size=STREAMING_CHUNK_SIZE, epochs=STREAMING_EPOCHS,
+                    test_size=0.2, random_state=42, prediction_log=None, log_min_confidence=LOG_MIN_CONFIDENCE):
+    """Fit the scaler and the partial_fit models chunk by chunk.
+
+    Returns (models, results, scaler, label_encoder, X_check, drift_sketch)
+    with `results` shaped like evaluate_models' output (without per-row
+    predictions), so the plots and save_best_model work unchanged.
+    `drift_sketch` summarises every training row for the drift monitor.
+    """
+    classes = np.arange(len(DIFFICULTY_CATEGORIES))
+    holdout = StreamingHoldout(len(classes), test_size, random_state)
+    sources = {'prediction_log': prediction_log, 'min_confidence': log_min_confidence}
+    rng = np.random.default_rng(random_state)
+
+    print("\n" + "="*70)
+    print(f"STREAMING TRAINING ({chunk_size} rows per chunk, {epochs} epochs)")
+    print("="*70)
+
+    # Pass 1: scaler statistics, class counts, the drift reference and a fixed
+    # training sample for the cost measurement and the bundle check
+    start = time.perf_counter()
+    scaler = StandardScaler()
+    drift_sketch = DriftSketch.for_features(FEATURE_COLUMNS, len(classes))
+    train_counts = np.zeros(len(classes), dtype=np.int64)
+    holdout_counts = np.zeros(len(classes), dtype=np.int64)
+    check_rows = []
+    n_check = 0
+    for X, y, mask in iter_encoded_chunks(filepath, chunk_size, holdout, **sources):
+        scaler.partial_fit(X[~mask])
+        drift_sketch.update(X[~mask])
+        train_counts += np.bincount(y[~mask], minlength=len(classes))
+        holdout_counts += np.bincount(y[mask], minlength=len(classes))
+        if n_check < CHECK_ROWS:
+            check_rows.append(X[~mask][:CHECK_ROWS - n_check])
+            n_check += len(check_rows[-1])
+    X_check = np.concatenate(check_rows) if check_rows else None
+
+    # Category codes index DIFFICULTY_CATEGORIES, so every class must be present
+    missing = [c for c, count in zip(DIFFICULTY_CATEGORIES, train_counts) if count == 0]
+    if missing:
+        raise ValueError(f"{filepath}: no training rows for {missing}")
+    label_encoder = LabelEncoder().fit(DIFFICULTY_CATEGORIES)
+    n_train, n_holdout = int(train_counts.sum()), int(holdout_counts.sum())
+    print(f"Training samples: {n_train} ({n_train/(n_train + n_holdout)*100:.1f}%)")
+    print(f"Holdout samples:  {n_holdout} ({n_holdout/(n_train + n_holdout)*100:.1f}%)")
+    print(f"Target classes: {label_encoder.classes_}")
+    print(f"⏱  Scaler pass: {time.perf_counter() - start:.1f}s")
+
+    # 'balanced' weights from the pass-1 counts (partial_fit cannot compute them itself)
+    class_weight = {int(k): n_train / (len(classes) * count) for k, count in enumerate(train_counts)}
+    models = build_streaming_models(class_weight)
+
+    # Epochs: shuffled training rows of each chunk through every model's partial_fit.
+    # The last epoch also tracks progressive (predict-then-fit) training accuracy.
+    progressive = {name: [0, 0] for name in models}
+    for epoch in range(epochs):
+        epoch_start = time.perf_counter()
+        last = epoch == epochs - 1
+        for X, y, mask in iter_encoded_chunks(filepath, chunk_size, holdout, **sources):
+            order = rng.permutation(np.flatnonzero(~mask))
+            X_train, y_train = scaler.transform(X[order]), y[order]
+            for name, model in models.items():
+                if last and epoch > 0:
+                    progressive[name][0] += int((model.predict(X_train) == y_train).sum())
+                    progressive[name][1] += len(y_train)
+                model.partial_fit(X_train, y_train, classes=classes)
+        print(f"  Epoch {epoch + 1}/{epochs}: {time.perf_counter() - epoch_start:.1f}s")
+
+    # Holdout pass: confusion matrices accumulated chunk by chunk
+    confusion = {name: np.zeros((len(classes), len(classes)), dtype=np.int64) for name in models}
+    for X, y, mask in iter_encoded_chunks(filepath, chunk_size, holdout, **sources):
+        if not mask.any():
+            continue
+        X_holdout, y_holdout = scaler.transform(X[mask]), y[mask]
+        for name, model in models.items():
+            np.add.at(confusion[name], (y_holdout, model.predict(X_holdout)), 1)
+
+    print("\n" + "="*70)
+    print("MODEL EVALUATION ON STREAMED HOLDOUT")
+    print("="*70)
+    results = {}
+    for name in models:
+        metrics = metrics_from_confusion(confusion[name])
+        per_class = metrics.pop('per_class')
+        print(f"\n{'='*70}")
+        print(f"{name}")
+        print(f"{'='*70}")
+        correct, seen = progressive[name]
+        if seen:
+            print(f"Training Accuracy (progressive, last epoch): {correct / seen:.4f}")
+        print(f"Accuracy:  {metrics['accuracy']:.4f}")
+        print(f"F1-Score:  {metrics['f1_score']:.4f}")
+        print(f"Recall:    {metrics['recall']:.4f}")
+        print(f"Precision: {metrics['precision']:.4f}")
+        print(f"\n{'':>12} {'precision':>10} {'recall':>10} {'f1-score':>10} {'support':>10}")
+        for class_name, (p, r, f, n) in zip(label_encoder.classes_, per_class):
+            print(f"{class_name:>12} {p:10.4f} {r:10.4f} {f:10.4f} {int(n):10d}")
+        results[name] = {**metrics, 'confusion_matrix': confusion[name]}
+
+    print(f"\n⏱  Streaming training wall-clock: {time.perf_counter() - start:.1f}s")
+    return models, results, scaler, label_encoder, X_check, drift_sketch
+
+
 # ========================================
 # 4. VISUALIZATIONS
 # ========================================
@@ -274,20 +592,21 @@ def plot_confusion_matrices(results, label_encoder):
         axes[idx].set_ylabel('True Label', fontweight='bold')
         axes[idx].set_xlabel('Predicted Label', fontweight='bold')
     
-    # Hide extra subplot
-    axes[-1].axis('off')
+    # Hide extra subplots
+    for ax in axes[len(results):]:
+        ax.axis('off')
     
-    plt.suptitle('Confusion Matrices - All 5 Algorithms', 
+    plt.suptitle(f'Confusion Matrices - All {len(results)} Algorithms', 
                 fontsize=16, fontweight='bold', y=0.995)
     plt.tight_layout()
     plt.savefig('confusion_matrices_all.png', dpi=300, bbox_inches='tight')
     print("✓ Saved: confusion_matrices_all.png")
     plt.show()
 
-def plot_class_performance(results, label_encoder):
-    """Plot per-class performance for best model"""
-    # Find best model
-    best_model_name = max(results, key=lambda x: results[x]['f1_score'])
+def plot_class_performance(results, label_encoder, best_model_name=None):
+    """Plot per-class performance for the selected model (best F1 if none given)"""
+    if best_model_name not in results:
+        best_model_name = max(results, key=lambda x: results[x]['f1_score'])
     best_result = results[best_model_name]
     
     cm = best_result['confusion_matrix']
@@ -340,40 +659,418 @@ def plot_class_performance(results, label_encoder):
 # ========================================
 # 5. SAVE BEST MODEL
 # ========================================
+# Candidates are ranked by weighted F1, but serving cost differs by orders of
+# magnitude (a 150-tree forest, a calibrated RBF SVC, a KNN that scans every
+# training row). Each candidate's serving path is measured: the compiled
+# bundle evaluator when the model can be bundled and passes the same check
+# export_model_bundle applies, else scaler + predict + predict_proba as the
+# legacy loader runs it. By default the best F1 is saved, as before (latency
+# only breaks exact ties); --select-epsilon opts in to saving the fastest
+# model within `epsilon` of the best F1. The full table, with the Pareto
+# front over (F1, latency), is written to <filename>_selection.json.
+
+SELECTION_EPSILON = 0.0
+SELECTION_LATENCY = 'single_row_us'
+SERVING_BATCH_ROWS = 256
+
+
+def _sklearn_serving_fn(model, scaler):
+    def score(X):
+        X_scaled = scaler.transform(X)
+        pred_idx = model.predict(X_scaled)
+        probs = model.predict_proba(X_scaled) if hasattr(model, 'predict_proba') else None
+        return pred_idx, probs
+    return score
+
+
+def measure_serving_cost(model, scaler, label_encoder, X, single_repeats=200, batch_repeats=20):
+    """Single-row / batch latency, artifact size and memory footprint of the path that would serve `model`"""
+    import pickle
+    import tracemalloc
+    from compiled_model import CompiledModel
+
+    X = np.asarray(X, dtype=np.float64)
+    # Size and resident footprint of what the API loads: only a compiled model
+    # that export_model_bundle would accept is served from a bundle
+    try:
+        arrays = compile_model_arrays(model, scaler, label_encoder)
+        compiled = CompiledModel(arrays)
+        if not compiled_matches_sklearn(compiled, model, scaler, X)[0]:
+            raise TypeError(f"compiled {type(model).__name__} disagrees with sklearn")
+        serving = 'compiled'
+        # Bundles are memory-mapped as-is, so the footprint is the array data
+        size_bytes = resident_bytes = int(sum(np.asarray(v).nbytes for v in arrays.values()))
+        score = compiled.score
+    except TypeError:
+        blob = pickle.dumps(model)
+        serving = 'sklearn'
+        size_bytes = len(blob)
+        tracemalloc.start()
+        loaded = pickle.loads(blob)
+        resident_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        score = _sklearn_serving_fn(loaded, scaler)
+
+    rows = X[np.random.default_rng(0).integers(0, len(X), size=single_repeats)]
+    score(rows[:1])  # warm-up
+    single = []
+    for i in range(single_repeats):
+        start = time.perf_counter()
+        score(rows[i:i + 1])
+        single.append(time.perf_counter() - start)
+
+    batch = X[:SERVING_BATCH_ROWS]
+    tracemalloc.start()
+    score(batch)
+    batch_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    batch_times = []
+    for _ in range(batch_repeats):
+        start = time.perf_counter()
+        score(batch)
+        batch_times.append(time.perf_counter() - start)
+
+    return {
+        'serving': serving,
+        'single_row_us': float(np.median(single) * 1e6),
+        'single_row_p95_us': float(np.percentile(single, 95) * 1e6),
+        'batch_us_per_row': float(np.median(batch_times) / len(batch) * 1e6),
+        'size_bytes': size_bytes,
+        'memory_bytes': int(resident_bytes),
+        'batch_peak_bytes': int(batch_peak),
+    }
+
+
+def select_model(results, costs=None, epsilon=SELECTION_EPSILON, latency=SELECTION_LATENCY):
+    """(winner, table): fastest model within epsilon of the best F1, plus a Pareto-annotated table"""
+    best_f1 = max(result['f1_score'] for result in results.values())
+    table = []
+    for name, result in results.items():
+        row = {'model': name, **{k: float(result[k]) for k in ('f1_score', 'accuracy', 'recall', 'precision')}}
+        row.update((costs or {}).get(name, {}))
+        row['within_epsilon'] = bool(result['f1_score'] >= best_f1 - epsilon)
+        table.append(row)
+
+    if not costs:
+        winner = max(results, key=lambda x: results[x]['f1_score'])
+    else:
+        eligible = [row for row in table if row['within_epsilon']]
+        winner = min(eligible, key=lambda row: (row[latency], -row['f1_score']))['model']
+        # Pareto front: no other model is both at least as accurate and at least as fast (and better in one)
+        for row in table:
+            row['pareto'] = not any(
+                other['f1_score'] >= row['f1_score'] and other[latency] <= row[latency]
+                and (other['f1_score'] > row['f1_score'] or other[latency] < row[latency])
+                for other in table)
+    for row in table:
+        row['selected'] = row['model'] == winner
+    return winner, sorted(table, key=lambda row: -row['f1_score'])
+
+
+def print_selection_table(table, latency=SELECTION_LATENCY):
+    print(f"\n{'Model':<24} {'F1':>7} {'1-row µs':>10} {'batch µs/row':>13} {'size MB':>8} "
+          f"{'mem MB':>7} {'serving':>9}  ")
+    for row in table:
+        if 'serving' not in row:
+            print(f"{row['model']:<24} {row['f1_score']:7.4f}")
+            continue
+        flags = ('🏆 ' if row['selected'] else '') + ('pareto' if row.get('pareto') else '')
+        print(f"{row['model']:<24} {row['f1_score']:7.4f} {row['single_row_us']:10.1f} "
+              f"{row['batch_us_per_row']:13.2f} {row['size_bytes'] / 1e6:8.2f} "
+              f"{row['memory_bytes'] / 1e6:7.2f} {row['serving']:>9}  {flags}")
+
 
-def save_best_model(models, results, scaler, label_encoder):
-    """Save the best performing model"""
+def build_drift_reference(model, scaler, X, feature_columns, sketch=None):
+    """Drift monitor reference: feature histograms of X (unless `sketch` already
+    covers the training rows) plus the model's predicted-class mix on X"""
+    n_classes = len(model.classes_)
+    if sketch is None:
+        sketch = DriftSketch.for_features(feature_columns, n_classes)
+        sketch.update(X)
+    sketch.class_counts = np.bincount(model.predict(scaler.transform(X)), minlength=n_classes)
+    return sketch
+
+
+def save_best_model(models, results, scaler, label_encoder, feature_columns=None, X_check=None,
+                    filename='best_dyslexia_focus_model', epsilon=SELECTION_EPSILON, latency=SELECTION_LATENCY,
+                    drift_sketch=None):
+    """Save the selected model as a single versioned model bundle, with its selection table
+    and the drift monitor's reference sketch"""
+    import json
     import pickle
+    import datetime
+    import sklearn
     
-    # Find best model based on F1-score (better for imbalanced data)
-    best_model_name = max(results, key=lambda x: results[x]['f1_score'])
+    # Serving cost of every candidate (measured on the check rows)
+    costs = None
+    if X_check is not None and len(X_check):
+        costs = {name: measure_serving_cost(models[name], scaler, label_encoder, X_check) for name in results}
+
+    # Best F1 (better for imbalanced data), then the fastest model within epsilon of it
+    best_model_name, table = select_model(results, costs, epsilon, latency)
     best_model = models[best_model_name]
     best_metrics = results[best_model_name]
     
     print("\n" + "="*70)
     print("BEST MODEL SELECTION")
     print("="*70)
+    if costs:
+        if epsilon > 0:
+            print(f"Fastest ({latency}) within ε={epsilon} of the best F1 (--select-epsilon):")
+        else:
+            print(f"Best F1 ({latency} only breaks ties; --select-epsilon trades F1 for latency):")
+        print_selection_table(table, latency)
+        print()
     print(f"🏆 Best Model: {best_model_name}")
     print(f"   Accuracy:  {best_metrics['accuracy']:.4f}")
     print(f"   F1-Score:  {best_metrics['f1_score']:.4f}")
     print(f"   Recall:    {best_metrics['recall']:.4f}")
     print(f"   Precision: {best_metrics['precision']:.4f}")
     
+    metadata = {
+        'model_name': best_model_name,
+        'model_class': type(best_model).__name__,
+        'hyperparameters': {k: v if isinstance(v, (bool, int, float, str, type(None))) else repr(v)
+                            for k, v in best_model.get_params().items()},
+        'feature_columns': list(feature_columns or FEATURE_COLUMNS),
+        'classes': [str(c) for c in label_encoder.classes_],
+        'metrics': {k: float(best_metrics[k]) for k in ('accuracy', 'f1_score', 'recall', 'precision')},
+        'trained_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'sklearn_version': sklearn.__version__,
+        'numpy_version': np.__version__,
+        'selection': {'epsilon': epsilon, 'latency_metric': latency,
+                      'serving_cost': (costs or {}).get(best_model_name)},
+    }
+    
+    # Selection table next to the artifact
+    with open(f'{filename}_selection.json', 'w') as f:
+        json.dump({'epsilon': epsilon, 'latency_metric': latency, 'selected': best_model_name,
+                   'candidates': table}, f, indent=2)
+    print(f"✓ Selection table saved as '{filename}_selection.json'")
+    
+    drift_arrays = {}
+    if X_check is not None and len(X_check):
+        reference = build_drift_reference(best_model, scaler, X_check, metadata['feature_columns'], drift_sketch)
+        drift_arrays = reference.to_arrays()
+        print(f"✓ Drift reference built from {reference.n} rows")
+    
     # Save model
-    filename = 'best_dyslexia_focus_model'
+    if export_model_bundle(best_model, scaler, label_encoder, metadata, X_check, filename, drift_arrays):
+        return best_model_name, best_model
+    
+    # Model could not be flattened into a bundle: fall back to the legacy pickles
     with open(f'{filename}.pkl', 'wb') as f:
         pickle.dump(best_model, f)
     with open(f'{filename}_scaler.pkl', 'wb') as f:
         pickle.dump(scaler, f)
     with open(f'{filename}_labels.pkl', 'wb') as f:
         pickle.dump(label_encoder, f)
+    if drift_arrays:
+        np.savez(f'{filename}_drift.npz', **drift_arrays)
     
     print(f"\n✓ Model saved as '{filename}.pkl'")
     print(f"✓ Scaler saved as '{filename}_scaler.pkl'")
     print(f"✓ Label encoder saved as '{filename}_labels.pkl'")
     
+    # The API serves a bundle whenever one exists: move an older one aside (last,
+    # so the pickles are complete once the bundle disappears)
+    if os.path.exists(f'{filename}.bundle'):
+        os.replace(f'{filename}.bundle', f'{filename}.bundle.old')
+        print(f"⚠️ Previous bundle moved to '{filename}.bundle.old' so the new pickles are served")
+    
     return best_model_name, best_model
 
+# ========================================
+# 5b. COMPILED (PURE-NUMPY) MODEL BUNDLE
+# ========================================
+
+def _flatten_trees(trees, normalize):
+    """Concatenate sklearn tree_ structures into flat node arrays"""
+    roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        t = tree.tree_
+        ids = np.arange(t.node_count)
+        leaf = t.children_left == -1
+
+        value = t.value[:, 0, :].astype(np.float64)
+        if normalize:
+            totals = value.sum(axis=1, keepdims=True)
+            totals[totals == 0] = 1.0
+            value = value / totals
+
+        roots.append(offset)
+        features.append(np.where(leaf, 0, t.feature))
+        thresholds.append(np.where(leaf, 0.0, t.threshold))
+        # Leaves point back to themselves so evaluation runs a fixed number of steps
+        lefts.append(np.where(leaf, ids, t.children_left) + offset)
+        rights.append(np.where(leaf, ids, t.children_right) + offset)
+        values.append(value)
+        max_depth = max(max_depth, t.max_depth)
+        offset += t.node_count
+
+    return {
+        'tree_roots': np.array(roots, dtype=np.intp),
+        'node_feature': np.concatenate(features).astype(np.intp),
+        'node_threshold': np.concatenate(thresholds).astype(np.float64),
+        'node_left': np.concatenate(lefts).astype(np.intp),
+        'node_right': np.concatenate(rights).astype(np.intp),
+        'node_value': np.concatenate(values),
+        'max_depth': np.array(max_depth),
+    }
+
+
+def compile_model_arrays(model, scaler, label_encoder):
+    """Flatten a fitted model + scaler into arrays for compiled_model.CompiledModel"""
+    arrays = {
+        'classes': np.asarray(label_encoder.classes_).astype(str),
+        'scaler_mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scaler_scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'has_proba': np.array(True),
+    }
+
+    if isinstance(model, RandomForestClassifier):
+        arrays.update(_flatten_trees(model.estimators_, normalize=True))
+        arrays['kind'] = np.array('tree_ensemble')
+        arrays['aggregation'] = np.array('mean')
+
+    elif isinstance(model, GradientBoostingClassifier):
+        n_stages, n_outputs = model.estimators_.shape
+        arrays.update(_flatten_trees(model.estimators_.ravel(), normalize=False))
+        arrays['kind'] = np.array('tree_ensemble')
+        arrays['aggregation'] = np.array('boosting')
+        arrays['tree_class'] = np.tile(np.arange(n_outputs), n_stages)
+        arrays['learning_rate'] = np.array(model.learning_rate, dtype=np.float64)
+        zero_row = np.zeros((1, model.n_features_in_), dtype=np.float32)
+        arrays['init_raw'] = np.asarray(model._raw_predict_init(zero_row)[0], dtype=np.float64)
+
+    elif isinstance(model, LogisticRegression):
+        multi_class = getattr(model, 'multi_class', 'auto')
+        if multi_class not in ('ovr', 'multinomial'):
+            multi_class = 'ovr' if model.solver == 'liblinear' else 'multinomial'
+        arrays['kind'] = np.array('linear')
+        arrays['coef'] = np.asarray(model.coef_, dtype=np.float64)
+        arrays['intercept'] = np.asarray(model.intercept_, dtype=np.float64)
+        arrays['multi_class'] = np.array(multi_class)
+
+    elif isinstance(model, SGDClassifier) and model.loss == 'log_loss':
+        # Multi-class SGD is one-vs-rest; predict_proba normalises the per-class sigmoids
+        arrays['kind'] = np.array('linear')
+        arrays['coef'] = np.asarray(model.coef_, dtype=np.float64)
+        arrays['intercept'] = np.asarray(model.intercept_, dtype=np.float64)
+        arrays['multi_class'] = np.array('ovr')
+
+    elif isinstance(model, SVC):
+        if callable(model.kernel) or model.kernel == 'precomputed':
+            raise TypeError(f"Cannot compile SVC with kernel={model.kernel!r}")
+        support_vectors = np.asarray(model.support_vectors_, dtype=np.float64)
+        arrays['kind'] = np.array('svm')
+        arrays['has_proba'] = np.array(bool(model.probability))
+        arrays['kernel'] = np.array(model.kernel)
+        arrays['gamma'] = np.array(model._gamma, dtype=np.float64)
+        arrays['coef0'] = np.array(model.coef0, dtype=np.float64)
+        arrays['degree'] = np.array(model.degree)
+        arrays['support_vectors'] = support_vectors
+        arrays['sv_sq_norm'] = (support_vectors ** 2).sum(axis=1)
+        arrays['n_support'] = np.asarray(model.n_support_, dtype=np.intp)
+        # libsvm-native (unflipped) coefficients, as used by predict/predict_proba
+        arrays['dual_coef'] = np.asarray(model._dual_coef_, dtype=np.float64)
+        arrays['intercept'] = np.asarray(model._intercept_, dtype=np.float64)
+        if model.probability:
+            arrays['prob_a'] = np.asarray(model.probA_, dtype=np.float64)
+            arrays['prob_b'] = np.asarray(model.probB_, dtype=np.float64)
+
+    elif isinstance(model, KNeighborsClassifier):
+        if callable(model.weights):
+            raise TypeError("Cannot compile KNN with callable weights")
+        metric = model.effective_metric_
+        metric_p = {'euclidean': 2, 'manhattan': 1}.get(metric)
+        if metric == 'minkowski':
+            metric_p = model.effective_metric_params_.get('p', model.p)
+        if metric_p is None:
+            raise TypeError(f"Cannot compile KNN with metric={metric!r}")
+        fit_X = np.asarray(model._fit_X, dtype=np.float64)
+        arrays['kind'] = np.array('knn')
+        arrays['fit_X'] = fit_X
+        arrays['fit_sq_norm'] = (fit_X ** 2).sum(axis=1)
+        arrays['fit_y'] = np.asarray(model._y, dtype=np.intp)
+        arrays['n_neighbors'] = np.array(model.n_neighbors)
+        arrays['weights'] = np.array(model.weights)
+        arrays['p'] = np.array(metric_p, dtype=np.float64)
+
+    else:
+        raise TypeError(f"Cannot compile model of type {type(model).__name__}")
+
+    return arrays
+
+
+def export_model_bundle(model, scaler, label_encoder, metadata, X_check=None,
+                        filename='best_dyslexia_focus_model', extra_arrays=None):
+    """Write model arrays, scaler, labels, metadata (and `extra_arrays`, e.g. the
+    drift reference) to one memory-mappable bundle"""
+    from compiled_model import CompiledModel
+    from model_bundle import write_bundle
+
+    path = f'{filename}.bundle'
+    try:
+        arrays = compile_model_arrays(model, scaler, label_encoder)
+    except TypeError as e:
+        print(f"⚠️ Model bundle skipped: {e}")
+        return None
+
+    if X_check is not None and not verify_compiled_model(CompiledModel(arrays), model, scaler, X_check):
+        return None
+
+    checksum = write_bundle(path, {**arrays, **(extra_arrays or {})}, metadata)
+    print(f"\n✓ Model bundle saved as '{path}' ({arrays['kind']}, sha256 {checksum[:12]})")
+    return path
+
+
+def compiled_matches_sklearn(compiled, model, scaler, X, atol=1e-6):
+    """(matches, class agreement, max probability difference) of the compiled evaluator vs sklearn on X"""
+    X_scaled = scaler.transform(X)
+    pred_idx, probs = compiled.score(X)
+    class_match = float(np.mean(pred_idx == model.predict(X_scaled)))
+    max_prob_diff = 0.0
+    if probs is not None:
+        max_prob_diff = float(np.abs(probs - model.predict_proba(X_scaled)).max())
+    return class_match == 1.0 and max_prob_diff <= atol, class_match, max_prob_diff
+
+
+def verify_compiled_model(compiled, model, scaler, X, atol=1e-6):
+    """Check the compiled evaluator against sklearn class-for-class and probability-for-probability"""
+    matches, class_match, max_prob_diff = compiled_matches_sklearn(compiled, model, scaler, X, atol)
+
+    # Single-row latency: compiled one-pass vs sklearn transform + predict + predict_proba
+    row = X[:1]
+    n_repeats = 200
+    start = time.perf_counter()
+    for _ in range(n_repeats):
+        compiled.score(row)
+    compiled_us = (time.perf_counter() - start) / n_repeats * 1e6
+    start = time.perf_counter()
+    for _ in range(n_repeats):
+        row_scaled = scaler.transform(row)
+        model.predict(row_scaled)
+        if hasattr(model, 'predict_proba'):
+            model.predict_proba(row_scaled)
+    sklearn_us = (time.perf_counter() - start) / n_repeats * 1e6
+
+    print("\n" + "="*70)
+    print("COMPILED MODEL VERIFICATION")
+    print("="*70)
+    print(f"Rows checked:         {len(X)}")
+    print(f"Class agreement:      {class_match*100:.2f}%")
+    print(f"Max probability diff: {max_prob_diff:.2e}")
+    print(f"Single-row latency:   {compiled_us:.1f} µs compiled vs {sklearn_us:.1f} µs sklearn")
+
+    if not matches:
+        print("⚠️ Compiled model disagrees with sklearn - not bundling it")
+        return False
+    print("✓ Compiled model matches sklearn")
+    return True
+
 # ========================================
 # 6. PREDICT FOCUS AREAS
 # ========================================
@@ -386,6 +1083,11 @@ def predict_with_focus_areas(model, scaler, label_encoder, df):
     
     # Get a random sample from test data
     sample = df.sample(1).iloc[0]
+
+    # Domain averages and focus ordering from the same engine the API uses
+    averages, order = rank_focus_areas(sample[FOCUS_SCORE_COLUMNS].to_numpy(dtype=float))
+    reading_avg, writing_avg, spelling_avg = averages[0]
+    ranked = [(FOCUS_DOMAINS[i], averages[0, i]) for i in order[0]]
     
     print(f"\nStudent Profile:")
     print(f"  Age: {sample['age']} years")
@@ -393,17 +1095,17 @@ def predict_with_focus_areas(model, scaler, label_encoder, df):
     print(f"  Speed: {sample['reading_speed']}")
     print(f"  Accuracy: {sample['reading_accuracy']}")
     print(f"  Comprehension: {sample['reading_comprehension']}")
-    print(f"  Average: {sample['reading_avg']}")
+    print(f"  Average: {reading_avg:.2f}")
     print(f"\n✍️  Writing Scores:")
     print(f"  Speed: {sample['writing_speed']}")
     print(f"  Quality: {sample['writing_quality']}")
     print(f"  Grammar: {sample['grammar_sentence']}")
-    print(f"  Average: {sample['writing_avg']}")
+    print(f"  Average: {writing_avg:.2f}")
     print(f"\n🔤 Spelling Scores:")
     print(f"  Phonetic: {sample['phonetic_spelling']}")
     print(f"  Irregular: {sample['irregular_word_spelling']}")
     print(f"  Accuracy: {sample['spelling_accuracy']}")
-    print(f"  Average: {sample['spelling_avg']}")
+    print(f"  Average: {spelling_avg:.2f}")
     
     # Prepare features
     features = [
@@ -431,9 +1133,9 @@ def predict_with_focus_areas(model, scaler, label_encoder, df):
     print(f"Predicted Difficulty: {predicted_difficulty}")
     print(f"Actual Difficulty: {sample['difficulty_level']}")
     print(f"\n📌 Focus Areas (Weakest to Strongest):")
-    print(f"  1️⃣  PRIMARY FOCUS: {sample['primary_focus']} ({sample[sample['primary_focus'].lower() + '_avg']}/100)")
-    print(f"  2️⃣  Secondary Focus: {sample['secondary_focus']} ({sample[sample['secondary_focus'].lower() + '_avg']}/100)")
-    print(f"  3️⃣  Tertiary Focus: {sample['tertiary_focus']} ({sample[sample['tertiary_focus'].lower() + '_avg']}/100)")
+    print(f"  1️⃣  PRIMARY FOCUS: {ranked[0][0]} ({ranked[0][1]:.2f}/100)")
+    print(f"  2️⃣  Secondary Focus: {ranked[1][0]} ({ranked[1][1]:.2f}/100)")
+    print(f"  3️⃣  Tertiary Focus: {ranked[2][0]} ({ranked[2][1]:.2f}/100)")
 
 # ========================================
 # 7. MAIN EXECUTION
@@ -486,13 +1188,8 @@ def plot_feature_distributions(df, features):
     plt.show()
 
 
-def plot_model_confidence_curve(model, X_test, y_test, label_encoder):
+def plot_model_confidence_curve(y_proba, label_encoder):
     """Plot predicted probability distribution for each class."""
-    if not hasattr(model, "predict_proba"):
-        print("⚠️ Confidence curves require models with predict_proba() method")
-        return
-    
-    y_proba = model.predict_proba(X_test)
     classes = label_encoder.classes_
     
     plt.figure(figsize=(12, 6))
@@ -509,23 +1206,13 @@ def plot_model_confidence_curve(model, X_test, y_test, label_encoder):
     plt.show()
 
 
-def plot_roc_auc_multiclass(model, X_test, y_test, label_encoder):
-    """Plot ROC curves for multi-class classification."""
-    from sklearn.preprocessing import label_binarize
-    
-    if not hasattr(model, "predict_proba"):
-        print("⚠️ ROC-AUC requires models with predict_proba() method")
-        return
-    
+def plot_roc_auc_multiclass(roc_curves, label_encoder):
+    """Plot ROC curves for multi-class classification (per class: fpr, tpr, auc)."""
     classes = label_encoder.classes_
-    y_test_bin = label_binarize(y_test, classes=np.arange(len(classes)))
-    y_score = model.predict_proba(X_test)
     
     plt.figure(figsize=(10, 8))
     
-    for i in range(len(classes)):
-        fpr, tpr, _ = roc_curve(y_test_bin[:, i], y_score[:, i])
-        roc_auc = auc(fpr, tpr)
+    for i, (fpr, tpr, roc_auc) in enumerate(roc_curves):
         plt.plot(fpr, tpr, label=f"{classes[i]} (AUC = {roc_auc:.3f})")
     
     plt.plot([0, 1], [0, 1], 'k--')
@@ -539,22 +1226,13 @@ def plot_roc_auc_multiclass(model, X_test, y_test, label_encoder):
     plt.show()
 
 
-def plot_precision_recall_multiclass(model, X_test, y_test, label_encoder):
-    """Plot Precision-Recall curves for multi-class classification."""
-    from sklearn.preprocessing import label_binarize
-    
-    if not hasattr(model, "predict_proba"):
-        print("⚠️ Precision-Recall curves require models with predict_proba() method")
-        return
-    
+def plot_precision_recall_multiclass(pr_curves, label_encoder):
+    """Plot Precision-Recall curves for multi-class classification (per class: precision, recall)."""
     classes = label_encoder.classes_
-    y_test_bin = label_binarize(y_test, classes=np.arange(len(classes)))
-    y_score = model.predict_proba(X_test)
     
     plt.figure(figsize=(10, 8))
     
-    for i, class_name in enumerate(classes):
-        precision, recall, _ = precision_recall_curve(y_test_bin[:, i], y_score[:, i])
+    for class_name, (precision, recall) in zip(classes, pr_curves):
         plt.plot(recall, precision, label=f"{class_name}")
     
     plt.title("Multi-Class Precision-Recall Curves", fontsize=14, fontweight='bold')
@@ -567,13 +1245,8 @@ def plot_precision_recall_multiclass(model, X_test, y_test, label_encoder):
     plt.show()
 
 
-def plot_feature_importance(model, feature_names):
+def plot_feature_importance(importance, feature_names):
     """Plot feature importance for tree-based models (Random Forest or Gradient Boosting)."""
-    if not hasattr(model, "feature_importances_"):
-        print("⚠️ Feature importance only available for tree-based models")
-        return
-    
-    importance = model.feature_importances_
     indices = np.argsort(importance)[::-1]  # Sort descending
     
     plt.figure(figsize=(12, 6))
@@ -587,71 +1260,252 @@ def plot_feature_importance(model, feature_names):
     plt.show()
 
 
+# ========================================
+# FIGURE SELECTION AND RENDERING
+# ========================================
+# --plots name -> output file, in the order they were always rendered
+PLOTS = {
+    'metrics': 'metrics_comparison.png',
+    'confusion': 'confusion_matrices_all.png',
+    'per_class': 'per_class_performance.png',
+    'dataset': 'dataset_distribution.png',
+    'features': 'feature_distributions.png',
+    'confidence': 'model_confidence_curves.png',
+    'roc': 'roc_auc_multiclass.png',
+    'pr': 'precision_recall_multiclass.png',
+    'importance': 'feature_importance.png',
+}
+
+
+def parse_plots(value):
+    """'all', 'none' or a comma-separated subset of PLOTS"""
+    if value == 'all':
+        return list(PLOTS)
+    if value == 'none':
+        return []
+    selected = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in selected if name not in PLOTS]
+    if unknown:
+        import argparse
+        raise argparse.ArgumentTypeError(f"Unknown plots {unknown}; choose from {', '.join(PLOTS)}, all or none")
+    return selected
+
+
+def build_plot_tasks(selected, results, label_encoder, df=None, feature_names=None, best_model_name=None):
+    """{plot name: (function, args)} for the selected figures whose inputs are available"""
+    # Workers get the metric summaries only, not the models or test matrices
+    summary = {name: {k: v for k, v in result.items() if k not in ('predictions', 'evaluation')}
+               for name, result in results.items()}
+    tasks = {}
+    for name in selected:
+        if name == 'metrics':
+            tasks[name] = (plot_metrics_comparison, (summary,))
+        elif name == 'confusion':
+            tasks[name] = (plot_confusion_matrices, (summary, label_encoder))
+        elif name == 'per_class':
+            tasks[name] = (plot_class_performance, (summary, label_encoder, best_model_name))
+        elif name == 'dataset' and df is not None:
+            tasks[name] = (plot_dataset_distribution, (df[['difficulty_level', 'age']],))
+        elif name == 'features' and df is not None:
+            tasks[name] = (plot_feature_distributions, (df[feature_names], feature_names))
+        elif name in ('confidence', 'roc', 'pr', 'importance') and best_model_name in results \
+                and 'evaluation' in results[best_model_name]:
+            evaluation = results[best_model_name]['evaluation']
+            if name == 'importance':
+                if not hasattr(evaluation.model, "feature_importances_"):
+                    print("⚠️ Feature importance only available for tree-based models")
+                    continue
+                tasks[name] = (plot_feature_importance, (evaluation.model.feature_importances_, feature_names))
+            elif not evaluation.has_proba:
+                print(f"⚠️ {PLOTS[name]} requires a model with predict_proba() method")
+            elif name == 'confidence':
+                tasks[name] = (plot_model_confidence_curve, (evaluation.probabilities, label_encoder))
+            elif name == 'roc':
+                tasks[name] = (plot_roc_auc_multiclass, (evaluation.roc_curves, label_encoder))
+            else:
+                tasks[name] = (plot_precision_recall_multiclass, (evaluation.pr_curves, label_encoder))
+        else:
+            print(f"⚠️ Skipping {PLOTS[name]}: not available in this mode")
+    return tasks
+
+
+def render_plots(tasks, n_jobs=None):
+    """Render the figure tasks in parallel and report the wall-clock saving"""
+    if not tasks:
+        return []
+    start = time.perf_counter()
+    timings = render_figures(tasks, n_jobs)
+    wall_clock = time.perf_counter() - start
+    print(f"\n⏱  Rendered {len(tasks)} figures in {wall_clock:.1f}s "
+          f"(serial rendering time {sum(timings.values()):.1f}s)")
+    return [PLOTS[name] for name in tasks]
+
+
 # ========================================
 # MAIN EXECUTION
 # ========================================
 
-def main():
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train and export the dyslexia focus area model")
+    parser.add_argument('--jobs', type=int, default=-1,
+                        help="Worker processes for model fits and CV folds (-1 = all cores)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="Training cache directory (see `python training_cache.py list|evict`)")
+    parser.add_argument('--no-cache', action='store_true', help="Neither read nor write the training cache")
+    parser.add_argument('--rebuild', action='store_true', help="Refit everything and overwrite cached entries")
+    parser.add_argument('--search', action='store_true',
+                        help="Run the successive-halving hyperparameter search before training")
+    parser.add_argument('--budget', type=float, help="Search wall-clock budget in seconds")
+    parser.add_argument('--candidates', type=int, default=16, help="Configurations sampled per model family")
+    parser.add_argument('--search-log', default=DEFAULT_LOG, help="JSONL results log (resumed on rerun)")
+    parser.add_argument('--params', help=f"Train with a saved search result (e.g. {DEFAULT_BEST})")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Training CSV")
+    parser.add_argument('--prediction-log', metavar='DIR',
+                        help="Also train on predictions logged by the API (PREDICTION_LOG_DIR)")
+    parser.add_argument('--log-min-confidence', type=float, default=LOG_MIN_CONFIDENCE,
+                        help="Only use logged predictions at least this confident (their label is the prediction)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Out-of-core mode: chunked CSV reads and partial_fit models (bounded memory)")
+    parser.add_argument('--chunk-size', type=int, default=STREAMING_CHUNK_SIZE, help="Rows per chunk (--streaming)")
+    parser.add_argument('--epochs', type=int, default=STREAMING_EPOCHS, help="Passes over the data (--streaming)")
+    parser.add_argument('--plots', type=parse_plots, default='all',
+                        help=f"Figures to render: all, none or a comma-separated subset of {', '.join(PLOTS)}")
+    parser.add_argument('--plot-jobs', type=int, help="Processes for figure rendering (default: all cores)")
+    parser.add_argument('--select-epsilon', type=float, default=SELECTION_EPSILON,
+                        help="Save the fastest model within this much weighted F1 of the best "
+                             "(default 0: the best F1, as before)")
+    parser.add_argument('--select-latency', default=SELECTION_LATENCY,
+                        choices=['single_row_us', 'single_row_p95_us', 'batch_us_per_row'],
+                        help="Latency measure used for the selection")
+    parser.add_argument('--profile', metavar='REPORT.json',
+                        help="Time each stage, track its peak memory and write a JSON report "
+                             "(compare with `python training_profile.py compare`)")
+    return parser.parse_args(argv)
+
+
+def main_streaming(args):
+    """Streaming counterpart of main(): same plots from results and the same model artifacts"""
+    with PROFILE.stage('streaming_train'):
+        models, results, scaler, label_encoder, X_check, drift_sketch = train_streaming(
+            args.dataset, args.chunk_size, args.epochs, **SPLIT_PARAMS,
+            prediction_log=args.prediction_log, log_min_confidence=args.log_min_confidence)
+
+    # Costs, the bundle check and the drift class mix use the training sample collected in pass 1
+    with PROFILE.stage('save_model'):
+        best_model_name, _ = save_best_model(models, results, scaler, label_encoder, FEATURE_COLUMNS,
+                                             X_check=X_check, epsilon=args.select_epsilon,
+                                             latency=args.select_latency, drift_sketch=drift_sketch)
+
+    # Plots describe the model that was saved
+    with PROFILE.stage('plots'):
+        generated = render_plots(build_plot_tasks(args.plots, results, label_encoder,
+                                                  best_model_name=best_model_name), args.plot_jobs)
+
     print("\n" + "="*70)
-    print("DYSLEXIA FOCUS AREA ML TRAINER")
+    print("✅ STREAMING TRAINING COMPLETE!")
     print("="*70)
-    
+    print("\nGenerated files:")
+    for filename in generated:
+        print(f"  • {filename}")
+    print("  • best_dyslexia_focus_model.bundle (legacy .pkl files if the model cannot be bundled)")
+    print("\n" + "="*70)
+
+
+def main_in_memory(args):
+    """Load, split, train with 5-fold CV, evaluate, save, plot, demo"""
     # Load data
-    df = load_data('dyslexia_focus_areas_20000.csv')
+    with PROFILE.stage('load'):
+        df = load_data(args.dataset, FEATURE_COLUMNS + ['difficulty_level'])
+        if args.prediction_log:
+            df = append_prediction_log(df, args.prediction_log, args.log_min_confidence)
     
     # Prepare data
-    X, y, label_encoder, feature_names = prepare_data(df)
+    with PROFILE.stage('prepare'):
+        X, y, label_encoder, feature_names = prepare_data(df)
     
     
     # Split and scale (80/20)
-    X_train, X_test, y_train, y_test, scaler = split_and_scale_data(X, y)
-    
-    # Train 5 models
-    trained_models = train_models(X_train, y_train)
+    with PROFILE.stage('split_scale'):
+        X_train, X_test, y_train, y_test, scaler = split_and_scale_data(X, y, **SPLIT_PARAMS)
+    
+    # Hyperparameters: defaults, a fresh search, or a saved search result
+    params = None
+    if args.search:
+        print("\n" + "="*70)
+        print("HYPERPARAMETER SEARCH (SUCCESSIVE HALVING)")
+        print("="*70)
+        with PROFILE.stage('search'):
+            best = successive_halving(build_models(), X_train, y_train, n_candidates=args.candidates,
+                                      budget_seconds=args.budget, n_jobs=args.jobs, log_path=args.search_log)
+        save_best_params(best, DEFAULT_BEST)
+        print(f"✓ Best configurations saved to {DEFAULT_BEST}")
+        params = {name: result['params'] for name, result in best.items()}
+    elif args.params:
+        params = load_best_params(args.params)
+    
+    # Train 5 models (unchanged models come from the training cache)
+    with PROFILE.stage('train_cv'):
+        cache = None
+        if not args.no_cache:
+            extra_sources = None
+            if args.prediction_log:
+                extra_sources = {'prediction_log': log_segments(args.prediction_log),
+                                 'min_confidence': args.log_min_confidence}
+            cache = TrainingCache.for_dataset(args.dataset, feature_names, {**SPLIT_PARAMS, 'cv': CV_PARAMS},
+                                              args.cache_dir, rebuild=args.rebuild, extra_sources=extra_sources)
+        trained_models = train_models(X_train, y_train, n_jobs=args.jobs, cache=cache, params=params)
     
     # Evaluate models
-    results = evaluate_models(trained_models, X_test, y_test, label_encoder)
-    
-    # Standard visualizations
-    plot_metrics_comparison(results)
-    plot_confusion_matrices(results, label_encoder)
-    plot_class_performance(results, label_encoder)
-    
-    # Additional visualizations
-    plot_dataset_distribution(df)
-    plot_feature_distributions(df, feature_names)
-    
-    best_model_name = max(results, key=lambda x: results[x]['f1_score'])
-    best_model = trained_models[best_model_name]
-    
-    plot_model_confidence_curve(best_model, X_test, y_test, label_encoder)
-    plot_roc_auc_multiclass(best_model, X_test, y_test, label_encoder)
-    plot_precision_recall_multiclass(best_model, X_test, y_test, label_encoder)
-    plot_feature_importance(best_model, feature_names)
-    
-    # Save best model
-    best_model_name, best_model = save_best_model(trained_models, results, scaler, label_encoder)
+    with PROFILE.stage('evaluate'):
+        results = evaluate_models(trained_models, X_test, y_test, label_encoder, cache=cache)
+    
+    # Save best model. Costs, the bundle check and the drift reference only see
+    # training rows: the drift histograms cover all of them, the rest a sample
+    with PROFILE.stage('save_model'):
+        X_train_raw = training_rows(X, y, **SPLIT_PARAMS)
+        drift_sketch = DriftSketch.for_features(feature_names, len(label_encoder.classes_))
+        drift_sketch.update(X_train_raw)
+        best_model_name, best_model = save_best_model(trained_models, results, scaler, label_encoder,
+                                                      feature_names, X_check=check_sample(X_train_raw),
+                                                      epsilon=args.select_epsilon, latency=args.select_latency,
+                                                      drift_sketch=drift_sketch)
+    
+    # Visualizations of the saved model (rendered in parallel from the shared evaluation artifacts)
+    with PROFILE.stage('plots'):
+        generated = render_plots(build_plot_tasks(args.plots, results, label_encoder, df, feature_names,
+                                                  best_model_name), args.plot_jobs)
     
     # Example prediction
-    predict_with_focus_areas(best_model, scaler, label_encoder, df)
+    with PROFILE.stage('example_prediction'):
+        predict_with_focus_areas(best_model, scaler, label_encoder, df)
     
     print("\n" + "="*70)
     print("✅ TRAINING COMPLETE!")
     print("="*70)
     print("\nGenerated files:")
-    print("  • metrics_comparison.png")
-    print("  • confusion_matrices_all.png")
-    print("  • per_class_performance.png")
-    print("  • dataset_distribution.png")
-    print("  • feature_distributions.png")
-    print("  • model_confidence_curves.png")
-    print("  • roc_auc_multiclass.png")
-    print("  • precision_recall_multiclass.png")
-    print("  • feature_importance.png")
-    print("  • best_dyslexia_focus_model.pkl")
-    print("  • best_dyslexia_focus_model_scaler.pkl")
-    print("  • best_dyslexia_focus_model_labels.pkl")
+    for filename in generated:
+        print(f"  • {filename}")
+    print("  • best_dyslexia_focus_model.bundle (legacy .pkl files if the model cannot be bundled)")
     print("\n" + "="*70)
 
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        PROFILE.enable(dataset=args.dataset, dataset_bytes=os.path.getsize(args.dataset),
+                       argv=list(sys.argv[1:] if argv is None else argv))
+    print("\n" + "="*70)
+    print("DYSLEXIA FOCUS AREA ML TRAINER")
+    print("="*70)
+    if args.streaming:
+        main_streaming(args)
+    else:
+        main_in_memory(args)
+    if args.profile:
+        PROFILE.print_summary()
+        PROFILE.save(args.profile)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------------
+# In-process LRU/TTL cache for model outputs
+# -------------------------------
+# Keys are canonicalized feature tuples; values are whatever the scorer
+# produced for that row. Entries belong to one model version: binding a new
+# version (e.g. after the artifact changes) drops everything cached so far.
+
+
+def canonical_key(row):
+    """Hashable, type-stable key for one feature row (67 and 67.0 collide)"""
+    return tuple(float(x) + 0.0 for x in row)
+
+
+class PredictionCache:
+    """Bounded LRU cache with optional TTL and hit/miss/eviction counters"""
+
+    def __init__(self, max_size=4096, ttl_seconds=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds or None
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def bind(self, model_version):
+        """Attach the cache to a model version, clearing it if the version changed"""
+        with self._lock:
+            if model_version != self.model_version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.model_version = model_version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key):
+        """Return the cached value or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, model_version=None):
+        """Store a value; results computed under a stale model version are dropped"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if model_version is not None and model_version != self.model_version:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "model_version": self.model_version,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
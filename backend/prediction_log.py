@@ -0,0 +1,185 @@
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+
+# -------------------------------
+# Append-only log of served predictions
+# -------------------------------
+# Handlers call PredictionLog.record(), which only appends references to an
+# in-memory buffer under a lock. A background thread drains the buffer every
+# `flush_seconds` (sooner once `flush_rows` rows are waiting) and writes each
+# batch as one compressed columnar segment,
+# <directory>/predictions-<UTC time>-<pid>-<seq>.npz:
+#   features       (N, 10) float32, columns in `feature_columns` order
+#   probabilities  (N, n_classes) float32, NaN for models without predict_proba
+#   predicted      (N,) int8 index into `classes`
+#   model_version  (N,) int16 index into `versions`
+#   timestamp      (N,) float64 Unix seconds
+#   feature_columns, classes, versions
+# Segments are written to a temporary name and renamed, so readers never see
+# a partial file. Only the newest `max_files` segments are kept (0 keeps
+# all). If the writer falls behind and `max_buffer_rows` rows are waiting,
+# new rows are dropped and counted instead of blocking the request.
+#
+# dataset_loader.load_prediction_log() reads a log directory back as training
+# rows (predicted class as label), e.g.
+#   python predicting.py --prediction-log prediction_log --log-min-confidence 0.9
+
+SEGMENT_PATTERN = 'predictions-*.npz'
+
+
+def log_segments(directory):
+    """Segment files in write order"""
+    return sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN)))
+
+
+def read_segment(path):
+    """Column arrays of one segment, with the per-row indices resolved to strings"""
+    with np.load(path) as data:
+        segment = {name: data[name] for name in data.files}
+    segment['predicted_class'] = segment['classes'][segment['predicted']]
+    segment['model_version'] = segment['versions'][segment['model_version']]
+    return segment
+
+
+class PredictionLog:
+    """Buffered, background-flushed prediction log"""
+
+    def __init__(self, directory, feature_columns, flush_rows=5000, flush_seconds=30.0,
+                 max_buffer_rows=100_000, max_files=1000):
+        self.directory = directory
+        self.feature_columns = list(feature_columns)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_buffer_rows = max_buffer_rows
+        self.max_files = max_files
+        self.logged = 0
+        self.dropped = 0
+        self.segments_written = 0
+        self.write_errors = 0
+        self.last_flush_seconds = None
+        self._buffer = []
+        self._buffered_rows = 0
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+            self._thread.start()
+        return self
+
+    def record(self, features, pred_classes, prob_dicts, model_version):
+        """Queue a scored (N, 10) matrix; never blocks on I/O"""
+        rows = len(features)
+        with self._lock:
+            if self._buffered_rows + rows > self.max_buffer_rows:
+                self.dropped += rows
+                return False
+            self._buffer.append((features, pred_classes, prob_dicts, model_version, time.time()))
+            self._buffered_rows += rows
+            full = self._buffered_rows >= self.flush_rows
+        if full:
+            self._wake.set()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything buffered so far as one segment; returns its path or None"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                self._buffered_rows = 0
+            if not batch:
+                return None
+            start = time.perf_counter()
+            try:
+                path = self._write_segment(batch)
+            except OSError as e:
+                self.write_errors += 1
+                print(f"⚠️ Prediction log flush failed ({sum(len(b[0]) for b in batch)} rows lost): {e}")
+                return None
+            self.last_flush_seconds = time.perf_counter() - start
+            return path
+
+    def _write_segment(self, batch):
+        # Class order follows the model's probability dicts; classes only seen as predictions go last
+        classes, versions = {}, {}
+        features, pred_names, model_version, timestamp, probs = [], [], [], [], []
+        for rows, pred_classes, prob_dicts, version, logged_at in batch:
+            features.append(np.asarray(rows, dtype=np.float32))
+            pred_names.extend(str(c) for c in pred_classes)
+            model_version += [versions.setdefault(str(version), len(versions))] * len(rows)
+            timestamp += [logged_at] * len(rows)
+            probs.extend(prob_dicts)
+            for prob_dict in prob_dicts:
+                if prob_dict:
+                    for c in prob_dict:
+                        classes.setdefault(c, len(classes))
+                    break
+        predicted = [classes.setdefault(c, len(classes)) for c in pred_names]
+        class_names = list(classes)
+        probabilities = np.full((len(probs), len(class_names)), np.nan, dtype=np.float32)
+        for i, prob_dict in enumerate(probs):
+            if prob_dict:
+                probabilities[i] = [prob_dict.get(c, np.nan) for c in class_names]
+
+        # The pid keeps segments of several API workers sharing one directory apart
+        name = (f"predictions-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}"
+                f"-{os.getpid()}-{self._sequence:06d}.npz")
+        self._sequence += 1
+        path = os.path.join(self.directory, name)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                features=np.concatenate(features),
+                probabilities=probabilities,
+                predicted=np.array(predicted, dtype=np.int8),
+                model_version=np.array(model_version, dtype=np.int16),
+                timestamp=np.array(timestamp, dtype=np.float64),
+                feature_columns=np.array(self.feature_columns),
+                classes=np.array(class_names),
+                versions=np.array(list(versions)),
+            )
+        os.replace(tmp_path, path)
+        self.logged += len(predicted)
+        self.segments_written += 1
+        for old in log_segments(self.directory)[:-self.max_files]:
+            os.remove(old)
+        return path
+
+    def close(self):
+        """Stop the writer thread and flush what is left"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            buffered = self._buffered_rows
+        return {
+            "directory": self.directory,
+            "buffered_rows": buffered,
+            "logged_rows": self.logged,
+            "dropped_rows": self.dropped,
+            "segments_written": self.segments_written,
+            "write_errors": self.write_errors,
+            "last_flush_ms": round(self.last_flush_seconds * 1000.0, 3) if self.last_flush_seconds else None,
+        }
@@ -0,0 +1,19 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Backend modules use flat sibling imports (run from backend/)
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def main_module():
+    """main.py imported once, serving the committed legacy pickles with the cache and log off"""
+    os.environ.setdefault('MODEL_DIR', BACKEND_DIR)
+    os.environ.setdefault('PREDICTION_LOG_DIR', '')
+    os.environ.setdefault('MODEL_WATCH', '0')
+    return importlib.import_module('main')
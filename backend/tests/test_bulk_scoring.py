@@ -0,0 +1,97 @@
+import csv
+import io
+import json
+
+import pytest
+
+from bulk_scoring import BulkJobProgress, BulkJobTracker, stream_scores
+from focus_areas import FEATURE_COLUMNS
+
+CLASSES = ['Mild', 'Severe']
+
+
+def score_rows(features):
+    """Stand-in model: 'Severe' when age is above 10"""
+    return [('Severe' if row[0] > 10 else 'Mild', {'Mild': 0.25, 'Severe': 0.75}, 'v1') for row in features]
+
+
+def _csv(rows):
+    lines = [','.join(['id'] + FEATURE_COLUMNS)]
+    for student_id, age, score in rows:
+        lines.append(','.join([student_id, age] + [score] * (len(FEATURE_COLUMNS) - 1)))
+    return io.StringIO('\n'.join(lines) + '\n')
+
+
+ROWS = [('s1', '9', '50'), ('s2', '12', '40'), ('s3', '', '40'), ('s4', '11', 'n/a'), ('s5', '8', '60')]
+
+
+def test_ndjson_reports_bad_rows_per_row():
+    progress = BulkJobProgress()
+    records = [json.loads(line) for text in stream_scores(_csv(ROWS), score_rows, CLASSES, 'ndjson', 2, progress)
+               for line in text.splitlines()]
+    assert [r['row'] for r in records] == [0, 1, 2, 3, 4]
+    assert [r['id'] for r in records] == ['s1', 's2', 's3', 's4', 's5']
+    assert [r.get('predicted_difficulty') for r in records] == ['Mild', 'Severe', None, None, 'Mild']
+    assert "['age']" in records[2]['error']
+    assert 'reading_speed' in records[3]['error'] and 'predicted_difficulty' not in records[3]
+    assert records[0]['focus_areas'] == ['Reading', 'Writing', 'Spelling']
+    snapshot = progress.snapshot()
+    assert (snapshot['chunks'], snapshot['rows_read'], snapshot['rows_scored'], snapshot['rows_failed']) == \
+        (3, 5, 3, 2)
+    assert snapshot['done'] and snapshot['error'] is None
+
+
+def test_csv_output_has_one_header():
+    text = ''.join(stream_scores(_csv(ROWS), score_rows, CLASSES, 'csv', 2))
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0][:5] == ['row', 'id', 'predicted_difficulty', 'prob_Mild', 'prob_Severe']
+    assert len(rows) == 1 + len(ROWS)
+    assert rows[2][2:5] == ['Severe', '0.25', '0.75']
+    assert rows[3][2] == '' and rows[3][-1].startswith('missing')
+
+
+def test_chunk_without_valid_rows_is_not_scored():
+    calls = []
+
+    def counting(features):
+        calls.append(len(features))
+        return score_rows(features)
+
+    text = ''.join(stream_scores(_csv([('a', '', '1'), ('b', 'x', '2')]), counting, CLASSES))
+    assert calls == [] and text.count('"error"') == 2
+
+
+def test_missing_column_fails_the_job():
+    source = io.StringIO('age,reading_speed\n9,50\n')
+    progress = BulkJobProgress()
+    with pytest.raises(ValueError, match='missing required columns'):
+        list(stream_scores(source, score_rows, CLASSES, progress=progress))
+    assert progress.done and 'missing required columns' in progress.error
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        list(stream_scores(_csv(ROWS), score_rows, CLASSES, 'xml'))
+
+
+def test_tracker_keeps_recent_jobs():
+    tracker = BulkJobTracker(max_jobs=2)
+    jobs = [tracker.start(source=f'{i}.csv') for i in range(3)]
+    assert tracker.get(jobs[0].job_id) is None
+    assert [job['source'] for job in tracker.list()] == ['1.csv', '2.csv']
+
+
+def test_api_streams_scores_and_tracks_the_job(main_module):
+    from fastapi.testclient import TestClient
+
+    upload = _csv(ROWS).getvalue()
+    with TestClient(main_module.app) as client:
+        response = client.post('/predict/csv?chunk_size=2', files={'file': ('cohort.csv', upload, 'text/csv')})
+        assert response.status_code == 200
+        records = [json.loads(line) for line in response.text.splitlines()]
+        job = client.get(f"/predict/csv/jobs/{response.headers['X-Job-Id']}").json()
+        assert client.get('/predict/csv/jobs/unknown').status_code == 404
+        assert client.post('/predict/csv?format=xml', files={'file': ('c.csv', upload)}).status_code == 400
+    assert sum('error' in r for r in records) == 2
+    assert {r['predicted_difficulty'] for r in records if 'error' not in r} <= set(main_module.registry.active.classes)
+    assert (job['source'], job['rows_scored'], job['rows_failed'], job['done']) == ('cohort.csv', 3, 2, True)
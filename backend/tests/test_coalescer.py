@@ -0,0 +1,76 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from coalescer import RequestCoalescer
+
+
+def _row(i):
+    return np.array([float(i), 2.0 * i])
+
+
+def test_concurrent_rows_share_one_call():
+    calls = []
+
+    async def score(matrix):
+        calls.append(matrix.shape)
+        return [row.sum() for row in matrix]
+
+    async def scenario():
+        coalescer = RequestCoalescer(score, window_ms=20, max_batch_size=64)
+        results = await asyncio.gather(*(coalescer.submit(_row(i)) for i in range(5)))
+        return coalescer, results
+
+    coalescer, results = asyncio.run(scenario())
+    assert calls == [(5, 2)]
+    # Every caller gets the result for its own row
+    assert results == [3.0 * i for i in range(5)]
+    snapshot = coalescer.stats.snapshot()
+    assert (snapshot['total_requests'], snapshot['total_batches'], snapshot['max_batch_size']) == (5, 1, 5)
+    assert snapshot['queue_wait_ms'] is not None
+
+
+def test_full_batch_dispatches_without_waiting_for_the_window():
+    calls = []
+
+    def score(matrix):  # plain functions run on the threadpool
+        calls.append(len(matrix))
+        return list(matrix[:, 0])
+
+    async def scenario():
+        coalescer = RequestCoalescer(score, window_ms=10_000, max_batch_size=3)
+        return await asyncio.wait_for(asyncio.gather(*(coalescer.submit(_row(i)) for i in range(6))), 5)
+
+    assert asyncio.run(scenario()) == [float(i) for i in range(6)]
+    assert calls == [3, 3]
+
+
+def test_scoring_error_reaches_every_caller():
+    async def score(matrix):
+        raise RuntimeError("model failed")
+
+    async def scenario():
+        coalescer = RequestCoalescer(score, window_ms=1)
+        return await asyncio.gather(*(coalescer.submit(_row(i)) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_caller_does_not_break_the_batch():
+    async def score(matrix):
+        await asyncio.sleep(0.01)
+        return [row[0] for row in matrix]
+
+    async def scenario():
+        coalescer = RequestCoalescer(score, window_ms=5)
+        gone = asyncio.ensure_future(coalescer.submit(_row(1)))
+        kept = asyncio.ensure_future(coalescer.submit(_row(2)))
+        await asyncio.sleep(0)
+        gone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await gone
+        return await kept
+
+    assert asyncio.run(scenario()) == 2.0
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.svm import SVC
+
+from compiled_model import CompiledModel
+from dataset_loader import DIFFICULTY_CATEGORIES
+from model_bundle import write_bundle
+from predicting import compile_model_arrays, FEATURE_COLUMNS
+
+# Small versions of the model families predicting.py trains and bundles
+MODELS = {
+    'logistic_regression': lambda: LogisticRegression(max_iter=1000, class_weight='balanced'),
+    'svm': lambda: SVC(kernel='rbf', probability=True, class_weight='balanced', random_state=42),
+    'random_forest': lambda: RandomForestClassifier(n_estimators=20, max_depth=8, random_state=42),
+    'gradient_boosting': lambda: GradientBoostingClassifier(n_estimators=20, max_depth=3, random_state=42),
+    'knn': lambda: KNeighborsClassifier(n_neighbors=7, weights='distance'),
+    'sgd_log_loss': lambda: SGDClassifier(loss='log_loss', random_state=42),
+}
+
+
+@pytest.fixture(scope='module')
+def data():
+    """Score-like features with a class signal: lower scores -> more severe difficulty"""
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, len(DIFFICULTY_CATEGORIES), 600)
+    scores = np.clip(rng.normal(80 - 18 * y[:, None], 15, (600, len(FEATURE_COLUMNS) - 1)), 0, 100).round()
+    X = np.column_stack([rng.integers(6, 16, 600), scores]).astype(float)
+    label_encoder = LabelEncoder().fit(DIFFICULTY_CATEGORIES)
+    scaler = StandardScaler().fit(X[:400])
+    return X, y, scaler, label_encoder
+
+
+def _fit(name, data):
+    X, y, scaler, label_encoder = data
+    model = MODELS[name]().fit(scaler.transform(X[:400]), y[:400])
+    return model, CompiledModel(compile_model_arrays(model, scaler, label_encoder))
+
+
+@pytest.mark.parametrize('name', sorted(MODELS))
+def test_compiled_matches_sklearn(name, data):
+    X, _, scaler, _ = data
+    model, compiled = _fit(name, data)
+    X_scaled = scaler.transform(X[400:])
+
+    pred_idx, probs = compiled.score(X[400:])
+
+    np.testing.assert_array_equal(pred_idx, model.predict(X_scaled))
+    assert np.allclose(probs, model.predict_proba(X_scaled), atol=1e-6)
+
+
+@pytest.mark.parametrize('name', ['gradient_boosting', 'knn'])
+def test_single_rows_match_batch(name, data):
+    X, _, _, _ = data
+    _, compiled = _fit(name, data)
+    batch_idx, batch_probs = compiled.score(X[400:420])
+    for i in range(20):
+        row_idx, row_probs = compiled.score(X[400 + i:401 + i])
+        assert row_idx[0] == batch_idx[i]
+        assert np.allclose(row_probs[0], batch_probs[i])
+
+
+def test_bundle_round_trip(data, tmp_path):
+    X, _, scaler, label_encoder = data
+    model, _ = _fit('random_forest', data)
+    path = str(tmp_path / 'model.bundle')
+    write_bundle(path, compile_model_arrays(model, scaler, label_encoder), {'model_name': 'Random Forest'})
+
+    loaded = CompiledModel.load(path)
+    pred_idx, probs = loaded.score(X[400:])
+
+    np.testing.assert_array_equal(loaded.classes[pred_idx], label_encoder.inverse_transform(
+        model.predict(scaler.transform(X[400:]))))
+    assert np.allclose(probs, model.predict_proba(scaler.transform(X[400:])), atol=1e-6)
+    assert loaded.metadata['model_name'] == 'Random Forest'
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_loader import DIFFICULTY_CATEGORIES, load_columns, load_dataset, read_csv_compact
+from focus_areas import FEATURE_COLUMNS
+
+
+def _write_csv(path, rows=50, extra_columns=False, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.integers(0, 101, rows) for col in FEATURE_COLUMNS})
+    df['age'] = rng.integers(6, 15, rows)
+    df['difficulty_level'] = rng.choice(DIFFICULTY_CATEGORIES, rows)
+    if extra_columns:
+        df.insert(0, 'id', np.arange(rows))
+        df['reading_avg'] = rng.integers(0, 101, rows)
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_features_only_csv_loads(tmp_path):
+    path = tmp_path / 'features.csv'
+    expected = _write_csv(path)
+    columns = FEATURE_COLUMNS + ['difficulty_level']
+    df = load_dataset(str(path), columns, cache_dir=str(tmp_path / 'cache'))
+    assert list(df.columns) == columns
+    np.testing.assert_array_equal(df[FEATURE_COLUMNS].to_numpy(), expected[FEATURE_COLUMNS].to_numpy())
+    assert df['difficulty_level'].astype(str).tolist() == expected['difficulty_level'].tolist()
+    # Without a column list, only the schema columns the file has are read
+    assert list(read_csv_compact(str(path)).columns) == ['age', *FEATURE_COLUMNS[1:], 'difficulty_level']
+
+
+def test_missing_columns_are_added_to_the_entry(tmp_path):
+    path = tmp_path / 'data.csv'
+    _write_csv(path, extra_columns=True)
+    cache = str(tmp_path / 'cache')
+    _, meta = load_columns(str(path), ['age', 'difficulty_level'], cache)
+    assert set(meta['columns']) == {'age', 'difficulty_level'}
+    arrays, meta = load_columns(str(path), ['id', 'reading_avg'], cache)
+    assert set(meta['columns']) == {'age', 'difficulty_level', 'id', 'reading_avg'}
+    assert arrays['id'].dtype == np.uint32 and len(arrays['id']) == meta['rows']
+
+
+def test_edited_csv_evicts_the_old_entry(tmp_path):
+    path = tmp_path / 'data.csv'
+    cache = tmp_path / 'cache'
+    _write_csv(path, rows=50)
+    load_dataset(str(path), cache_dir=str(cache))
+    _write_csv(path, rows=60, seed=1)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    df = load_dataset(str(path), cache_dir=str(cache))
+    assert len(df) == 60
+    assert len(os.listdir(cache)) == 1
+
+    # Another file with the same name keeps its own entry
+    other = tmp_path / 'other' / 'data.csv'
+    other.parent.mkdir()
+    _write_csv(other, rows=70)
+    load_dataset(str(other), cache_dir=str(cache))
+    assert len(os.listdir(cache)) == 2
+
+
+def test_requested_column_absent_from_csv_fails(tmp_path):
+    path = tmp_path / 'features.csv'
+    _write_csv(path)
+    with pytest.raises(ValueError):
+        load_dataset(str(path), ['id'], cache_dir=str(tmp_path / 'cache'))
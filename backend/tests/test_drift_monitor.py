@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from drift_monitor import DriftMonitor, DriftSketch, psi
+from focus_areas import FEATURE_COLUMNS
+
+CLASSES = ['Mild', 'Moderate', 'Profound', 'Severe']
+
+
+def _students(n, seed, score_mean=50.0):
+    rng = np.random.default_rng(seed)
+    features = np.clip(rng.normal(score_mean, 12.0, (n, len(FEATURE_COLUMNS))), 0, 100)
+    features[:, 0] = rng.integers(6, 15, n)
+    return features
+
+
+def _reference(seed=0):
+    sketch = DriftSketch.for_features(FEATURE_COLUMNS, len(CLASSES))
+    sketch.update(_students(5000, seed), np.random.default_rng(seed).integers(0, 4, 5000))
+    return sketch
+
+
+def test_psi_values():
+    assert psi([10, 20, 30], [20, 40, 60]) == pytest.approx(0.0)
+    expected = 0.4 * np.log(0.9 / 0.5) - 0.4 * np.log(0.1 / 0.5)
+    assert psi([50, 50], [90, 10]) == pytest.approx(expected)
+    # One PSI per row of a 2-D histogram
+    assert psi([[1, 1], [1, 1]], [[1, 1], [1, 3]]).shape == (2,)
+
+
+def test_sketch_bins_edges_and_skips_non_finite_rows():
+    sketch = DriftSketch([(0.0, 100.0)], n_classes=2, n_bins=4)
+    sketch.update(np.array([[-1.0], [0.0], [24.9], [25.0], [100.0], [101.0], [np.nan]]), [0, 1, 1])
+    assert sketch.counts.tolist() == [[1, 2, 1, 0, 1, 1]]
+    assert sketch.n == 6 and sketch.class_counts.tolist() == [1, 2]
+    mean, std = sketch.moments()
+    assert mean[0] == pytest.approx(np.mean([-1, 0, 24.9, 25, 100, 101]))
+
+
+def test_sketch_round_trip_and_merge():
+    sketch = _reference()
+    restored = DriftSketch.from_arrays(sketch.to_arrays())
+    for name in ('counts', 'sums', 'sq_sums', 'class_counts', 'ranges'):
+        np.testing.assert_array_equal(getattr(restored, name), getattr(sketch, name))
+    assert restored.n == sketch.n
+    assert DriftSketch.from_arrays({}) is None
+    merged = sketch.merge(restored)
+    assert merged.n == 2 * sketch.n and (merged.counts == 2 * sketch.counts).all()
+
+
+def test_report_statuses():
+    monitor = DriftMonitor(FEATURE_COLUMNS, window_rows=1000, min_rows=200)
+    monitor.bind('v0', None, CLASSES)
+    monitor.observe(_students(500, 1), ['Mild'] * 500)
+    assert monitor.report()['status'] == 'no_reference'
+
+    monitor.bind('v1', _reference(), CLASSES)
+    assert monitor.report()['live_rows'] == 0  # binding a new version restarts the live window
+    monitor.observe(_students(100, 2), ['Mild'] * 100)
+    assert monitor.report()['status'] == 'insufficient_data'
+
+    rng = np.random.default_rng(3)
+    monitor.observe(_students(900, 3), [CLASSES[i] for i in rng.integers(0, 4, 900)])
+    report = monitor.report()
+    assert report['status'] == 'stable', report['max_psi']
+    assert report['predicted_class_mix']['status'] == 'stable'
+
+
+def test_shifted_traffic_is_significant():
+    monitor = DriftMonitor(FEATURE_COLUMNS, window_rows=1000)
+    monitor.bind('v1', _reference(), CLASSES)
+    monitor.observe(_students(1000, 4, score_mean=25.0), ['Severe'] * 1000)
+    report = monitor.report()
+    assert report['status'] == 'significant'
+    assert report['features']['reading_speed']['status'] == 'significant'
+    assert report['features']['reading_speed']['mean_shift_sd'] < -1.5
+    assert report['features']['age']['status'] == 'stable'
+    assert report['predicted_class_mix']['live']['Severe'] == 1.0
+
+
+def test_live_window_follows_recent_traffic():
+    monitor = DriftMonitor(FEATURE_COLUMNS, window_rows=500)
+    monitor.bind('v1', _reference(), CLASSES)
+    for seed in range(5):
+        monitor.observe(_students(250, seed, score_mean=25.0), ['Mild'] * 250)
+    # Old windows are dropped: between one and two windows of rows stay live
+    assert 500 <= monitor.live().n <= 1000
+    for seed in range(5, 9):
+        monitor.observe(_students(250, seed), ['Mild'] * 250)
+    assert monitor.report()['features']['reading_speed']['status'] == 'stable'
+    assert monitor.report()['total_rows_observed'] == 2250
@@ -0,0 +1,70 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from evaluation import ModelEvaluation
+from predicting import evaluate_models
+from training_cache import TrainingCache
+
+
+class CountingCache(TrainingCache):
+    """TrainingCache that counts entry rewrites"""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.stores = 0
+
+    def store(self, key, name, entry):
+        self.stores += 1
+        super().store(key, name, entry)
+
+
+class CountingModel(LogisticRegression):
+    calls = 0
+
+    def predict(self, X):
+        CountingModel.calls += 1
+        return super().predict(X)
+
+    def predict_proba(self, X):
+        CountingModel.calls += 1
+        return super().predict_proba(X)
+
+
+def _data(seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 4))
+    y = (X[:, 0] + X[:, 1] > 0).astype(int) + (X[:, 2] > 1).astype(int)
+    return X, y
+
+
+def test_evaluation_writes_the_cache_entry_once(tmp_path):
+    X, y = _data()
+    model = CountingModel().fit(X, y)
+    label_encoder = LabelEncoder().fit(['Mild', 'Moderate', 'Severe'])
+    cache = CountingCache(str(tmp_path))
+    key = cache.key('Logistic Regression', model)
+    cache.store(key, 'Logistic Regression', {'model': model})
+    cache.stores = 0
+
+    results = evaluate_models({'Logistic Regression': model}, X, y, label_encoder, cache=cache)
+    assert cache.stores == 1
+    entry = cache.read(key)
+    assert {'model', 'test_predictions', 'test_probabilities'} <= set(entry)
+    np.testing.assert_array_equal(entry['test_predictions'], results['Logistic Regression']['predictions'])
+
+    # A rerun reads both arrays back: no predict calls and no rewrite
+    CountingModel.calls = 0
+    evaluation = ModelEvaluation(model, X, y, 3, cache, key, 'Logistic Regression')
+    np.testing.assert_array_equal(evaluation.predictions, entry['test_predictions'])
+    assert evaluation.roc_curves is not None
+    evaluation.save()
+    assert CountingModel.calls == 0 and cache.stores == 1
+
+
+def test_evaluation_without_a_cache():
+    X, y = _data(1)
+    model = LogisticRegression().fit(X, y)
+    evaluation = ModelEvaluation(model, X, y, 3)
+    assert evaluation.confusion_matrix.sum() == len(y)
+    evaluation.save()
@@ -0,0 +1,54 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from focus_areas import (DOMAINS, SCORE_COLUMNS, _reference_focus_areas, add_focus_columns,
+                         focus_area_records, rank_focus_areas)
+
+
+def _tied_rows():
+    """Rows whose domain averages tie in every pattern, including ties reached through different sums"""
+    rows = []
+    for pattern in itertools.product([40.0, 55.0, 70.0], repeat=3):  # all 27 orderings and tie patterns
+        rows.append(np.repeat(pattern, 3))
+    rows += [
+        [10, 20, 30, 20, 20, 20, 30, 20, 10],    # three different triples, all averaging 20
+        [0.1, 0.2, 0.3, 0.2, 0.2, 0.2, 0.3, 0.1, 0.2],  # floating-point near-ties
+        [100, 0, 50, 50, 50, 50, 0, 100, 50],
+        [33.3, 33.3, 33.4, 33.4, 33.3, 33.3, 33.3, 33.4, 33.3],
+        [0] * 9,
+        [100] * 9,
+    ]
+    return np.array(rows, dtype=np.float64)
+
+
+def _random_rows(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    integers = rng.integers(0, 101, size=(n, 9)).astype(np.float64)  # many natural ties
+    fractions = np.round(rng.uniform(0, 100, size=(n, 9)), 1)
+    return np.vstack([integers, fractions])
+
+
+@pytest.mark.parametrize('scores', [_tied_rows(), _random_rows()], ids=['tied', 'random'])
+def test_records_match_the_sorted_implementation(scores):
+    assert focus_area_records(scores) == [_reference_focus_areas(row) for row in scores]
+
+
+def test_ties_keep_reading_writing_spelling_order():
+    _, order = rank_focus_areas(np.full((1, 9), 60.0))
+    assert DOMAINS[order[0]].tolist() == ['Reading', 'Writing', 'Spelling']
+    _, order = rank_focus_areas(np.array([[70, 70, 70, 50, 50, 50, 50, 50, 50]]))
+    assert DOMAINS[order[0]].tolist() == ['Writing', 'Spelling', 'Reading']
+
+
+def test_training_columns_match_the_sorted_implementation():
+    scores = np.vstack([_tied_rows(), _random_rows(500, seed=1)])
+    df = add_focus_columns(pd.DataFrame(scores, columns=SCORE_COLUMNS))
+    reference = [_reference_focus_areas(row) for row in scores]
+    for position, column in enumerate(['primary_focus', 'secondary_focus', 'tertiary_focus']):
+        assert df[column].tolist() == [areas[position]['name'] for areas in reference]
+    for name in ('Reading', 'Writing', 'Spelling'):
+        expected = [next(a['score'] for a in areas if a['name'] == name) for areas in reference]
+        assert np.round(df[f'{name.lower()}_avg'], 2).tolist() == expected
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from inference_executor import InferenceExecutor, InferenceRejected
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def busy_executor():
+    """One worker, one queue slot, both taken by calls blocked on `release`"""
+    executor = InferenceExecutor(max_workers=1, max_queue=1, retry_after=7)
+    release = threading.Event()
+    callers = [threading.Thread(target=executor.call, args=(release.wait,)) for _ in range(2)]
+    for caller in callers:
+        caller.start()
+    _wait_for(lambda: executor.in_flight == 2)
+    yield executor, release
+    release.set()
+    for caller in callers:
+        caller.join()
+    executor.shutdown()
+
+
+def test_full_queue_rejects(busy_executor):
+    executor, release = busy_executor
+    # One call running on the worker, one waiting in the queue
+    _wait_for(lambda: executor.queue_depth == 1)
+    with pytest.raises(InferenceRejected) as rejected:
+        executor.call(sum, [1, 2])
+    assert rejected.value.retry_after == 7 and rejected.value.capacity == 2
+    release.set()
+    _wait_for(lambda: executor.in_flight == 0)
+    assert executor.call(sum, [1, 2]) == 3
+    stats = executor.stats()
+    assert (stats['admitted'], stats['rejected'], stats['completed']) == (3, 1, 3)
+    assert stats['queue_wait_ms'] is not None
+
+
+def test_blocking_call_waits_for_a_slot(busy_executor):
+    executor, release = busy_executor
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(executor.call(sum, [4, 5], block=True)))
+    waiter.start()
+    time.sleep(0.05)
+    assert result == [] and executor.rejected == 0
+    release.set()
+    waiter.join(5)
+    assert result == [9]
+
+
+def test_failures_release_their_slot():
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    with pytest.raises(ZeroDivisionError):
+        executor.call(divmod, 1, 0)
+    assert executor.in_flight == 0 and executor.stats()['failed'] == 1
+    assert executor.call(divmod, 7, 2) == (3, 1)
+    executor.shutdown()
+
+
+def test_process_pool_runs_calls():
+    executor = InferenceExecutor(kind='process', max_workers=1, max_queue=2)
+    try:
+        assert executor.call(pow, 2, 10) == 1024
+    finally:
+        executor.shutdown()
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        InferenceExecutor(kind='fiber')
+
+
+def test_api_answers_busy_with_retry_after(main_module, busy_executor, monkeypatch):
+    executor, _ = busy_executor
+    student = {col: 41.0 for col in main_module.FEATURE_COLUMNS}
+    with TestClient(main_module.app) as client:
+        # Swapped in after startup, whose warm-up batch also runs on the executor
+        monkeypatch.setattr(main_module, 'inference', executor)
+        monkeypatch.setattr(main_module.prediction_cache, 'max_size', 0)
+        response = client.post('/predict', json=student)
+        assert response.status_code == main_module.INFERENCE_REJECT_STATUS == 429
+        assert response.headers['Retry-After'] == '7'
+        assert client.post('/predict/batch', json={'students': [student]}).status_code == 429
@@ -0,0 +1,67 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from sklearn.naive_bayes import GaussianNB
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from model_bundle import read_bundle, verify_bundle, write_bundle
+from predicting import FEATURE_COLUMNS, save_best_model
+
+
+def _tamper_header(path, old, new):
+    """Rewrite a header string in place (same length, so the layout is unchanged)"""
+    assert len(old) == len(new)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    assert raw.count(old) == 1
+    with open(path, 'wb') as f:
+        f.write(raw.replace(old, new))
+
+
+def test_checksum_covers_the_header(tmp_path):
+    path = str(tmp_path / 'model.bundle')
+    checksum = write_bundle(path, {'weights': np.arange(6.0), 'classes': np.array(['Mild', 'Severe'])},
+                            {'model_name': 'Logistic Regression'})
+    assert verify_bundle(path) == checksum
+    arrays, header = read_bundle(path)
+    assert header['checksum'] == checksum
+    np.testing.assert_array_equal(arrays['weights'], np.arange(6.0))
+
+    _tamper_header(path, b'"Mild", "Severe"', b'"Severe", "Mild"')
+    with pytest.raises(ValueError, match='checksum'):
+        verify_bundle(path)
+    with pytest.raises(ValueError, match='checksum'):
+        read_bundle(path)
+
+
+def test_checksum_covers_the_data(tmp_path):
+    path = str(tmp_path / 'model.bundle')
+    write_bundle(path, {'weights': np.arange(6.0)})
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b'\x01')
+    with pytest.raises(ValueError, match='checksum'):
+        verify_bundle(path)
+
+
+def test_unbundled_model_moves_the_old_bundle_aside(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (200, len(FEATURE_COLUMNS)))
+    label_encoder = LabelEncoder().fit(['Mild', 'Moderate'])
+    y = (X[:, 1] > 50).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = GaussianNB().fit(scaler.transform(X), y)
+    results = {'Gaussian Naive Bayes': {'accuracy': 1.0, 'f1_score': 1.0, 'recall': 1.0, 'precision': 1.0}}
+
+    filename = str(tmp_path / 'best_model')
+    write_bundle(f'{filename}.bundle', {'weights': np.arange(3.0)})
+    save_best_model({'Gaussian Naive Bayes': model}, results, scaler, label_encoder, X_check=X[:50],
+                    filename=filename)
+
+    assert not os.path.exists(f'{filename}.bundle')
+    assert os.path.exists(f'{filename}.bundle.old')
+    assert os.path.exists(f'{filename}.pkl')
+    with open(f'{filename}_selection.json') as f:
+        assert json.load(f)['selected'] == 'Gaussian Naive Bayes'
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import shutil
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from conftest import BACKEND_DIR
+from dataset_loader import DIFFICULTY_CATEGORIES
+from model_bundle import write_bundle
+from model_registry import LoadedModel, ModelRegistry, watch_artifact
+from predicting import FEATURE_COLUMNS, compile_model_arrays
+
+FEATURES = np.zeros((3, len(FEATURE_COLUMNS)))
+
+
+def _constant(version, label):
+    """LoadedModel that predicts `label` for every row"""
+    classes = ['Mild', 'Severe']
+    probs = [1.0, 0.0] if label == 'Mild' else [0.0, 1.0]
+    return LoadedModel(version, f'{version}.bundle', classes,
+                       lambda X: (np.array([label] * len(X)), np.tile(probs, (len(X), 1))))
+
+
+def _wait_for_shadow(registry):
+    # The shadow pool has one worker: a no-op submitted now runs after pending shadow work
+    registry._shadow_executor.submit(lambda: None).result(5)
+
+
+def test_activate_switches_scoring_and_notifies():
+    activated = []
+    registry = ModelRegistry(on_activate=activated.append)
+    registry.register(_constant('v1', 'Mild'))
+    registry.register(_constant('v2', 'Severe'))
+    registry.activate('v1')
+    assert registry.score_rows(FEATURES)[0] == ('Mild', {'Mild': 1.0, 'Severe': 0.0}, 'v1')
+    registry.activate('v2')
+    assert [row[0] for row in registry.score_rows(FEATURES)] == ['Severe'] * 3
+    assert activated == ['v1', 'v2']
+    assert registry.versions['v2'].latency.snapshot()['rows'] == 3
+    with pytest.raises(KeyError):
+        registry.activate('missing')
+
+
+def test_eviction_keeps_active_and_candidate():
+    registry = ModelRegistry(max_versions=2)
+    registry.register(_constant('v1', 'Mild'))
+    registry.activate('v1')
+    registry.register(_constant('v2', 'Mild'))
+    registry.set_shadow('v2', 10)
+    registry.register(_constant('v3', 'Mild'))
+    # Nothing evictable yet: v1 is active and v2 the shadow candidate
+    assert list(registry.versions) == ['v1', 'v2', 'v3']
+    registry.register(_constant('v4', 'Mild'))
+    assert list(registry.versions) == ['v1', 'v2', 'v4']
+    # Registering a known version returns the existing object
+    assert registry.register(_constant('v1', 'Severe')) is registry.versions['v1']
+
+
+def test_shadow_scoring_counts_agreement():
+    registry = ModelRegistry()
+    registry.register(_constant('v1', 'Mild'))
+    registry.register(_constant('v2', 'Severe'))
+    registry.register(_constant('v3', 'Mild'))
+    registry.activate('v1')
+
+    registry.set_shadow('v2', 100)
+    registry.score_rows(FEATURES)
+    _wait_for_shadow(registry)
+    assert registry.describe()['shadow'] == {'batches': 1, 'rows': 3, 'agreed': 0, 'dropped': 0, 'errors': 0,
+                                             'agreement': 0.0}
+
+    registry.set_shadow('v3', 100)
+    registry.score_rows(FEATURES)
+    _wait_for_shadow(registry)
+    assert registry.describe()['shadow']['agreement'] == 1.0
+
+    # Promoting the candidate ends the shadow run
+    registry.activate('v3')
+    assert registry.candidate is None and registry.shadow_percent == 0.0
+
+
+def test_shadow_errors_never_reach_the_request():
+    registry = ModelRegistry()
+    registry.register(_constant('v1', 'Mild'))
+    registry.activate('v1')
+    registry.register(LoadedModel('broken', 'broken.bundle', ['Mild'], lambda X: 1 / 0))
+    registry.set_shadow('broken', 100)
+    assert len(registry.score_rows(FEATURES)) == 3
+    _wait_for_shadow(registry)
+    assert registry.describe()['shadow']['errors'] == 1
+    assert registry.set_shadow(None, 0) is None and registry.candidate is None
+
+
+def _write_model_bundle(path, C):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (300, len(FEATURE_COLUMNS)))
+    y = rng.integers(0, len(DIFFICULTY_CATEGORIES), 300)
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression(C=C).fit(scaler.transform(X), y)
+    write_bundle(str(path), compile_model_arrays(model, scaler, LabelEncoder().fit(DIFFICULTY_CATEGORIES)),
+                 {'feature_columns': FEATURE_COLUMNS})
+
+
+def test_load_bundle_and_legacy(tmp_path):
+    registry = ModelRegistry(feature_columns=FEATURE_COLUMNS)
+    _write_model_bundle(tmp_path / 'model.bundle', C=1.0)
+    loaded = registry.load(str(tmp_path / 'model.bundle'), activate=True)
+    assert registry.load(str(tmp_path / 'model.bundle')) is loaded
+    legacy = registry.load(os.path.join(BACKEND_DIR, 'best_dyslexia_focus_model.pkl'))
+    assert legacy.version != loaded.version and registry.active is loaded
+    assert {row[0] for row in registry.score_rows(FEATURES)} <= set(DIFFICULTY_CATEGORIES)
+    with pytest.raises(ValueError, match='feature order'):
+        ModelRegistry(feature_columns=FEATURE_COLUMNS[::-1]).load(str(tmp_path / 'model.bundle'))
+
+
+def test_watcher_follows_the_bundle_then_the_legacy_fallback(tmp_path):
+    bundle = tmp_path / 'best_dyslexia_focus_model.bundle'
+    legacy = tmp_path / 'best_dyslexia_focus_model.pkl'
+    _write_model_bundle(bundle, C=1.0)
+    registry = ModelRegistry(feature_columns=FEATURE_COLUMNS)
+    first = registry.load(str(bundle), activate=True)
+
+    async def scenario():
+        watcher = asyncio.ensure_future(watch_artifact(registry, str(bundle), 0.02, fallback=str(legacy)))
+        try:
+            await asyncio.sleep(0.05)
+            _write_model_bundle(bundle, C=0.01)
+            await _until(lambda: registry.active.version != first.version)
+            # A retrain that could not be bundled: pickles written, bundle moved aside
+            for suffix in ('.pkl', '_scaler.pkl', '_labels.pkl'):
+                shutil.copy(os.path.join(BACKEND_DIR, f'best_dyslexia_focus_model{suffix}'), tmp_path)
+            os.replace(bundle, f'{bundle}.old')
+            await _until(lambda: registry.active.source.endswith('.pkl'))
+        finally:
+            watcher.cancel()
+
+    asyncio.run(scenario())
+
+
+async def _until(condition, timeout=10.0):
+    for _ in range(int(timeout / 0.02)):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError("condition not reached")
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+import predicting
+from predicting import FEATURE_COLUMNS, measure_serving_cost, select_model
+
+RESULTS = {
+    'Slow and accurate': {'f1_score': 0.900, 'accuracy': 0.9, 'recall': 0.9, 'precision': 0.9},
+    'Fast': {'f1_score': 0.898, 'accuracy': 0.9, 'recall': 0.9, 'precision': 0.9},
+}
+COSTS = {'Slow and accurate': {'single_row_us': 500.0}, 'Fast': {'single_row_us': 20.0}}
+
+
+def test_default_selection_keeps_the_best_f1():
+    winner, table = select_model(RESULTS, COSTS)
+    assert winner == 'Slow and accurate'
+    assert [row['model'] for row in table if row['pareto']] == ['Slow and accurate', 'Fast']
+
+
+def test_epsilon_opts_in_to_the_faster_model():
+    winner, _ = select_model(RESULTS, COSTS, epsilon=0.005)
+    assert winner == 'Fast'
+
+
+@pytest.fixture(scope='module')
+def fitted():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (300, len(FEATURE_COLUMNS)))
+    y = (X[:, 1] + X[:, 4] > 100).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = LogisticRegression().fit(scaler.transform(X), y)
+    return model, scaler, LabelEncoder().fit(['Mild', 'Severe']), X
+
+
+def test_cost_is_charged_to_the_path_that_will_serve(fitted, monkeypatch):
+    model, scaler, label_encoder, X = fitted
+    cost = measure_serving_cost(model, scaler, label_encoder, X, single_repeats=5, batch_repeats=2)
+    assert cost['serving'] == 'compiled'
+
+    # A compiled model export_model_bundle would reject is served from the pickles
+    monkeypatch.setattr(predicting, 'compiled_matches_sklearn', lambda *args, **kwargs: (False, 0.5, 1.0))
+    cost = measure_serving_cost(model, scaler, label_encoder, X, single_repeats=5, batch_repeats=2)
+    assert cost['serving'] == 'sklearn'
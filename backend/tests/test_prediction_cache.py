@@ -0,0 +1,70 @@
+import numpy as np
+
+from prediction_cache import PredictionCache, canonical_key
+
+
+def test_canonical_key_ignores_numeric_type():
+    assert canonical_key([67, 9]) == canonical_key(np.array([67.0, 9.0]))
+    assert canonical_key([-0.0]) == canonical_key([0.0])
+
+
+def test_lru_eviction():
+    cache = PredictionCache(max_size=2)
+    cache.bind('v1')
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    stats = cache.stats()
+    assert (stats['size'], stats['evictions'], stats['hits'], stats['misses']) == (2, 1, 3, 1)
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('prediction_cache.time.monotonic', lambda: now[0])
+    cache = PredictionCache(max_size=10, ttl_seconds=5)
+    cache.put('a', 1)
+    now[0] += 4.9
+    assert cache.get('a') == 1
+    now[0] += 0.2
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_new_model_version_invalidates():
+    cache = PredictionCache()
+    cache.bind('v1')
+    cache.put('a', 'old', 'v1')
+    cache.bind('v1')
+    assert cache.get('a') == 'old'
+    cache.bind('v2')
+    assert cache.get('a') is None
+    assert cache.stats()['invalidations'] == 1
+    # A result scored by the previous version arriving late is not stored
+    cache.put('a', 'old', 'v1')
+    assert cache.get('a') is None
+    cache.put('a', 'new', 'v2')
+    assert cache.get('a') == 'new'
+
+
+def test_disabled_cache_stores_nothing():
+    cache = PredictionCache(max_size=0)
+    cache.put('a', 1)
+    assert cache.get('a') is None
+    assert not cache.stats()['enabled'] and cache.stats()['misses'] == 0
+
+
+def test_api_serves_repeats_from_the_cache(main_module):
+    from fastapi.testclient import TestClient
+
+    student = {col: 37.0 for col in main_module.FEATURE_COLUMNS}
+    with TestClient(main_module.app) as client:
+        first = client.post('/predict', json=student).json()
+        before = client.get('/predict/cache').json()
+        second = client.post('/predict', json=student).json()
+        after = client.get('/predict/cache').json()
+    assert first == second
+    assert after['hits'] == before['hits'] + 1
+    assert after['model_version'] == main_module.registry.active.version
@@ -0,0 +1,74 @@
+import numpy as np
+
+from dataset_loader import load_prediction_log
+from focus_areas import FEATURE_COLUMNS
+from prediction_log import PredictionLog, log_segments, read_segment
+
+
+def _features(n, value=50.0):
+    features = np.full((n, len(FEATURE_COLUMNS)), value)
+    features[:, 0] = 9
+    return features
+
+
+def test_segment_round_trip(tmp_path):
+    log = PredictionLog(str(tmp_path), FEATURE_COLUMNS, flush_seconds=3600)
+    log.record(_features(2), ['Mild', 'Severe'],
+               [{'Mild': 0.8, 'Severe': 0.2}, {'Mild': 0.3, 'Severe': 0.7}], 'v1')
+    log.record(_features(1, 20.0), ['Severe'], [None], 'v2')
+    path = log.flush()
+    assert log.flush() is None  # nothing buffered
+
+    segment = read_segment(path)
+    assert segment['features'].shape == (3, len(FEATURE_COLUMNS)) and segment['features'].dtype == np.float32
+    assert list(segment['feature_columns']) == FEATURE_COLUMNS
+    assert segment['predicted_class'].tolist() == ['Mild', 'Severe', 'Severe']
+    assert segment['model_version'].tolist() == ['v1', 'v1', 'v2']
+    np.testing.assert_allclose(segment['probabilities'][:2], [[0.8, 0.2], [0.3, 0.7]], rtol=1e-6)
+    assert np.isnan(segment['probabilities'][2]).all()
+    assert log.stats()['logged_rows'] == 3 and log.stats()['segments_written'] == 1
+
+
+def test_full_buffer_drops_instead_of_blocking(tmp_path):
+    log = PredictionLog(str(tmp_path), FEATURE_COLUMNS, max_buffer_rows=3)
+    assert log.record(_features(2), ['Mild'] * 2, [None] * 2, 'v1')
+    assert not log.record(_features(2), ['Mild'] * 2, [None] * 2, 'v1')
+    assert log.stats()['dropped_rows'] == 2 and log.stats()['buffered_rows'] == 2
+
+
+def test_background_writer_and_retention(tmp_path):
+    log = PredictionLog(str(tmp_path), FEATURE_COLUMNS, flush_rows=2, flush_seconds=3600, max_files=2).start()
+    for i in range(4):
+        log.record(_features(2), ['Mild'] * 2, [{'Mild': 1.0}] * 2, f'v{i}')
+        log.flush()
+    log.record(_features(1), ['Mild'], [None], 'v9')
+    log.close()  # flushes what is left
+    segments = log_segments(str(tmp_path))
+    assert len(segments) == 2
+    assert read_segment(segments[-1])['model_version'].tolist() == ['v9']
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_log_reads_back_as_training_rows(tmp_path):
+    log = PredictionLog(str(tmp_path), FEATURE_COLUMNS)
+    log.record(_features(3), ['Mild', 'Severe', 'Moderate'],
+               [{'Mild': 0.95, 'Severe': 0.05}, {'Mild': 0.4, 'Severe': 0.6}, {'Moderate': 0.99}], 'v1')
+    log.flush()
+    rows = load_prediction_log(str(tmp_path), FEATURE_COLUMNS + ['difficulty_level'], min_confidence=0.9)
+    assert rows['difficulty_level'].astype(str).tolist() == ['Mild', 'Moderate']
+    assert rows['reading_speed'].dtype == np.uint8
+
+
+def test_api_logs_with_the_scoring_version(main_module, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    log = PredictionLog(str(tmp_path), FEATURE_COLUMNS, flush_seconds=3600)
+    monkeypatch.setattr(main_module, 'prediction_log', log)
+    student = {col: 44.0 for col in FEATURE_COLUMNS}
+    with TestClient(main_module.app) as client:
+        client.post('/predict', json=student)
+        client.post('/predict/batch', json={'students': [student, {**student, 'age': 12.0}]})
+    log.flush()
+    rows = [read_segment(path) for path in log_segments(str(tmp_path))]
+    versions = np.concatenate([segment['model_version'] for segment in rows])
+    assert versions.tolist() == [main_module.registry.active.version] * 3
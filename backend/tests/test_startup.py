@@ -0,0 +1,74 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from dataset_loader import DIFFICULTY_CATEGORIES
+from model_bundle import write_bundle
+from predicting import FEATURE_COLUMNS, compile_model_arrays
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Time-to-ready may be at most this multiple of the time it takes to import main
+# (which includes loading the model): a relative budget that holds on any machine
+READY_IMPORT_FACTOR = 2.0
+
+# Fresh interpreter: import main, run the lifespan (warm-up included), ask /ready
+STARTUP_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+import_seconds = time.perf_counter() - start
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    response = client.get('/ready')
+    print(json.dumps({'status': response.status_code, 'ready': response.json(),
+                      'import_seconds': import_seconds}))
+"""
+
+
+def start_app(model_dir):
+    env = {**os.environ, 'MODEL_DIR': str(model_dir), 'PREDICTION_LOG_DIR': '', 'MODEL_WATCH': '0'}
+    out = subprocess.run([sys.executable, '-c', STARTUP_CODE], capture_output=True, text=True, check=True,
+                         cwd=BACKEND_DIR, env=env, timeout=120)
+    return json.loads(next(line for line in reversed(out.stdout.splitlines()) if line.startswith('{')))
+
+
+@pytest.fixture(scope='module')
+def bundle_dir(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (400, len(FEATURE_COLUMNS)))
+    y = rng.integers(0, len(DIFFICULTY_CATEGORIES), 400)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, max_depth=4, random_state=0).fit(scaler.transform(X), y)
+    label_encoder = LabelEncoder().fit(DIFFICULTY_CATEGORIES)
+    directory = tmp_path_factory.mktemp('model')
+    write_bundle(str(directory / 'best_dyslexia_focus_model.bundle'),
+                 compile_model_arrays(model, scaler, label_encoder),
+                 {'model_name': 'Random Forest', 'feature_columns': FEATURE_COLUMNS})
+    return directory
+
+
+def test_bundle_startup_is_ready_without_heavy_imports(bundle_dir):
+    result = start_app(bundle_dir)
+    ready = result['ready']
+    assert result['status'] == 200 and ready['ready'], ready
+    assert ready['model_source'].endswith('.bundle')
+    # The bundle path serves from numpy arrays alone
+    assert ready['heavy_modules_loaded'] == []
+    assert set(ready['phases_ms']) >= {'imports', 'model_load', 'warmup'}
+    assert ready['ready_after_ms'] / 1000.0 < READY_IMPORT_FACTOR * result['import_seconds'], ready
+
+
+def test_legacy_pickle_startup_is_ready(tmp_path):
+    for suffix in ('.pkl', '_scaler.pkl', '_labels.pkl'):
+        shutil.copy(os.path.join(BACKEND_DIR, f'best_dyslexia_focus_model{suffix}'), tmp_path)
+    result = start_app(tmp_path)
+    assert result['status'] == 200 and result['ready']['ready'], result['ready']
+    assert result['ready']['model_source'].endswith('.pkl')
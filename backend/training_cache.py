@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+
+# -------------------------------
+# Content-addressed cache of fitted models, CV scores and test predictions
+# -------------------------------
+# Each model's entry is keyed on everything that determines its outputs: the
+# dataset file contents, the feature column list, the split/CV parameters,
+# the estimator class and hyperparameters, and the sklearn version. Changing
+# one model's hyperparameters only invalidates that model's entry.
+#
+# Layout: <cache_dir>/<key>.pkl holds the entry, <key>.json a small summary
+# used by `list` without unpickling anything.
+#
+#   python training_cache.py list
+#   python training_cache.py evict --model "SVM"      (or a key prefix, or --all)
+
+DEFAULT_CACHE_DIR = '.training_cache'
+
+# Parameters that change speed or logging but not the fitted model
+_IGNORED_PARAMS = {'n_jobs', 'verbose'}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _hash(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=repr).encode('utf-8')).hexdigest()
+
+
+class TrainingCache:
+    """Per-model cache entries for one (dataset, features, split) context"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, context=None, rebuild=False):
+        import sklearn
+
+        self.directory = directory
+        self.context = {**(context or {}), "sklearn": sklearn.__version__}
+        self.rebuild = rebuild
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def for_dataset(cls, dataset_path, feature_columns, split_params, directory=DEFAULT_CACHE_DIR, rebuild=False,
+                    extra_sources=None):
+        context = {
+            "dataset": file_digest(dataset_path),
+            "feature_columns": list(feature_columns),
+            "split": split_params,
+        }
+        # e.g. prediction log segments: lists of paths are keyed by content
+        if extra_sources:
+            context["extra_sources"] = {
+                name: [file_digest(p) for p in value] if isinstance(value, list) else value
+                for name, value in extra_sources.items()
+            }
+        return cls(directory, context, rebuild)
+
+    def key(self, name, model):
+        params = {k: v for k, v in model.get_params(deep=True).items() if k not in _IGNORED_PARAMS}
+        return _hash({**self.context, "name": name, "estimator": type(model).__name__, "params": params})
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def load(self, key):
+        """Cached entry dict, or None (always None when rebuilding)"""
+        path = self._path(key, '.pkl')
+        if self.rebuild or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable cache entry {key[:12]}: {e}")
+            return None
+
+    def store(self, key, name, entry):
+        """Write (or overwrite) an entry atomically"""
+        for suffix, dump, mode in (('.pkl', pickle.dump, 'wb'), ('.json', None, 'w')):
+            path = self._path(key, suffix)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, mode) as f:
+                if dump is not None:
+                    dump(entry, f)
+                else:
+                    json.dump({"key": key, "name": name, "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+                               "fields": sorted(entry), "context": self.context}, f, indent=2)
+            os.replace(tmp_path, path)
+
+    def update(self, key, name, **fields):
+        """Add fields (e.g. test-set predictions) to an existing entry"""
+        entry = self.read(key) or {}
+        entry.update(fields)
+        self.store(key, name, entry)
+
+    def read(self, key):
+        """Cached entry regardless of `rebuild` (used for fields added after training)"""
+        path = self._path(key, '.pkl')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+# -------------------------------
+# Listing and eviction
+# -------------------------------
+def list_entries(directory=DEFAULT_CACHE_DIR):
+    entries = []
+    if not os.path.isdir(directory):
+        return entries
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.json'):
+            continue
+        with open(os.path.join(directory, filename)) as f:
+            info = json.load(f)
+        pkl = os.path.join(directory, info["key"] + '.pkl')
+        info["size_bytes"] = os.path.getsize(pkl) if os.path.exists(pkl) else 0
+        entries.append(info)
+    return entries
+
+
+def evict(directory=DEFAULT_CACHE_DIR, key_prefix=None, model=None, evict_all=False):
+    """Remove matching entries; returns how many were removed"""
+    removed = 0
+    for info in list_entries(directory):
+        if evict_all or (key_prefix and info["key"].startswith(key_prefix)) or (model and info["name"] == model):
+            for suffix in ('.pkl', '.json'):
+                path = os.path.join(directory, info["key"] + suffix)
+                if os.path.exists(path):
+                    os.remove(path)
+            removed += 1
+    return removed
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or evict the training cache")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="Show cached entries")
+    ev = sub.add_parser('evict', help="Remove entries")
+    ev.add_argument('key', nargs='?', help="Key prefix to remove")
+    ev.add_argument('--model', help="Remove every entry for this model name")
+    ev.add_argument('--all', action='store_true', help="Empty the cache")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        entries = list_entries(args.cache_dir)
+        for info in entries:
+            print(f"{info['key'][:12]}  {info['name']:<22} {info['created']}  "
+                  f"{info['size_bytes'] / 1e6:7.2f} MB  dataset {info['context'].get('dataset', '')[:8]}  "
+                  f"fields: {', '.join(info['fields'])}")
+        print(f"{len(entries)} entries, {sum(i['size_bytes'] for i in entries) / 1e6:.2f} MB in {args.cache_dir}")
+        return 0
+
+    if not (args.key or args.model or args.all):
+        parser.error("evict needs a key prefix, --model or --all")
+    removed = evict(args.cache_dir, args.key, args.model, args.all)
+    print(f"✓ Evicted {removed} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
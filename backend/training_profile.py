@@ -0,0 +1,218 @@
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+from collections import OrderedDict
+
+from dataset_loader import peak_rss_kb
+
+# -------------------------------
+# Stage-by-stage profile of the training pipeline
+# -------------------------------
+# predicting.main() wraps each stage (load, prepare, split/scale, search,
+# train + CV, evaluate, plots, save, example prediction) in
+# `PROFILE.stage(name)`. For every stage the profile records wall time, CPU
+# time of this process, and the stage's own peak RSS. On Linux the peak is
+# reset at the start of each stage through /proc/self/clear_refs, so each
+# stage reports its own high-water mark, not the run's. Work done in joblib
+# or plot worker processes shows up in wall time only.
+#
+#   python predicting.py --plots none --profile before.json
+#   python training_profile.py run --rows 1000000 -o big.json -- --streaming --plots none
+#   python training_profile.py compare before.json after.json --threshold 0.1
+
+
+def _reset_peak_rss():
+    """Start a new peak-RSS window; False where the kernel does not support it"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _current_rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return peak_rss_kb()
+
+
+class StageProfiler:
+    """Ordered per-stage wall time, CPU time and peak memory"""
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = OrderedDict()
+        self.meta = {}
+        self.started = None
+
+    def enable(self, **meta):
+        self.enabled = True
+        self.meta.update(meta, peak_rss_windows=_reset_peak_rss())
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        windowed = _reset_peak_rss()
+        rss_before = _current_rss_kb()
+        peak_before = peak_rss_kb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = peak_rss_kb()
+            record = self.stages.setdefault(name, {"seconds": 0.0, "cpu_seconds": 0.0, "peak_rss_mb": 0.0,
+                                                   "rss_growth_mb": 0.0, "calls": 0})
+            record["seconds"] += wall
+            record["cpu_seconds"] += cpu
+            # Without a per-stage window only a new process-wide peak is attributable to this stage
+            stage_peak = peak if windowed else (peak if peak > peak_before else 0)
+            record["peak_rss_mb"] = max(record["peak_rss_mb"], stage_peak / 1024)
+            record["rss_growth_mb"] += (_current_rss_kb() - rss_before) / 1024
+            record["calls"] += 1
+
+    def report(self):
+        return {
+            "meta": {
+                **self.meta,
+                "commit": _git_commit(),
+                "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+                "python": platform.python_version(),
+                "cpu_count": os.cpu_count(),
+            },
+            "total_seconds": round(time.perf_counter() - self.started, 3) if self.started else None,
+            "stages": {name: {k: (round(v, 3) if isinstance(v, float) else v) for k, v in record.items()}
+                       for name, record in self.stages.items()},
+        }
+
+    def print_summary(self):
+        report = self.report()
+        total = sum(s["seconds"] for s in report["stages"].values()) or 1.0
+        print("\n" + "="*70)
+        print("TRAINING PIPELINE PROFILE")
+        print("="*70)
+        print(f"{'Stage':<20} {'wall s':>9} {'share':>7} {'cpu s':>9} {'peak RSS MB':>12} {'Δ RSS MB':>9}")
+        for name, s in report["stages"].items():
+            print(f"{name:<20} {s['seconds']:9.2f} {s['seconds'] / total:7.1%} {s['cpu_seconds']:9.2f} "
+                  f"{s['peak_rss_mb']:12.1f} {s['rss_growth_mb']:9.1f}")
+        print(f"{'total':<20} {report['total_seconds']:9.2f}")
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"✓ Profile saved to {path}")
+
+
+PROFILE = StageProfiler()
+
+
+def _git_commit():
+    import subprocess
+
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# -------------------------------
+# Comparison
+# -------------------------------
+def compare_reports(baseline, current, threshold=0.10, min_seconds=0.05):
+    """Stage-by-stage diff; a regression is wall time or peak RSS up by more than `threshold`.
+
+    Stages shorter than `min_seconds` in both runs are reported but never
+    flagged, since their timings are mostly noise.
+    """
+    rows = []
+    for name, after in current["stages"].items():
+        before = baseline["stages"].get(name)
+        if before is None:
+            rows.append({"stage": name, "new": True, "regressed": False, "after": after})
+            continue
+        time_change = after["seconds"] / before["seconds"] - 1.0 if before["seconds"] else 0.0
+        memory_change = after["peak_rss_mb"] / before["peak_rss_mb"] - 1.0 if before["peak_rss_mb"] else 0.0
+        timed = max(before["seconds"], after["seconds"]) >= min_seconds
+        rows.append({"stage": name, "new": False, "before": before, "after": after,
+                     "time_change": time_change, "memory_change": memory_change,
+                     "regressed": (timed and time_change > threshold) or memory_change > threshold})
+    return rows
+
+
+def run_profile(argv, rows=None, seed=0, output='training_profile.json'):
+    """Profile predicting.main(argv), optionally on a freshly generated cohort of `rows` students"""
+    import predicting
+
+    if rows:
+        import cohort_generator
+
+        dataset = f'synthetic_{rows}_seed{seed}.csv'
+        if not os.path.exists(dataset):
+            seconds = cohort_generator.generate(dataset, rows, seed)
+            print(f"✓ Generated {dataset} in {seconds:.1f}s")
+        argv = ['--dataset', dataset, *argv]
+    predicting.main([*argv, '--profile', output])
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Profile the training pipeline or compare two profiles")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help="Run predicting.py with profiling; args after -- go to predicting.py")
+    run.add_argument('--rows', type=int, help="Generate a synthetic cohort of this many students first")
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('-o', '--output', default='training_profile.json')
+    cmp = sub.add_parser('compare', help="Compare two profile reports")
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=0.10,
+                     help="Allowed relative increase in stage wall time / peak RSS (default 0.10)")
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    passthrough = []
+    if '--' in argv:
+        passthrough = argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        run_profile(passthrough, args.rows, args.seed, args.output)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare_reports(baseline, current, args.threshold)
+    print(f"Comparing {baseline['meta'].get('commit')} -> {current['meta'].get('commit')} "
+          f"(threshold {args.threshold:.0%})")
+    for row in rows:
+        if row["new"]:
+            print(f"  {row['stage']:<20} new stage: {row['after']['seconds']:.2f}s")
+            continue
+        flag = "✗ REGRESSION" if row["regressed"] else "✓"
+        print(f"  {row['stage']:<20} {row['before']['seconds']:8.2f}s -> {row['after']['seconds']:8.2f}s "
+              f"({row['time_change']:+.1%})  peak RSS {row['before']['peak_rss_mb']:.0f} -> "
+              f"{row['after']['peak_rss_mb']:.0f} MB ({row['memory_change']:+.1%})  {flag}")
+    missing = [name for name in baseline["stages"] if name not in current["stages"]]
+    if missing:
+        print(f"  Not in current run: {', '.join(missing)}")
+    return 1 if any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# audio_io.py
+import io
+import mmap
+import os
+import statistics
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+import torchaudio
+
+# ==========================
+# Upload decoding without the temp-file round trip
+# ==========================
+# Starlette keeps uploads up to 1 MB in memory (a BytesIO inside a
+# SpooledTemporaryFile) and rolls larger ones over to an anonymous temp file.
+# decode_file() reads from whichever it is, without another copy:
+#   - PCM/float WAV is parsed with numpy straight from the in-memory buffer,
+#     or from an mmap of the spooled file for large uploads;
+#   - compressed formats (Expo's HIGH_QUALITY preset records AAC in .m4a on
+#     iOS/Android and Opus in WebM on web; MP3/OGG/FLAC also work) are handed
+#     to torchaudio as the spooled file object, with the container sniffed
+#     from the first bytes.
+# Only if that fails (e.g. a torchaudio backend without file-object support)
+# is the upload written to a named temp file and loaded by path, as before.
+#
+# Output matches torchaudio.load: a float32 (channels, frames) tensor in
+# [-1, 1] and the native sample rate.
+#
+#   python audio_io.py benchmark recording.m4a reading.wav --runs 20
+
+SPOOL_MAX_SIZE = 1024 * 1024  # Starlette's multipart spool threshold
+
+_WAV_DTYPES = {
+    (1, 8): (np.uint8, 1 / 128.0, 128),
+    (1, 16): (np.dtype('<i2'), 1 / 32768.0, 0),
+    (1, 32): (np.dtype('<i4'), 1 / 2147483648.0, 0),
+    (3, 32): (np.dtype('<f4'), 1.0, 0),
+    (3, 64): (np.dtype('<f8'), 1.0, 0),
+}
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def sniff_format(header):
+    """Container name for torchaudio/ffmpeg from the first bytes, or None if unknown"""
+    header = bytes(header[:16])
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[4:8] == b'ftyp':
+        return 'mp4'  # .m4a / .mp4 / .3gp all use the ISO base media demuxer
+    if header[:4] == b'\x1aE\xdf\xa3':
+        return 'webm'
+    if header[:4] == b'OggS':
+        return 'ogg'
+    if header[:4] == b'fLaC':
+        return 'flac'
+    if header[:3] == b'ID3' or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
+
+
+def parse_wav(buffer):
+    """(float32 (channels, frames) array, sample rate) from WAV bytes, or None if not plain PCM/float"""
+    view = memoryview(buffer)
+    if len(view) < 12 or bytes(view[:4]) != b'RIFF' or bytes(view[8:12]) != b'WAVE':
+        return None
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        (size,) = struct.unpack_from('<I', view, offset + 4)
+        body = offset + 8
+        if chunk_id == b'fmt ':
+            audio_format, channels, sample_rate, _, block_align, bits = struct.unpack_from('<HHIIHH', view, body)
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                (audio_format,) = struct.unpack_from('<H', view, body + 24)
+            fmt = (audio_format, channels, sample_rate, block_align, bits)
+        elif chunk_id == b'data' and fmt is not None:
+            audio_format, channels, sample_rate, block_align, bits = fmt
+            # Streaming writers may leave the size at 0 or 0xFFFFFFFF: take what is there
+            size = min(size, len(view) - body) if size else len(view) - body
+            frames = size // block_align if block_align else 0
+            samples = _pcm_to_float(view, body, frames, channels, audio_format, bits)
+            return (samples, sample_rate) if samples is not None else None
+        offset = body + size + (size & 1)
+    return None
+
+
+def _pcm_to_float(view, offset, frames, channels, audio_format, bits):
+    if (audio_format, bits) == (1, 24):
+        raw = np.frombuffer(view, np.uint8, count=frames * channels * 3, offset=offset).reshape(-1, 3)
+        ints = raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8) | (raw[:, 2].astype(np.int32) << 16)
+        ints = (ints ^ 0x800000) - 0x800000  # sign-extend 24 -> 32 bits
+        interleaved, scale, bias = ints.reshape(frames, channels), 1 / 8388608.0, 0
+    elif (audio_format, bits) in _WAV_DTYPES:
+        dtype, scale, bias = _WAV_DTYPES[(audio_format, bits)]
+        interleaved = np.frombuffer(view, dtype, count=frames * channels, offset=offset).reshape(frames, channels)
+    else:
+        return None
+    # One pass from the interleaved input to contiguous (channels, frames) float32
+    out = np.empty((channels, frames), dtype=np.float32)
+    if bias:
+        np.subtract(interleaved.T, bias, out=out, dtype=np.float32)
+        out *= scale
+    else:
+        np.multiply(interleaved.T, np.float32(scale), out=out, dtype=np.float32)
+    return out
+
+
+def _spooled_buffer(file):
+    """The BytesIO behind a SpooledTemporaryFile that has not rolled over to disk, else None"""
+    inner = getattr(file, '_file', file)
+    return inner if isinstance(inner, io.BytesIO) else None
+
+
+def _decode_wav_file(file):
+    """parse_wav() on the upload without copying it: its in-memory buffer, or an mmap of the spooled file"""
+    in_memory = _spooled_buffer(file)
+    if in_memory is not None:
+        with in_memory.getbuffer() as view:
+            return parse_wav(view)
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return parse_wav(mapped)
+
+
+def decode_via_tempfile(data, suffix='.wav'):
+    """The original path: write the bytes to a named temp file and torchaudio.load it"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(data)
+        audio_path = tmp.name
+    try:
+        return torchaudio.load(audio_path)
+    finally:
+        os.remove(audio_path)
+
+
+def decode_file(file):
+    """(waveform tensor, sample rate) from an uploaded (spooled) file object"""
+    file.seek(0)
+    fmt = sniff_format(file.read(16))
+    file.seek(0)
+    if fmt == 'wav':
+        decoded = _decode_wav_file(file)
+        if decoded is not None:
+            samples, sample_rate = decoded
+            return torch.from_numpy(samples), sample_rate
+    try:
+        waveform, sample_rate = torchaudio.load(file, format=fmt)
+        return waveform, sample_rate
+    except (RuntimeError, ValueError, TypeError, OSError) as e:
+        print(f"⚠️ In-memory decode failed ({fmt or 'unknown format'}: {e}); falling back to a temp file")
+    file.seek(0)
+    return decode_via_tempfile(file.read(), f'.{fmt or "wav"}')
+
+
+# ==========================
+# BENCHMARK: temp file vs in-memory decoding
+# ==========================
+def _spooled(data):
+    """A SpooledTemporaryFile holding `data` the way Starlette would"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    spooled.write(data)
+    spooled.seek(0)
+    return spooled
+
+
+def benchmark(paths, runs=20):
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        timings = {'temp_file': [], 'in_memory': []}
+        for _ in range(runs):
+            start = time.perf_counter()
+            reference, rate = decode_via_tempfile(data)
+            timings['temp_file'].append(time.perf_counter() - start)
+            with _spooled(data) as spooled:
+                start = time.perf_counter()
+                waveform, sample_rate = decode_file(spooled)
+                timings['in_memory'].append(time.perf_counter() - start)
+        frames = min(reference.shape[-1], waveform.shape[-1])
+        diff = float((reference[..., :frames] - waveform[..., :frames]).abs().max()) if frames else 0.0
+        before, after = statistics.median(timings['temp_file']), statistics.median(timings['in_memory'])
+        print(f"{os.path.basename(path)} ({sniff_format(data[:16]) or '?'}, {len(data) / 1024:.0f} kB, "
+              f"{'spooled to disk' if len(data) > SPOOL_MAX_SIZE else 'in memory'})")
+        print(f"  temp file: {before * 1000:8.2f} ms   in-memory: {after * 1000:8.2f} ms   "
+              f"({before / after:.1f}x)   max |diff| {diff:.1e}, "
+              f"rate {rate} vs {sample_rate}, shape {tuple(reference.shape)} vs {tuple(waveform.shape)}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark /transcribe audio decoding: temp file vs in-memory")
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('benchmark')
+    bench.add_argument('paths', nargs='+', help="Audio files, e.g. recordings from the app (.m4a/.webm/.wav)")
+    bench.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args(argv)
+    benchmark(args.paths, args.runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
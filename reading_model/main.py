@@ -2,9 +2,9 @@
 from fastapi import FastAPI, UploadFile, File
 from transformers import WhisperForConditionalGeneration, WhisperProcessor, BitsAndBytesConfig
 import torch
-import tempfile
-import os
-import torchaudio
+
+from audio_io import decode_file
+from preprocessing import prepare_audio, TARGET_SAMPLE_RATE
 
 # ==========================
 # APP INIT
@@ -43,31 +43,25 @@ async def root():
 @app.post("/transcribe")
 async def transcribe(audio: UploadFile = File(...)):
     """
-    Accepts audio file upload and returns transcription.
+    Accepts audio file upload and returns transcription, plus how the audio
+    was normalised and how much silence was trimmed.
     """
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-        tmp.write(await audio.read())
-        audio_path = tmp.name
-
-    try:
-        # Load audio
-        waveform, sample_rate = torchaudio.load(audio_path)
+    # Decode straight from the uploaded (spooled) file; see audio_io.py
+    waveform, sample_rate = decode_file(audio.file)
 
-        # Process audio
-        inputs = processor(waveform, sampling_rate=sample_rate, return_tensors="pt")
+    # 16 kHz mono with leading/trailing silence trimmed; see preprocessing.py
+    speech, preprocessing = prepare_audio(waveform, sample_rate)
 
-        # Move inputs to same device as model
-        inputs = {k: v.to(device) for k, v in inputs.items()}
+    # Process audio
+    inputs = processor(speech.numpy(), sampling_rate=TARGET_SAMPLE_RATE, return_tensors="pt")
 
-        # Generate transcription
-        with torch.no_grad():
-            generated_ids = model.generate(**inputs)
+    # Move inputs to same device as model
+    inputs = {k: v.to(device) for k, v in inputs.items()}
 
-        transcription = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
+    # Generate transcription
+    with torch.no_grad():
+        generated_ids = model.generate(**inputs)
 
-    finally:
-        # Cleanup temp file
-        os.remove(audio_path)
+    transcription = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
 
-    return {"transcription": transcription}
+    return {"transcription": transcription, "preprocessing": preprocessing}
@@ -0,0 +1,96 @@
+# preprocessing.py
+import functools
+import os
+import time
+
+import torch
+import torchaudio
+
+# ==========================
+# Audio preprocessing before Whisper
+# ==========================
+# Whisper's feature extractor expects 16 kHz mono. Phone recordings arrive at
+# 44.1/48 kHz, sometimes in stereo, and children's readings start and end
+# with long silences. prepare_audio():
+#   1. downmixes to mono (mean of the channels);
+#   2. trims leading and trailing silence with an energy check: 20 ms frames
+#      whose RMS is below max(loudest frame - TRIM_RANGE_DB, TRIM_FLOOR_DBFS)
+#      count as silence, and TRIM_PAD_SECONDS is kept on either side of the
+#      voiced region. Pauses inside the reading are left alone, and input with
+#      no frame above the floor is not trimmed at all;
+#   3. resamples to 16 kHz. The windowed-sinc kernel is built once per input
+#      rate (cached torchaudio Resample modules).
+# Trimming runs before resampling, so the resampler only sees the voiced part.
+# AUDIO_TRIM_SILENCE=0 turns step 2 off.
+
+TARGET_SAMPLE_RATE = 16000
+TRIM_FRAME_SECONDS = 0.02
+AUDIO_TRIM_SILENCE = os.environ.get("AUDIO_TRIM_SILENCE", "1") == "1"
+TRIM_RANGE_DB = float(os.environ.get("TRIM_RANGE_DB", "40"))
+TRIM_FLOOR_DBFS = float(os.environ.get("TRIM_FLOOR_DBFS", "-55"))
+TRIM_PAD_SECONDS = float(os.environ.get("TRIM_PAD_SECONDS", "0.2"))
+
+
+@functools.lru_cache(maxsize=8)
+def get_resampler(orig_freq, new_freq=TARGET_SAMPLE_RATE):
+    """Resample module for one rate pair; its kernel is computed on construction only"""
+    return torchaudio.transforms.Resample(orig_freq, new_freq)
+
+
+def downmix(waveform):
+    """(channels, frames) or (frames,) -> (frames,) mono"""
+    if waveform.dim() == 1:
+        return waveform
+    return waveform.mean(dim=0) if waveform.shape[0] > 1 else waveform[0]
+
+
+def voiced_bounds(mono, sample_rate, range_db=TRIM_RANGE_DB, floor_dbfs=TRIM_FLOOR_DBFS,
+                  pad_seconds=TRIM_PAD_SECONDS):
+    """(start, end) sample indices of the voiced region; (0, len) when nothing is voiced"""
+    length = mono.shape[-1]
+    hop = max(int(sample_rate * TRIM_FRAME_SECONDS), 1)
+    n_frames = length // hop
+    if n_frames == 0:
+        return 0, length
+    energy = mono[:n_frames * hop].reshape(n_frames, hop).pow(2).mean(dim=1)
+    frame_db = 10.0 * torch.log10(energy + 1e-10)
+    threshold = max(float(frame_db.max()) - range_db, floor_dbfs)
+    voiced = torch.nonzero(frame_db >= threshold).flatten()
+    if voiced.numel() == 0:
+        return 0, length
+    pad = int(pad_seconds * sample_rate)
+    start = max(int(voiced[0]) * hop - pad, 0)
+    end = min((int(voiced[-1]) + 1) * hop + pad, length)
+    # A voiced last frame keeps the partial frame after it as well
+    if int(voiced[-1]) == n_frames - 1:
+        end = length
+    return start, end
+
+
+def prepare_audio(waveform, sample_rate, trim=AUDIO_TRIM_SILENCE):
+    """16 kHz mono float32 (frames,) tensor for Whisper, plus a summary of what was done"""
+    start_time = time.perf_counter()
+    channels = waveform.shape[0] if waveform.dim() > 1 else 1
+    mono = downmix(waveform.to(torch.float32))
+    length = mono.shape[-1]
+
+    start, end = voiced_bounds(mono, sample_rate) if trim else (0, length)
+    mono = mono[start:end]
+
+    if sample_rate != TARGET_SAMPLE_RATE and mono.numel():
+        with torch.no_grad():
+            mono = get_resampler(int(sample_rate))(mono)
+
+    removed = (length - (end - start)) / sample_rate
+    summary = {
+        "input_seconds": round(length / sample_rate, 3),
+        "input_sample_rate": int(sample_rate),
+        "input_channels": int(channels),
+        "leading_silence_seconds": round(start / sample_rate, 3),
+        "trailing_silence_seconds": round((length - end) / sample_rate, 3),
+        "removed_seconds": round(removed, 3),
+        "removed_fraction": round(removed * sample_rate / length, 4) if length else 0.0,
+        "output_seconds": round(mono.shape[-1] / TARGET_SAMPLE_RATE, 3),
+        "preprocess_ms": round((time.perf_counter() - start_time) * 1000.0, 2),
+    }
+    return mono, summary